@@ -20,6 +20,26 @@ unsigned long temps_relais = 0;
 bool relais_actifs = false;
 const unsigned long duree_activation = 3000; // 3 secondes
 
+// Protocole binaire (voir python_code_app/protocol.py)
+#define SYNC_BYTE 0xA5
+#define TAILLE_TRAME 11
+#define STATUT_CONFORME 0x01
+#define STATUT_SANS_ECHO 0x02
+#define STATUT_HORS_PLAGE 0x04
+
+bool mode_binaire = false;
+uint16_t sequence = 0;
+String commande = "";
+
+// Cadencement non bloquant (millis), configurable par la commande RATE:<hz>
+#define TIMEOUT_ECHO_US 25000UL // ~4 m aller-retour, evite le blocage d'1 s de pulseIn
+#define FREQUENCE_MAX 40
+unsigned long periode_mesure = 500; // ms, 2 Hz par defaut
+const unsigned long periode_lcd = 250; // ms
+unsigned long derniere_mesure = 0;
+unsigned long dernier_lcd = 0;
+float derniere_distance = 0;
+
 void setup() {
   Serial.begin(9600);
   pinMode(TRIG_PIN, OUTPUT);
@@ -39,12 +59,29 @@ void setup() {
 }
 
 void loop() {
-  float distance = mesurerDistance();
-  afficherLCD(distance);
-  envoyerSerial(distance);
-  verifierConformite(distance);
+  lireCommandes();
+  unsigned long maintenant = millis();
+
+  if (maintenant - derniere_mesure >= periode_mesure) {
+    derniere_mesure = maintenant;
+    unsigned long temps_us = micros();
+    float distance = mesurerDistance();
+    derniere_distance = distance;
+    if (mode_binaire) {
+      envoyerBinaire(distance, temps_us);
+    } else {
+      envoyerSerial(distance);
+    }
+    verifierConformite(distance);
+  }
+
+  // L'ecran I2C est lent : rafraichi a son propre rythme
+  if (maintenant - dernier_lcd >= periode_lcd) {
+    dernier_lcd = maintenant;
+    afficherLCD(derniere_distance);
+  }
+
   gererRelais();
-  delay(500);
 }
 
 float mesurerDistance() {
@@ -53,7 +90,7 @@ float mesurerDistance() {
   digitalWrite(TRIG_PIN, HIGH);
   delayMicroseconds(10);
   digitalWrite(TRIG_PIN, LOW);
-  long duree = pulseIn(ECHO_PIN, HIGH);
+  long duree = pulseIn(ECHO_PIN, HIGH, TIMEOUT_ECHO_US); // 0 si pas d'echo
   float distance = duree * 0.034 / 2;
   return distance;
 }
@@ -76,6 +113,89 @@ void envoyerSerial(float dist) {
   }
 }
 
+uint8_t crc8(const uint8_t *donnees, uint8_t longueur) {
+  uint8_t crc = 0;
+  for (uint8_t i = 0; i < longueur; i++) {
+    crc ^= donnees[i];
+    for (uint8_t b = 0; b < 8; b++) {
+      crc = (crc & 0x80) ? (crc << 1) ^ 0x07 : crc << 1;
+    }
+  }
+  return crc;
+}
+
+void envoyerBinaire(float dist, unsigned long temps_us) {
+  uint8_t statut = 0;
+  if (dist >= seuil_min && dist <= seuil_max) {
+    statut |= STATUT_CONFORME;
+  }
+  if (dist <= 0) {
+    statut |= STATUT_SANS_ECHO;
+  } else if (dist > 400) {
+    statut |= STATUT_HORS_PLAGE;
+  }
+  // Distance en dixiemes de millimetre
+  uint16_t dixiemes_mm = (uint16_t) constrain(dist * 100.0, 0, 65535);
+
+  uint8_t trame[TAILLE_TRAME];
+  trame[0] = SYNC_BYTE;
+  trame[1] = sequence & 0xFF;
+  trame[2] = sequence >> 8;
+  trame[3] = temps_us & 0xFF;
+  trame[4] = (temps_us >> 8) & 0xFF;
+  trame[5] = (temps_us >> 16) & 0xFF;
+  trame[6] = (temps_us >> 24) & 0xFF;
+  trame[7] = dixiemes_mm & 0xFF;
+  trame[8] = dixiemes_mm >> 8;
+  trame[9] = statut;
+  trame[10] = crc8(trame + 1, TAILLE_TRAME - 2);
+  Serial.write(trame, TAILLE_TRAME);
+  sequence++;
+}
+
+void lireCommandes() {
+  while (Serial.available() > 0) {
+    char c = Serial.read();
+    if (c == '\n') {
+      traiterCommande(commande);
+      commande = "";
+    } else if (c != '\r' && commande.length() < 32) {
+      commande += c;
+    }
+  }
+}
+
+void traiterCommande(String cmd) {
+  cmd.trim();
+  if (cmd == "BIN" || cmd.startsWith("BIN:")) {
+    // BIN[:baudrate] : passage en trames binaires, avec changement de vitesse optionnel
+    long vitesse = cmd.length() > 4 ? cmd.substring(4).toInt() : 0;
+    Serial.print("ACK:BIN");
+    if (vitesse > 0) {
+      Serial.print(":");
+      Serial.print(vitesse);
+    }
+    Serial.println();
+    if (vitesse > 0) {
+      Serial.flush();
+      Serial.end();
+      Serial.begin(vitesse);
+    }
+    sequence = 0;
+    mode_binaire = true;
+  } else if (cmd.startsWith("RATE:")) {
+    // RATE:<hz> : frequence d'acquisition entre 1 et 40 Hz
+    long frequence = constrain(cmd.substring(5).toInt(), 1, FREQUENCE_MAX);
+    periode_mesure = 1000 / frequence;
+    // En mode binaire aussi : la ligne part entre deux trames et l'hote la reconnait
+    Serial.print("ACK:RATE:");
+    Serial.println(frequence);
+  } else if (cmd == "TXT") {
+    mode_binaire = false;
+    Serial.println("ACK:TXT");
+  }
+}
+
 void verifierConformite(float dist) {
   if (!relais_actifs) {
     if (dist >= seuil_min && dist <= seuil_max) {
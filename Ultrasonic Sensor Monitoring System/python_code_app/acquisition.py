@@ -0,0 +1,795 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Headless acquisition engine for the ultrasonic monitoring system.
+
+The engine owns everything that does not need a display: the serial link to
+the Arduino, line parsing, distance statistics, the conformity decision and
+the result history. Consumers subscribe to its events, either with a callback
+or with a queue, and are never called back into Tk directly.
+
+Run it without a GUI with::
+
+    python -m acquisition --port COM3 --port COM4 --record results.jsonl
+    python -m acquisition --all-ports
+"""
+
+import serial
+import argparse
+import threading
+import asyncio
+import time
+import json
+import logging
+import signal
+from datetime import datetime
+from pathlib import Path
+from serial_reader import SerialLineReader, LatencyRecorder
+from rolling_stats import RollingStats
+from conformity import PartDetector
+from history import ResultHistory
+from filters import FILTERS, build_filter
+from profiling import SPANS, SamplingProfiler
+from transport import EventQueue, SerialTransport, DROP_NEWEST, BLOCK
+from line_parser import (
+    parse_line, KIND_DISTANCE, KIND_RESULT, KIND_ACK_BINARY, KIND_ACK_RATE, KIND_ACK_TEXT, KIND_TEXT
+)
+from protocol import (
+    ProtocolDecoder, Frame, STATUS_CONFORME, STATUS_NO_ECHO, STATUS_OUT_OF_RANGE, binary_command
+)
+
+
+# Event names published by AcquisitionEngine
+EVENT_CONNECTED = "connected"
+EVENT_DISCONNECTED = "disconnected"
+EVENT_CONNECTION_LOST = "connection_lost"
+EVENT_CONNECT_FAILED = "connect_failed"
+EVENT_READY = "ready"
+EVENT_MEASUREMENT = "measurement"
+EVENT_RESULT = "result"
+EVENT_MESSAGE = "message"
+
+# Firmware acquisition rate limits (HC-SR04 tops out around 40 Hz)
+MIN_SAMPLE_RATE = 1
+MAX_SAMPLE_RATE = 40
+
+class AcquisitionEngine:
+    def __init__(self, port=None, baudrate=9600, min_threshold=10.0, max_threshold=50.0,
+                 max_distance_history=100, station=None, logger=None,
+                 binary_protocol=False, binary_baudrate=None, sample_rate=None,
+                 part_detector=None, signal_filter=None):
+        # Connection properties
+        self.arduino = None
+        self.is_running = False
+        self.port = port
+        self.baudrate = baudrate
+        self.station = station or port
+        self.reader_thread = None
+        self.reader_latency = LatencyRecorder()
+
+        # Opening the port resets the Arduino: it is ready at its first sample
+        self.awaiting_device = False
+        self.connected_at = None
+
+        # Serial protocol: text lines, upgraded to binary frames on request
+        self.binary_protocol = binary_protocol
+        self.binary_baudrate = binary_baudrate
+        self.decoder = ProtocolDecoder()
+        self.sample_rate = sample_rate
+
+        # Part arrival/settle/departure tracking for the PASS/FAIL decision
+        self.part_detector = part_detector or PartDetector()
+        self.device_timestamp_us = None
+        self.dropouts = 0
+
+        # Counters for the metrics endpoint; only the reader thread writes them
+        self.samples_received = 0
+        self.out_of_range = 0
+        self.parse_errors = 0
+
+        # The text protocol carries the firmware's own verdict; disagreeing
+        # with ours means its thresholds differ from the app's
+        self.device_conforme = None
+        self.status_mismatches = 0
+        self.status_mismatch_reported = False
+
+        # Text line kind (line_parser) -> handler(value, device_conforme)
+        self.line_handlers = {
+            KIND_DISTANCE: self.process_distance_line,
+            KIND_RESULT: self.process_result_line,
+            KIND_ACK_BINARY: self.process_protocol_ack,
+            KIND_ACK_RATE: self.process_rate_ack,
+            KIND_ACK_TEXT: self.process_text_ack,
+            KIND_TEXT: self.process_text_line,
+        }
+
+        # Optional filter stage (filters.FILTERS name) between parsing and the
+        # conformity decision; samples of one serial chunk are filtered together
+        self.filter_name = signal_filter or "none"
+        self.signal_filter = build_filter(self.filter_name)
+        self.pending_samples = []
+        self.batching = False
+        self.filtered_out = 0
+
+        # Statistics
+        self.session_start_time = None
+        self.test_history = ResultHistory()
+
+        # Ultrasonic sensor data
+        self.current_distance = 0.0
+        self.max_distance_history = max_distance_history
+        self.distance_history = RollingStats(max_distance_history)
+
+        # Conformity thresholds (cm)
+        self.min_threshold = min_threshold
+        self.max_threshold = max_threshold
+
+        self.logger = logger or logging.getLogger("acquisition")
+        self.subscribers = []
+        self.lock = threading.Lock()
+
+    # Subscription API
+    def subscribe(self, callback):
+        """Register callback(event, payload); it runs on the publishing thread"""
+        with self.lock:
+            self.subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        # Accept the queue returned by subscribe_queue as well
+        callback = getattr(callback, 'subscription', callback)
+        with self.lock:
+            if callback in self.subscribers:
+                self.subscribers.remove(callback)
+
+    def subscribe_queue(self, maxsize=0, policy=DROP_NEWEST, block_timeout=1.0):
+        """Return a transport.EventQueue that receives (event, payload) tuples.
+
+        Each consumer gets its own queue; policy decides what happens when it
+        falls behind (see transport.py).
+        """
+        events = EventQueue(maxsize, policy=policy, block_timeout=block_timeout)
+
+        def enqueue(event, payload):
+            events.offer((event, payload))
+
+        events.subscription = self.subscribe(enqueue)
+        return events
+
+    def publish(self, event, payload=None):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        for callback in subscribers:
+            try:
+                callback(event, payload)
+            except Exception as e:
+                self.logger.error("Subscriber error on '{}': {}".format(event, str(e)))
+
+    def message(self, text, category="event"):
+        """Publish a log line; category lets consumers rate-limit chatty sources"""
+        self.publish(EVENT_MESSAGE, {'text': text, 'category': category})
+
+    # Connection
+    def connect(self, port=None, baudrate=None, start_reader=True):
+        """Open the serial port and start the reader thread (raises serial.SerialException).
+
+        Returns as soon as the port is open. The Arduino reboots when the port
+        opens; EVENT_READY is published at its first valid sample, and the
+        binary/rate commands are only sent then.
+
+        With start_reader=False the port is opened non-blocking and the caller
+        feeds the bytes it reads to feed(), as StationManager does.
+        """
+        if port:
+            self.port = port
+            self.station = self.station or port
+        if baudrate:
+            self.baudrate = baudrate
+
+        # Never leave a previous port or reader running behind the new one
+        self.is_running = False
+        if self.arduino and self.arduino.is_open:
+            try:
+                self.arduino.close()
+            except Exception as e:
+                self.logger.error(f"Error closing serial connection: {e}")
+        if self.reader_thread and self.reader_thread.is_alive() \
+                and self.reader_thread is not threading.current_thread():
+            self.reader_thread.join(timeout=2)
+
+        # Also accepts pyserial URLs (loop://, socket://, rfc2217://)
+        self.arduino = serial.serial_for_url(self.port, self.baudrate, timeout=1 if start_reader else 0)
+
+        self.decoder.reset()
+        self.awaiting_device = True
+        self.connected_at = time.monotonic()
+        self.is_running = True
+        self.session_start_time = datetime.now()
+        if start_reader:
+            self.start_reading_thread()
+        self.publish(EVENT_CONNECTED, {'port': self.port, 'baudrate': self.baudrate})
+
+    def device_ready(self):
+        """First valid sample since connect: the bootloader is done and the sketch runs"""
+        self.awaiting_device = False
+        elapsed = time.monotonic() - self.connected_at
+        self.publish(EVENT_READY, {'port': self.port, 'elapsed': elapsed})
+        try:
+            # RATE first: after BIN:<baudrate> the firmware re-opens its port at
+            # the new speed, and a command sent meanwhile would be lost
+            if self.sample_rate:
+                self.send_command("RATE:{}".format(self.sample_rate))
+            if self.binary_protocol:
+                # Firmware without binary support ignores this and keeps sending text
+                self.send_command(binary_command(self.binary_baudrate))
+        except serial.SerialException as e:
+            self.logger.error("Unable to configure {}: {}".format(self.port, str(e)))
+
+    def disconnect(self):
+        self.is_running = False
+        if self.arduino and self.arduino.is_open:
+            try:
+                self.arduino.close()
+            except Exception as e:
+                self.logger.error(f"Error closing serial connection: {e}")
+        self.publish(EVENT_DISCONNECTED, {'port': self.port})
+
+    def write(self, data):
+        if not self.is_running or not self.arduino:
+            raise serial.SerialException("Not connected")
+        self.arduino.write(data)
+
+    def send_command(self, command):
+        self.write("{}\n".format(command).encode())
+
+    def set_sample_rate(self, rate):
+        """Ask the firmware to acquire at rate Hz (sent now if connected, else on connect)"""
+        rate = int(rate)
+        if not MIN_SAMPLE_RATE <= rate <= MAX_SAMPLE_RATE:
+            raise ValueError("Sample rate must be between {} and {} Hz".format(
+                MIN_SAMPLE_RATE, MAX_SAMPLE_RATE))
+        self.sample_rate = rate
+        if self.is_running:
+            self.send_command("RATE:{}".format(rate))
+
+    def start_reading_thread(self):
+        self.reader_thread = threading.Thread(target=self.read_arduino, daemon=True)
+        self.reader_thread.start()
+
+    def read_arduino(self):
+        errors = 0
+        max_errors = 5
+        reader = SerialLineReader(self.arduino, self.process_batch,
+                                  latency=self.reader_latency, decoder=self.decoder)
+
+        while self.is_running and errors < max_errors:
+            try:
+                if reader.poll():
+                    errors = 0
+
+            except Exception as e:
+                if not self.is_running:
+                    break
+                errors += 1
+                clean_msg = "Unexpected error reading Arduino data: {}".format(str(e))
+                self.logger.error(clean_msg)
+                if errors >= max_errors:
+                    self.connection_lost(e)
+                    break
+
+    def connection_lost(self, error):
+        self.message("❌ Multiple errors: {}".format(str(error)), "error")
+        self.is_running = False
+        self.publish(EVENT_CONNECTION_LOST, {'port': self.port, 'error': str(error)})
+
+    def feed(self, data):
+        """Process raw bytes read by an external loop; return the number of decoded items"""
+        arrived = time.perf_counter()
+        started = SPANS.start()
+        items = self.decoder.feed(data)
+        if started:
+            SPANS.stop("serial.decode", started)
+        if items:
+            self.process_batch(items)
+            self.reader_latency.add(time.perf_counter() - arrived)
+        return len(items)
+
+    # Parsing
+    def process_batch(self, items):
+        started = SPANS.start()
+        self.batching = True
+        try:
+            for item in items:
+                if type(item) is Frame:
+                    self.process_frame(item)
+                else:
+                    self.process_line(item)
+        finally:
+            self.batching = False
+        if self.pending_samples:
+            self.flush_samples()
+        if started:
+            SPANS.stop("engine.batch", started)
+
+    def process_frame(self, frame):
+        self.device_timestamp_us = frame.timestamp_us
+        if frame.status & (STATUS_NO_ECHO | STATUS_OUT_OF_RANGE):
+            self.dropouts += 1
+            return
+        self.check_device_status(frame.distance, bool(frame.status & STATUS_CONFORME))
+        self.update_distance(frame.distance)
+
+    def process_line(self, data):
+        try:
+            kind, value, device_conforme = parse_line(data)
+            self.line_handlers[kind](value, device_conforme)
+        except Exception as e:
+            self.parse_errors += 1
+            clean_msg = "Error processing Arduino data '{}': {}".format(data, str(e))
+            self.logger.error(clean_msg)
+            self.message("⚠️ Processing error: {}".format(data), "warning")
+
+    def process_distance_line(self, distance, device_conforme):
+        if device_conforme is not None:
+            self.check_device_status(distance, device_conforme)
+        self.update_distance(distance)
+
+    def process_result_line(self, conforme, device_conforme):
+        # Results come after the samples that preceded them
+        if self.pending_samples:
+            self.flush_samples()
+        self.record_result(conforme=conforme)
+
+    def process_protocol_ack(self, baudrate, device_conforme):
+        """Handle the firmware's ACK:BIN[:baudrate] answer to the binary request"""
+        self.message("⚡ Binary protocol enabled")
+        if baudrate:
+            # The firmware switches baudrate right after the acknowledgement;
+            # the few bytes lost in between are skipped by the frame resync
+            self.arduino.baudrate = baudrate
+            self.baudrate = baudrate
+            self.message("⚡ Baudrate switched to {}".format(baudrate))
+
+    def process_rate_ack(self, rate, device_conforme):
+        self.message("📶 Sample rate set to {} Hz".format(rate))
+
+    def process_text_ack(self, value, device_conforme):
+        self.message("📝 Text protocol enabled")
+
+    def process_text_line(self, line, device_conforme):
+        if line:
+            self.message("📡 Arduino: {}".format(line), "device")
+
+    def check_device_status(self, distance, device_conforme):
+        """Compare the firmware's Conforme/Non Conforme with our own decision"""
+        self.device_conforme = device_conforme
+        if device_conforme == self.check_conformity(distance):
+            return
+        self.status_mismatches += 1
+        if not self.status_mismatch_reported:
+            self.status_mismatch_reported = True
+            self.message("⚠️ Device says {} at {:.1f} cm: its thresholds differ from {:.1f}-{:.1f} cm".format(
+                "Conforme" if device_conforme else "Non Conforme", distance,
+                self.min_threshold, self.max_threshold), "warning")
+
+    # Statistics and conformity
+    def update_distance(self, distance):
+        self.samples_received += 1
+        if not (0 <= distance <= 400):
+            self.out_of_range += 1
+            self.message("⚠️ Distance out of range: {:.1f}cm".format(distance), "warning")
+            return
+
+        if self.signal_filter is not None:
+            self.pending_samples.append(distance)
+            if not self.batching:
+                self.flush_samples()
+            return
+        self.accept_distance(distance)
+
+    def flush_samples(self):
+        """Run the buffered raw samples through the filter and accept what survives"""
+        samples, self.pending_samples = self.pending_samples, []
+        signal_filter = self.signal_filter
+        if signal_filter is None:
+            accepted = samples
+        else:
+            started = SPANS.start()
+            accepted = signal_filter.process(samples)
+            if started:
+                SPANS.stop("engine.filter", started)
+            self.filtered_out += len(samples) - len(accepted)
+        for distance in accepted:
+            self.accept_distance(distance)
+
+    def accept_distance(self, distance):
+        started = SPANS.start()
+        if self.awaiting_device:
+            self.device_ready()
+        self.current_distance = distance
+
+        self.distance_history.append(distance)
+
+        now = time.monotonic()
+        conforme = self.check_conformity(distance)
+        self.publish(EVENT_MEASUREMENT, {'distance': distance, 'conforme': conforme, 'time': now})
+        self.message("📏 Distance: {:.1f} cm".format(distance), "measurement")
+
+        # One result per part, once its reading has settled
+        decision = self.part_detector.update(distance, now)
+        if decision:
+            self.record_result(self.check_conformity(decision.distance), decision.distance,
+                               settle_time=decision.settle_time, samples=decision.samples,
+                               settled=decision.settled)
+        if started:
+            SPANS.stop("engine.sample", started)
+
+    def set_signal_filter(self, name):
+        """Switch the filter stage (a filters.FILTERS name); raises ValueError if unknown"""
+        signal_filter = build_filter(name)
+        self.filter_name = name
+        self.signal_filter = signal_filter
+
+    def check_conformity(self, distance):
+        """Check if distance is within thresholds"""
+        return self.min_threshold <= distance <= self.max_threshold
+
+    def set_thresholds(self, min_val, max_val):
+        if min_val >= max_val:
+            raise ValueError("Minimum value must be less than maximum value")
+        if min_val < 0 or max_val < 0:
+            raise ValueError("Values must be positive")
+        self.min_threshold = min_val
+        self.max_threshold = max_val
+        self.status_mismatch_reported = False
+
+    def distance_stats(self):
+        """Return min/max/avg/std/p50/p95 of the distance window, or None when empty"""
+        return self.distance_history.summary()
+
+    def set_history_size(self, size):
+        """Resize the rolling distance window (its contents are discarded)"""
+        self.max_distance_history = size
+        self.distance_history = RollingStats(size)
+
+    def add_manual_distance(self, distance):
+        """A distance entered by hand (manual tests), counted in the window like a sample"""
+        self.current_distance = distance
+        self.distance_history.append(distance)
+
+    def reset_distance_stats(self):
+        self.distance_history.clear()
+        self.current_distance = 0.0
+        self.part_detector.reset()
+        if self.signal_filter is not None:
+            self.signal_filter.reset()
+
+    # Recording
+    def record_result(self, conforme, distance=None, settle_time=None, samples=None, settled=True):
+        started = SPANS.start()
+        if distance is None:
+            distance = self.current_distance
+        timestamp = datetime.now()
+
+        # Stored column-wise; the dict only lives as long as the event
+        self.test_history.append(timestamp, conforme, distance, settle_time, samples, settled)
+        record = {
+            'timestamp': timestamp,
+            'result': "PASS" if conforme else "FAIL",
+            'conforme': conforme,
+            'distance': distance,
+            'settle_time': settle_time,
+            'samples': samples,
+            'settled': settled
+        }
+        self.publish(EVENT_RESULT, record)
+        if started:
+            SPANS.stop("engine.result", started)
+        return record
+
+    @property
+    def conforme_count(self):
+        return self.test_history.pass_count
+
+    @property
+    def non_conforme_count(self):
+        return self.test_history.fail_count
+
+    def reset_stats(self):
+        self.test_history.clear()
+
+    def summary(self):
+        # Counts only: O(1), cheap enough for every refresh
+        total = len(self.test_history)
+        passed = self.test_history.pass_count
+        return {
+            'total': total,
+            'conforme_count': passed,
+            'non_conforme_count': total - passed,
+            'success_rate': (passed / total * 100) if total > 0 else 0
+        }
+
+
+class ResultRecorder:
+    """Subscriber that appends every result of an engine to a JSON Lines file.
+
+    Results are queued and written by a background thread, so a slow disk
+    does not hold up the reader. When the queue is full (the disk stalled
+    for ``maxsize`` results) a reader thread waits up to one second for
+    room, then drops the result and counts it in ``dropped``. Engines fed
+    from an asyncio loop never wait: the result is dropped and counted at
+    once, so the loop keeps serving the other ports.
+    """
+
+    def __init__(self, path, maxsize=10000):
+        self.path = Path(path)
+        self.file = open(self.path, 'a', encoding='utf-8')
+        self.lock = threading.Lock()
+        self.results = EventQueue(maxsize, policy=BLOCK)
+        self.writer_thread = threading.Thread(target=self.run, daemon=True)
+        self.writer_thread.start()
+
+    def attach(self, engine):
+        def on_event(event, payload):
+            if event == EVENT_RESULT:
+                # Looked up per result: the engine may be attached before it has a port
+                self.results.offer((engine.station or engine.port, payload))
+
+        engine.subscribe(on_event)
+
+    @property
+    def dropped(self):
+        return self.results.dropped
+
+    def run(self):
+        while True:
+            item = self.results.get()
+            if item is None:
+                break
+            self.write(*item)
+
+    def write(self, station, record):
+        line = json.dumps({
+            'station': station,
+            'timestamp': record['timestamp'].isoformat(),
+            'result': record['result'],
+            'conforme': record['conforme'],
+            'distance_cm': record['distance'],
+            'settle_time_s': record['settle_time'],
+            'samples': record['samples']
+        }, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + "\n")
+            self.file.flush()
+
+    def close(self):
+        self.results.put(None)
+        self.writer_thread.join(timeout=5)
+        with self.lock:
+            self.file.close()
+
+
+async def serve_asyncio(engines, stop, logger):
+    """Read every engine from one asyncio loop until stop is set or all links are lost"""
+    transports = []
+    for engine in engines:
+        transport = SerialTransport(engine, logger=logger)
+        try:
+            await transport.open()
+        except serial.SerialException as e:
+            logger.error("Unable to connect to port %s: %s", engine.port, e)
+            continue
+        logger.info("Connected to %s at %d baud", engine.port, engine.baudrate)
+        transports.append(transport)
+
+    while not stop.is_set() and any(t.engine.is_running for t in transports):
+        await asyncio.sleep(0.5)
+    for transport in transports:
+        await transport.close()
+    return [transport.engine for transport in transports]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m acquisition",
+        description="Headless ultrasonic acquisition daemon (one engine per serial port)"
+    )
+    parser.add_argument("--port", action="append", default=[],
+                        help="serial port to read, repeat for several stations")
+    parser.add_argument("--all-ports", action="store_true",
+                        help="also open every serial port detected on this machine")
+    parser.add_argument("--baudrate", type=int, default=9600)
+    parser.add_argument("--min", dest="min_threshold", type=float, default=10.0,
+                        help="minimum conforming distance in cm")
+    parser.add_argument("--max", dest="max_threshold", type=float, default=50.0,
+                        help="maximum conforming distance in cm")
+    parser.add_argument("--window", type=int, default=100,
+                        help="number of samples in the rolling distance statistics")
+    parser.add_argument("--presence", type=float, default=80.0,
+                        help="a part is present below this distance in cm")
+    parser.add_argument("--debounce", type=int, default=3,
+                        help="consecutive samples needed for a part to arrive or leave")
+    parser.add_argument("--min-dwell", type=float, default=0.3,
+                        help="seconds a part must stay before it is decided")
+    parser.add_argument("--record", help="append results to this JSON Lines file")
+    parser.add_argument("--capture",
+                        help="record the raw serial bytes to this file (replay with python -m simulator)")
+    parser.add_argument("--store", help="persist every sample and result to this SQLite file")
+    parser.add_argument("--binary", action="store_true",
+                        help="request binary frames (falls back to text on old firmware)")
+    parser.add_argument("--binary-baudrate", type=int,
+                        help="baudrate the firmware switches to in binary mode, e.g. 115200")
+    parser.add_argument("--rate", type=int,
+                        help="firmware sample rate in Hz ({}-{})".format(MIN_SAMPLE_RATE, MAX_SAMPLE_RATE))
+    parser.add_argument("--filter", default="none", choices=list(FILTERS),
+                        help="signal filter applied to the raw readings before the conformity decision")
+    parser.add_argument("--metrics-port", type=int,
+                        help="serve Prometheus metrics on http://<metrics-host>:<port>/metrics")
+    parser.add_argument("--metrics-host", default="127.0.0.1",
+                        help="address the metrics endpoint listens on (default: local only)")
+    parser.add_argument("--metrics-file",
+                        help="also write the metrics to this file for node_exporter's textfile collector")
+    parser.add_argument("--spans", action="store_true",
+                        help="time each pipeline stage and log p50/p99 per stage at exit")
+    parser.add_argument("--profile",
+                        help="sample every thread's stack to this file (collapsed stacks, for flame graphs)")
+    parser.add_argument("--profile-seconds", type=float, default=30.0,
+                        help="length of the --profile capture (default: 30 s)")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="read the ports from an asyncio event loop instead of a reader thread")
+    parser.add_argument("--verbose", action="store_true", help="log every measurement")
+    args = parser.parse_args(argv)
+    if not args.port and not args.all_ports:
+        parser.error("give at least one --port, or --all-ports")
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger("acquisition")
+
+    # Imported here: stations and store build on this module
+    from stations import StationManager, available_ports
+    from store import MeasurementStore
+    from simulator import CaptureWriter
+    import metrics
+
+    recorder = ResultRecorder(args.record) if args.record else None
+    store = MeasurementStore(args.store, logger=logger) if args.store else None
+    stop = threading.Event()
+    manager = StationManager(logger=logger)
+
+    def log_event(station):
+        def on_event(event, payload):
+            if event == EVENT_RESULT:
+                logger.info("[%s] %s %.1f cm (%s samples)", station, payload['result'],
+                            payload['distance'], payload['samples'])
+            elif event == EVENT_MEASUREMENT:
+                logger.debug("[%s] distance %.1f cm", station, payload['distance'])
+            elif event == EVENT_READY:
+                logger.info("[%s] first sample %.0f ms after opening the port", station,
+                            payload['elapsed'] * 1000)
+            elif event == EVENT_CONNECTION_LOST:
+                logger.error("[%s] connection lost: %s", station, payload['error'])
+        return on_event
+
+    ports = list(args.port)
+    if args.all_ports:
+        ports += [port for port in available_ports() if port not in ports]
+
+    engines = []
+    captures = []
+    for port in ports:
+        engine = AcquisitionEngine(port=port, baudrate=args.baudrate,
+                                   min_threshold=args.min_threshold,
+                                   max_threshold=args.max_threshold,
+                                   max_distance_history=args.window, logger=logger,
+                                   binary_protocol=args.binary,
+                                   binary_baudrate=args.binary_baudrate,
+                                   sample_rate=args.rate,
+                                   signal_filter=args.filter,
+                                   part_detector=PartDetector(presence_distance=args.presence,
+                                                              debounce_samples=args.debounce,
+                                                              min_dwell=args.min_dwell))
+        engine.subscribe(log_event(port))
+        if recorder:
+            recorder.attach(engine)
+        if store:
+            store.attach(engine)
+        if args.capture:
+            # One capture file per port when there are several
+            path = Path(args.capture)
+            if len(ports) > 1:
+                path = path.with_name("{}-{}{}".format(path.stem, Path(port).name, path.suffix))
+            engine.decoder.capture = CaptureWriter(path)
+            captures.append(engine.decoder.capture)
+        engines.append(engine)
+
+    registry = metrics.MetricsRegistry(logger)
+    registry.register(metrics.engine_collector(engines))
+    if store:
+        registry.register(metrics.store_collector(store))
+    metrics_server = metrics_file = None
+    if args.metrics_port is not None:
+        try:
+            metrics_server = metrics.MetricsServer(registry, args.metrics_port, args.metrics_host)
+            logger.info("Metrics on http://%s:%d/metrics", args.metrics_host, metrics_server.port)
+        except OSError as e:
+            logger.error("Unable to serve metrics on port %d: %s", args.metrics_port, e)
+    if args.metrics_file:
+        metrics_file = metrics.TextfileWriter(registry, args.metrics_file)
+
+    SPANS.enable(args.spans)
+    profiler = None
+    if args.profile:
+        profiler = SamplingProfiler(args.profile, args.profile_seconds).start()
+        logger.info("Profiling every thread for %.0f s to %s", args.profile_seconds, args.profile)
+
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+
+    if args.asyncio:
+        engines = asyncio.run(serve_asyncio(engines, stop, logger))
+    else:
+        for engine in engines:
+            try:
+                manager.add_station(engine.port, engine=engine)
+            except serial.SerialException as e:
+                logger.error("Unable to connect to port %s: %s", engine.port, e)
+                continue
+            logger.info("Connected to %s at %d baud", engine.port, args.baudrate)
+        engines = manager.engines()
+        if engines:
+            # One thread reads every station
+            manager.start()
+            while not stop.is_set() and any(engine.is_running for engine in engines):
+                stop.wait(1.0)
+            manager.stop()
+
+    if profiler:
+        # Cut short if the daemon stops first; the file is written either way
+        profiler.stop()
+        profiler.thread.join()
+        if profiler.error:
+            logger.error("Unable to write the profile: %s", profiler.error)
+        else:
+            logger.info("Profile: %d samples written to %s", profiler.samples, args.profile)
+    if store:
+        store.close()
+    for capture in captures:
+        capture.close()
+    if metrics_server:
+        metrics_server.close()
+    if metrics_file:
+        metrics_file.close()
+    if not engines:
+        if recorder:
+            recorder.close()
+        return 1
+
+    for engine in engines:
+        summary = engine.summary()
+        logger.info("[%s] %d tests, %d pass, %d fail", engine.station,
+                    summary['total'], summary['conforme_count'], summary['non_conforme_count'])
+        link = engine.decoder.stats()
+        if link['frames']:
+            logger.info("[%s] %d frames, %d lost, %d CRC errors, %d dropouts", engine.station,
+                        link['frames'], link['lost_frames'], link['crc_errors'], engine.dropouts)
+        if engine.filtered_out:
+            logger.info("[%s] %d samples rejected by the %s filter", engine.station,
+                        engine.filtered_out, engine.filter_name)
+        latency = engine.reader_latency.summary()
+        if latency:
+            logger.info("[%s] reader latency p50=%.2f ms p99=%.2f ms max=%.2f ms", engine.station,
+                        latency['p50_ms'], latency['p99_ms'], latency['max_ms'])
+    if recorder and recorder.dropped:
+        logger.warning("%d results not written to %s (queue full)", recorder.dropped, args.record)
+    for stage, summary in SPANS.summary().items():
+        logger.info("span %-14s n=%d p50=%.3f ms p99=%.3f ms max=%.3f ms", stage,
+                    summary['count'], summary['p50_ms'], summary['p99_ms'], summary['max_ms'])
+    if recorder:
+        recorder.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,85 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Write and load time of every export format for a one-day session.
+
+A day at one result per second (86,400 results) is exported to each format;
+load time is what an analyst pays to get the data back. Parquet and Arrow
+need pyarrow, .npy/.npz need numpy; formats whose package is missing are
+skipped.
+
+    python benchmarks/bench_export.py
+"""
+
+import os
+import sys
+import csv
+import json
+import time
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import exporters
+from history import ResultHistory
+
+
+def one_day(count=86400):
+    history = ResultHistory()
+    start = datetime.now().timestamp() - count
+    for i in range(count):
+        history.append(start + i, i % 7 != 0, 20.0 + (i % 300) / 10, 0.4 + (i % 50) / 1000, 10 + i % 5)
+    return history
+
+
+def load(path):
+    extension = exporters.extension_of(path)
+    if extension == '.csv':
+        with open(path, newline='', encoding='utf-8') as f:
+            return list(csv.reader(f))
+    if extension == '.jsonl':
+        with open(path, encoding='utf-8') as f:
+            return [json.loads(line) for line in f]
+    if extension == '.json':
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    if extension == '.parquet':
+        return exporters.pq.read_table(path)
+    if extension == '.arrow':
+        return exporters.pa.ipc.open_file(exporters.pa.memory_map(path)).read_all()
+    if extension == '.npy':
+        return exporters.np.load(path)
+    return dict(exporters.np.load(path))
+
+
+def main(count=86400):
+    history = one_day(count)
+    results = {}
+    print("export formats, {} results".format(count))
+    print("  {:<9} {:>10} {:>10} {:>10}".format("format", "write ms", "load ms", "size KB"))
+    with tempfile.TemporaryDirectory() as folder:
+        for extension in ('.csv', '.jsonl', '.json', '.parquet', '.arrow', '.npy', '.npz'):
+            path = os.path.join(folder, "session" + extension)
+            if exporters.is_columnar(path):
+                data = exporters.history_columns(history)
+            else:
+                data = exporters.history_rows(history)
+            start = time.perf_counter()
+            try:
+                exporters.export(path, data, count)
+            except ImportError as e:
+                print("  {:<9} skipped: {}".format(extension, e))
+                continue
+            write_ms = (time.perf_counter() - start) * 1000
+            start = time.perf_counter()
+            load(path)
+            load_ms = (time.perf_counter() - start) * 1000
+            size_kb = os.path.getsize(path) / 1024
+            print("  {:<9} {:>10.1f} {:>10.1f} {:>10.0f}".format(extension, write_ms, load_ms, size_kb))
+            results[extension] = {'write_ms': write_ms, 'load_ms': load_ms, 'size_kb': size_kb}
+    return results
+
+
+if __name__ == "__main__":
+    main()
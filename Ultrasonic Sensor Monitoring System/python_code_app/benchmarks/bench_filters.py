@@ -0,0 +1,81 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Per-sample cost and accuracy of the signal filters.
+
+A synthetic HC-SR04 trace (parts at a steady distance, gaussian noise, 0 cm
+dropouts and multipath spikes) is fed to every filter in batches the size of
+a serial chunk, the way the engine calls them. The error column is the mean
+absolute distance between the filtered output and the true distance.
+
+    python benchmarks/bench_filters.py
+"""
+
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from filters import FILTERS, build_filter
+
+
+def synthetic_trace(count, seed=1, dropout_rate=0.02, spike_rate=0.01):
+    """Return (raw readings, true distances)"""
+    rng = random.Random(seed)
+    raw, truth = [], []
+    distance = 30.0
+    for i in range(count):
+        if i % 200 == 0:
+            distance = rng.uniform(15.0, 45.0)
+        roll = rng.random()
+        if roll < dropout_rate:
+            value = 0.0
+        elif roll < dropout_rate + spike_rate:
+            value = distance + rng.uniform(40.0, 200.0)
+        else:
+            value = distance + rng.gauss(0.0, 0.3)
+        raw.append(value)
+        truth.append(distance)
+    return raw, truth
+
+
+def timed(name, raw, batch):
+    pipeline = build_filter(name)
+    start = time.perf_counter()
+    if pipeline is not None:
+        for first in range(0, len(raw), batch):
+            pipeline.process(raw[first:first + batch])
+    return (time.perf_counter() - start) / len(raw) * 1e9
+
+
+def accuracy(name, raw, truth):
+    """Rejected samples and mean absolute error of the accepted ones (one sample at a time, to align them)"""
+    pipeline = build_filter(name)
+    rejected, error, accepted = 0, 0.0, 0
+    for value, expected in zip(raw, truth):
+        out = [value] if pipeline is None else pipeline.process([value])
+        if not out:
+            rejected += 1
+            continue
+        error += abs(out[0] - expected)
+        accepted += 1
+    return rejected, error / max(1, accepted)
+
+
+def main(count=100000, batch=8):
+    raw, truth = synthetic_trace(count)
+    results = {}
+    print("signal filters, {} samples in batches of {}".format(count, batch))
+    print("  {:<12} {:>10} {:>10} {:>10}".format("filter", "ns/sample", "rejected", "error cm"))
+    for name in FILTERS:
+        rejected, error = accuracy(name, raw, truth)
+        result = {'ns_per_sample': timed(name, raw, batch), 'rejected': rejected, 'error_cm': error}
+        results[name] = result
+        print("  {:<12} {:>10.0f} {:>10d} {:>10.2f}".format(
+            name, result['ns_per_sample'], rejected, error))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Memory per result: list of dicts versus the columnar ResultHistory.
+
+Both containers are filled with the same results while tracemalloc counts
+every allocation, including the datetime, string and float objects that the
+dict records keep alive.
+
+    python benchmarks/bench_history.py
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from history import ResultHistory
+
+
+def fill_dicts(count):
+    history = []
+    for i in range(count):
+        conforme = i % 7 != 0
+        history.append({
+            'timestamp': datetime.now(),
+            'result': "PASS" if conforme else "FAIL",
+            'conforme': conforme,
+            'distance': 20.0 + (i % 300) / 10,
+            'settle_time': 0.4 + (i % 50) / 1000,
+            'samples': 10 + i % 5,
+            'settled': True
+        })
+    return history
+
+
+def fill_columns(count):
+    history = ResultHistory()
+    for i in range(count):
+        history.append(datetime.now(), i % 7 != 0, 20.0 + (i % 300) / 10,
+                       0.4 + (i % 50) / 1000, 10 + i % 5, True)
+    return history
+
+
+def bytes_per_record(fill, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    history = fill(count)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / len(history), history
+
+
+def main(count=200000):
+    dicts, _ = bytes_per_record(fill_dicts, count)
+    columns, history = bytes_per_record(fill_columns, count)
+
+    start = time.perf_counter()
+    history.summary()
+    summary_ms = (time.perf_counter() - start) * 1000
+
+    print("test history memory, {} results".format(count))
+    print("  list of dicts : {:8.1f} bytes/record".format(dicts))
+    print("  ResultHistory : {:8.1f} bytes/record ({:.1f} in the columns)".format(
+        columns, history.nbytes() / len(history)))
+    print("  reduction     : {:8.1f}x".format(dicts / columns))
+    print("  summary()     : {:8.2f} ms".format(summary_ms))
+    return {'dict_bytes': dicts, 'columnar_bytes': columns, 'summary_ms': summary_ms}
+
+
+if __name__ == "__main__":
+    main()
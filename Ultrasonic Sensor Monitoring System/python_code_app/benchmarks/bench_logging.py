@@ -0,0 +1,88 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Per-message cost of the log cleaning and formatting path.
+
+Compares the previous implementation, which rebuilt the emoji regex with
+re.compile on every call in both clean_message_for_logging and the log
+formatter, with the log_utils path: precompiled pattern, ASCII and icon-prefix
+fast paths that skip the regex, and a once-per-second timestamp cache.
+
+    python benchmarks/bench_logging.py
+"""
+
+import re
+import sys
+import timeit
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from log_utils import UnicodeFormatter, strip_emoji
+
+
+MESSAGES = [
+    "📏 Distance: 23.4 cm",
+    "✅ Result: PASS (23.4 cm, 420 ms, 14 samples)",
+    "📡 Arduino: Distance:23.40cm, Statut:Conforme",
+    "⚙️ Seuils appliqués: Min=10.0cm, Max=50.0cm",
+    "Configuration saved successfully",
+]
+
+
+def legacy_clean(msg):
+    emoji_pattern = re.compile("["
+        "\U0001F600-\U0001F64F"
+        "\U0001F300-\U0001F5FF"
+        "\U0001F680-\U0001F6FF"
+        "\U0001F1E0-\U0001F1FF"
+        "\U00002702-\U000027B0"
+        "\U000024C2-\U0001F251"
+        "⚠️⚡🔧🎉📏🔄✅❌🧪📊🔌📡📤💾🗑️📋📁📚ℹ️📅⏱️🚀🎯🛠️🎨📱🔵🟣🟡🔵🟢🔴📜🔔🔊🌙🕐"
+        "]+", flags=re.UNICODE)
+    return emoji_pattern.sub('', msg).strip()
+
+
+class LegacyFormatter(logging.Formatter):
+    def format(self, record):
+        msg = super().format(record)
+        emoji_pattern = re.compile("["
+            "\U0001F600-\U0001F64F"
+            "\U0001F300-\U0001F5FF"
+            "\U0001F680-\U0001F6FF"
+            "\U0001F1E0-\U0001F1FF"
+            "\U00002702-\U000027B0"
+            "\U000024C2-\U0001F251"
+            "]+", flags=re.UNICODE)
+        return emoji_pattern.sub('', msg)
+
+
+def make_path(clean, formatter):
+    records = [logging.LogRecord("bench", logging.INFO, __file__, 0, None, None, None)
+               for _ in MESSAGES]
+
+    def run():
+        for msg, record in zip(MESSAGES, records):
+            record.msg = clean(msg)
+            formatter.format(record)
+    return run
+
+
+def per_message_us(run, repeat=5, number=2000):
+    best = min(timeit.repeat(run, repeat=repeat, number=number))
+    return best / (number * len(MESSAGES)) * 1e6
+
+
+def main():
+    fmt = '%(asctime)s - %(levelname)s - %(message)s'
+    before = per_message_us(make_path(legacy_clean, LegacyFormatter(fmt)))
+    after = per_message_us(make_path(strip_emoji, UnicodeFormatter(fmt)))
+    print("log clean + format, per message")
+    print("  before (re.compile per call): {:8.2f} us".format(before))
+    print("  after  (log_utils fast path): {:8.2f} us".format(after))
+    print("  speed-up                    : {:8.1f}x".format(before / after))
+    return {'before_us': before, 'after_us': after}
+
+
+if __name__ == "__main__":
+    main()
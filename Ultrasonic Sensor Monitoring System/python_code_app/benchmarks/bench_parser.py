@@ -0,0 +1,97 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Text line parser throughput: the old startswith/regex chain versus line_parser.
+
+The corpus is a capture of the firmware's text output, one line per line of
+the file (``python benchmarks/bench_parser.py capture.txt``). Without one, a
+synthetic corpus in the firmware's format is used: mostly
+``Distance:12.34cm, Statut:Conforme`` lines with the odd acknowledgement,
+result and free-text line.
+
+    python benchmarks/bench_parser.py [corpus.txt]
+"""
+
+import re
+import sys
+import time
+import random
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from line_parser import parse_line
+
+
+LEGACY_PATTERNS = [
+    r'Distance:\s*(\d+\.?\d*)\s*cm',
+    r'(\d+\.?\d*)\s*cm',
+]
+
+
+def legacy_parse(data):
+    """The parse chain the engine used before line_parser, minus the side effects"""
+    if data.startswith("ACK:BIN"):
+        return "ack_binary"
+    if data.startswith("ACK:RATE:"):
+        return "ack_rate"
+    if data.startswith("DIST:"):
+        return float(data.replace("DIST:", "").strip())
+    if data.replace('.', '').replace('-', '').isdigit():
+        return float(data)
+    if data.upper() == "OK":
+        return True
+    elif data.upper() == "NON":
+        return False
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, data, re.IGNORECASE)
+        if match:
+            distance = float(match.group(1))
+            if 0 <= distance <= 400:
+                return distance
+    return data
+
+
+def synthetic_corpus(count, seed=1):
+    rng = random.Random(seed)
+    lines = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.001:
+            lines.append(rng.choice(["ACK:RATE:10", "ACK:TXT", "OK", "NON", "Systeme pret"]))
+            continue
+        distance = 0.0 if roll < 0.02 else rng.uniform(5.0, 60.0)
+        status = "Conforme" if 10.0 <= distance <= 30.0 else "Non Conforme"
+        lines.append("Distance:{:.2f}cm, Statut:{}".format(distance, status))
+    return lines
+
+
+def throughput(parse, lines, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            parse(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+
+def main(corpus=None, count=200000):
+    if corpus:
+        lines = [line.strip() for line in Path(corpus).read_text(encoding='utf-8', errors='ignore').splitlines()]
+        lines = [line for line in lines if line]
+    else:
+        lines = synthetic_corpus(count)
+
+    legacy = throughput(legacy_parse, lines)
+    unified = throughput(parse_line, lines)
+
+    print("text line parser, {} lines ({})".format(len(lines), corpus or "synthetic corpus"))
+    print("  legacy chain : {:>12,.0f} lines/s".format(legacy))
+    print("  line_parser  : {:>12,.0f} lines/s".format(unified))
+    print("  speedup      : {:>12.1f}x".format(unified / legacy))
+    return {'lines': len(lines), 'legacy_lines_per_s': legacy, 'lines_per_s': unified}
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else None)
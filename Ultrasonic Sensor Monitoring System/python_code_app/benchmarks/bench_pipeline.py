@@ -0,0 +1,143 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Per-sample cost of each acquisition stage, and the headless end-to-end rate.
+
+Stages, each timed on its own:
+
+- parse: line_parser.parse_line on firmware lines;
+- rolling stats: RollingStats.append per sample, summary() per GUI refresh;
+- conformity: PartDetector.update per sample;
+- record: AcquisitionEngine.record_result with a GUI-like subscriber that
+  only buffers the event (what the Tk side does on the reader thread);
+- sample: AcquisitionEngine.update_distance with the same subscriber.
+
+The end-to-end run replays synthetic firmware traffic through the engine,
+with feed() and, where pseudo-terminals and pyserial are available, through
+a real serial read loop on a pty.
+
+    python benchmarks/bench_pipeline.py
+"""
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from acquisition import AcquisitionEngine
+from conformity import PartDetector
+from line_parser import parse_line
+from ring_buffer import RingBuffer
+from rolling_stats import RollingStats
+import simulator
+
+
+def per_call_ns(run, count, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / count * 1e9
+
+
+def distances(count):
+    return [parse_line(data.decode().strip())[1] for _, data in simulator.synthetic_traffic(count=count)]
+
+
+def gui_engine():
+    """Engine with a subscriber that buffers events like the GUI's on_engine_event"""
+    engine = AcquisitionEngine()
+    events = RingBuffer(10000)
+    engine.subscribe(lambda event, payload: events.append((event, payload)))
+    return engine
+
+
+def stage_costs(count):
+    lines = [data.decode().strip() for _, data in simulator.synthetic_traffic(count=count)]
+    values = distances(count)
+
+    def parse():
+        for line in lines:
+            parse_line(line)
+
+    stats = RollingStats(100)
+
+    def rolling():
+        append = stats.append
+        for value in values:
+            append(value)
+
+    summaries = max(1, count // 100)
+
+    def summary():
+        for _ in range(summaries):
+            stats.summary()
+
+    detector = PartDetector()
+
+    def conformity():
+        update = detector.update
+        for i, value in enumerate(values):
+            update(value, i * 0.025)
+
+    engine = gui_engine()
+
+    def record():
+        for i in range(count):
+            engine.record_result(i % 7 != 0, 20.0, settle_time=0.4, samples=12)
+
+    sampler = gui_engine()
+
+    def sample():
+        update = sampler.update_distance
+        for value in values:
+            update(value)
+
+    return {
+        'parse_ns': per_call_ns(parse, count),
+        'rolling_append_ns': per_call_ns(rolling, count),
+        'rolling_summary_us': per_call_ns(summary, summaries) / 1000,
+        'conformity_ns': per_call_ns(conformity, count),
+        'record_ns': per_call_ns(record, count),
+        'sample_ns': per_call_ns(sample, count),
+    }
+
+
+def pty_available():
+    if os.name != "posix":
+        return False
+    try:
+        import serial
+        return hasattr(serial, "serial_for_url")
+    except ImportError:
+        return False
+
+
+def main(count=100000):
+    print("acquisition stages, {} samples".format(count))
+    results = stage_costs(count)
+    print("  parse_line            : {:8.0f} ns/line".format(results['parse_ns']))
+    print("  RollingStats.append   : {:8.0f} ns/sample".format(results['rolling_append_ns']))
+    print("  RollingStats.summary  : {:8.1f} us/refresh".format(results['rolling_summary_us']))
+    print("  PartDetector.update   : {:8.0f} ns/sample".format(results['conformity_ns']))
+    print("  record_result         : {:8.0f} ns/result".format(results['record_ns']))
+    print("  update_distance       : {:8.0f} ns/sample".format(results['sample_ns']))
+
+    print("end to end, synthetic firmware traffic at maximum speed")
+    runs = [("feed", True)]
+    if pty_available():
+        runs.append(("pty", False))
+    for name, direct in runs:
+        run = simulator.run_bench(simulator.synthetic_traffic(count=count), direct=direct)
+        results['e2e_{}_samples_per_s'.format(name)] = run['samples_per_s']
+        results['e2e_{}_reader_p99_ms'.format(name)] = run['reader_p99_ms']
+        print("  {:<4} : {:>10,.0f} samples/s, reader p99 {:.2f} ms".format(
+            name, run['samples_per_s'], run['reader_p99_ms'] or 0.0))
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Ingest throughput of the SQLite measurement store.
+
+Publishes synthetic samples from several engines as fast as possible and
+reports how long the publishing side spends per sample (what the reader
+thread pays) and how fast the writer thread commits them to disk. The store
+must sustain at least 1 kHz aggregate.
+
+    python benchmarks/bench_store.py
+"""
+
+import sys
+import time
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from acquisition import AcquisitionEngine
+from store import MeasurementStore
+
+
+def main(samples=100000, stations=4):
+    with tempfile.TemporaryDirectory() as folder:
+        store = MeasurementStore(Path(folder) / "bench.db")
+        engines = [AcquisitionEngine(port="BENCH{}".format(i)) for i in range(stations)]
+        for engine in engines:
+            engine.part_detector.presence_distance = -1.0  # no parts, samples only
+            store.attach(engine)
+
+        start = time.perf_counter()
+        for i in range(samples):
+            engines[i % stations].update_distance(20.0 + (i % 100) / 10)
+        published = time.perf_counter() - start
+        store.close()
+        total = time.perf_counter() - start
+
+        written = store.count("samples")
+        print("store ingest, {} samples over {} stations".format(samples, stations))
+        print("  publish cost per sample: {:8.2f} us".format(published / samples * 1e6))
+        print("  rows on disk           : {:8d} ({} dropped)".format(written, store.dropped))
+        print("  end-to-end throughput  : {:8.0f} samples/s".format(written / total))
+        print("  transactions           : {:8d}".format(store.batches))
+        return {'publish_us': published / samples * 1e6, 'rows_per_s': written / total,
+                'dropped': store.dropped}
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Run the benchmark suite and keep the results for comparison across commits.
+
+Every benchmark module exposes main(**sizes) returning a dict of numbers.
+The suite runs them in turn and writes one JSON file per run to
+``benchmarks/results/<commit>.json`` (with the Python version and machine),
+then compares each number with a previous run: ``--compare`` takes a commit
+or a results file, and defaults to the most recent other run.
+
+Metrics ending in ``_per_s`` are better when higher, every other metric
+(times, sizes, drops) when lower. Changes beyond ``--threshold`` percent are
+flagged.
+
+    python benchmarks/run.py                   # full suite, saved and compared
+    python benchmarks/run.py --quick           # smaller sizes, a few seconds
+    python benchmarks/run.py --only parser --only pipeline
+    python benchmarks/run.py --compare 3489201
+"""
+
+import io
+import sys
+import json
+import platform
+import argparse
+import importlib
+import subprocess
+import contextlib
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+
+RESULTS_DIR = BENCH_DIR / "results"
+
+# name -> (module, sizes for --quick)
+SUITE = {
+    'parser': ("bench_parser", {'count': 20000}),
+    'filters': ("bench_filters", {'count': 20000}),
+    'pipeline': ("bench_pipeline", {'count': 20000}),
+    'logging': ("bench_logging", {}),
+    'history': ("bench_history", {'count': 20000}),
+    'store': ("bench_store", {'samples': 20000}),
+    'export': ("bench_export", {'count': 10000}),
+}
+
+
+def git_revision():
+    """Short commit of the tree, with -dirty when it has local changes"""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=BENCH_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+    return commit + "-dirty" if dirty else commit
+
+
+def flatten(results, prefix=""):
+    """{'a': {'b': 1}} -> {'a.b': 1}, numbers only"""
+    flat = {}
+    for key, value in results.items():
+        key = str(key).lstrip(".")
+        name = "{}.{}".format(prefix, key) if prefix else key
+        if isinstance(value, dict):
+            flat.update(flatten(value, name))
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            flat[name] = value
+    return flat
+
+
+def run_suite(names, quick=False, verbose=False):
+    results = {}
+    for name in names:
+        module_name, quick_sizes = SUITE[name]
+        print("[{}]".format(name), flush=True)
+        output = io.StringIO()
+        try:
+            module = importlib.import_module(module_name)
+            with contextlib.redirect_stdout(sys.stdout if verbose else output):
+                results[name] = module.main(**(quick_sizes if quick else {})) or {}
+        except Exception as e:
+            print("  failed: {}".format(e))
+            continue
+        for key, value in sorted(flatten(results[name]).items()):
+            print("  {:<40} {:>14.4g}".format(key, value))
+    return results
+
+
+def load_reference(reference, revision):
+    """Results file for --compare: a path, a commit, or the latest other run"""
+    if reference:
+        path = Path(reference)
+        if not path.exists():
+            matches = sorted(RESULTS_DIR.glob("{}*.json".format(reference)))
+            if not matches:
+                raise SystemExit("No results for {} in {}".format(reference, RESULTS_DIR))
+            path = matches[-1]
+        return path
+    runs = sorted((p for p in RESULTS_DIR.glob("*.json") if p.stem != revision),
+                  key=lambda p: p.stat().st_mtime)
+    return runs[-1] if runs else None
+
+
+def compare(current, reference, threshold):
+    old = flatten(reference['results'])
+    print("\ncompared with {} ({})".format(reference['revision'], reference['date']))
+    regressions = 0
+    for key, value in sorted(flatten(current).items()):
+        if key not in old or not old[key]:
+            continue
+        change = (value - old[key]) / abs(old[key]) * 100
+        higher_is_better = key.endswith("_per_s")
+        worse = change < -threshold if higher_is_better else change > threshold
+        better = change > threshold if higher_is_better else change < -threshold
+        flag = "  << slower" if worse else ("  faster" if better else "")
+        regressions += worse
+        print("  {:<40} {:>12.4g} -> {:<12.4g} {:+7.1f}%{}".format(key, old[key], value, change, flag))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python benchmarks/run.py", description=__doc__.split("\n")[0])
+    parser.add_argument("--only", action="append", choices=list(SUITE), help="run only these benchmarks")
+    parser.add_argument("--quick", action="store_true", help="smaller sizes, for a quick check")
+    parser.add_argument("--compare", help="commit or results file to compare with")
+    parser.add_argument("--no-save", action="store_true", help="don't write the results file")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="percentage change reported as a regression")
+    parser.add_argument("--verbose", action="store_true", help="show each benchmark's own report")
+    args = parser.parse_args(argv)
+
+    revision = git_revision()
+    results = run_suite(args.only or list(SUITE), args.quick, args.verbose)
+    run = {
+        'revision': revision,
+        'date': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'machine': "{} {}".format(platform.system(), platform.machine()),
+        'quick': args.quick,
+        'results': results,
+    }
+
+    reference_path = load_reference(args.compare, revision)
+    regressions = 0
+    if reference_path:
+        reference = json.loads(reference_path.read_text(encoding='utf-8'))
+        if reference.get('quick') != args.quick:
+            print("\nnote: {} was a {} run".format(reference_path.name, "quick" if reference.get('quick') else "full"))
+        regressions = compare(results, reference, args.threshold)
+
+    if not args.no_save:
+        RESULTS_DIR.mkdir(exist_ok=True)
+        path = RESULTS_DIR / "{}.json".format(revision)
+        path.write_text(json.dumps(run, indent=2), encoding='utf-8')
+        print("\nresults saved to {}".format(path))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
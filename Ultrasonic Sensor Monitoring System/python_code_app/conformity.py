@@ -0,0 +1,123 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Part-based conformity decision.
+
+A PASS/FAIL is a property of a part, not of a sample. PartDetector watches
+the distance stream and follows each part through three phases:
+
+- arrival: the distance drops below ``presence_distance`` for
+  ``debounce_samples`` consecutive samples;
+- settling: the last ``settle_samples`` readings stay within
+  ``settle_tolerance`` and the part has been there for ``min_dwell`` seconds,
+  at which point exactly one decision is emitted;
+- departure: the distance rises above ``presence_distance + hysteresis`` for
+  ``debounce_samples`` consecutive samples.
+
+A part that leaves before it settles is still decided once, on the readings
+seen so far, and flagged as not settled.
+"""
+
+from collections import deque, namedtuple
+
+
+STATE_IDLE = "idle"
+STATE_SETTLING = "settling"
+STATE_DECIDED = "decided"
+
+Decision = namedtuple('Decision', ['distance', 'settle_time', 'samples', 'settled'])
+
+
+class PartDetector:
+    def __init__(self, presence_distance=80.0, hysteresis=5.0, debounce_samples=3,
+                 settle_samples=5, settle_tolerance=0.5, min_dwell=0.3):
+        self.presence_distance = presence_distance
+        self.hysteresis = hysteresis
+        self.debounce_samples = debounce_samples
+        self.settle_samples = settle_samples
+        self.settle_tolerance = settle_tolerance
+        self.min_dwell = min_dwell
+        self.reset()
+
+    def reset(self):
+        self.state = STATE_IDLE
+        self.pending = []
+        self.window = deque(maxlen=self.settle_samples)
+        self.arrival_time = None
+        self.samples = 0
+        self.parts = 0
+
+    @property
+    def present(self):
+        return self.state != STATE_IDLE
+
+    def is_present_reading(self, distance):
+        # Hysteresis: a present part only leaves beyond the wider limit
+        if self.present:
+            return distance <= self.presence_distance + self.hysteresis
+        return distance <= self.presence_distance
+
+    def update(self, distance, now):
+        """Feed one sample taken at time now (seconds); return a Decision or None"""
+        if self.is_present_reading(distance) != self.present:
+            # Debounce: the change must hold for N consecutive samples
+            self.pending.append((distance, now))
+            if len(self.pending) < self.debounce_samples:
+                return None
+            pending, self.pending = self.pending, []
+            if self.present:
+                return self.depart(pending[0][1])
+            self.arrive(pending)
+            return self.settle(now)
+
+        if self.pending:
+            # A short glitch: the readings belonged to the current state after all
+            pending, self.pending = self.pending, []
+            if self.state == STATE_SETTLING:
+                for value, _ in pending:
+                    self.add_sample(value)
+        if self.state == STATE_IDLE:
+            return None
+        if self.state == STATE_DECIDED:
+            self.samples += 1
+            return None
+        self.add_sample(distance)
+        return self.settle(now)
+
+    def arrive(self, pending):
+        self.state = STATE_SETTLING
+        self.window.clear()
+        self.arrival_time = pending[0][1]
+        self.samples = 0
+        for value, _ in pending:
+            self.add_sample(value)
+
+    def add_sample(self, distance):
+        self.window.append(distance)
+        self.samples += 1
+
+    def settle(self, now):
+        if len(self.window) < self.settle_samples:
+            return None
+        if max(self.window) - min(self.window) > self.settle_tolerance:
+            return None
+        if now - self.arrival_time < self.min_dwell:
+            return None
+        self.state = STATE_DECIDED
+        return self.decide(now, settled=True)
+
+    def depart(self, now):
+        decision = None
+        if self.state == STATE_SETTLING and self.window:
+            decision = self.decide(now, settled=False)
+        self.state = STATE_IDLE
+        self.window.clear()
+        return decision
+
+    def decide(self, now, settled):
+        self.parts += 1
+        return Decision(
+            distance=sum(self.window) / len(self.window),
+            settle_time=now - self.arrival_time,
+            samples=self.samples,
+            settled=settled
+        )
@@ -0,0 +1,332 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Streaming exporters for test results.
+
+Rows are produced one at a time, from the in-memory ResultHistory or from the
+persistent store, and written in buffered chunks, so an export never holds
+the whole session in memory twice. ExportJob runs an export on a worker
+thread, reports its progress and can be cancelled; a cancelled or failed
+export removes its partial file.
+
+Parquet, Arrow IPC, .npy and .npz are written straight from the columns of
+a ResultHistory, with no per-row objects. They need the optional pyarrow
+(Parquet, Arrow) and numpy (.npy, .npz) packages. Timestamps are epoch
+seconds; unknown settle times are NaN and unknown sample counts -1.
+"""
+
+import os
+import csv
+import json
+import threading
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+
+CSV_FIELDS = ['Timestamp', 'Result', 'Conforme', 'Distance_cm', 'Settle_ms', 'Samples', 'Station']
+
+# Rows between two progress reports / cancellation checks
+CHUNK_ROWS = 1000
+WRITE_BUFFER = 1024 * 1024
+
+# Rows per Parquet row group / Arrow record batch
+ROW_GROUP_SIZE = 65536
+PARQUET_COMPRESSION = 'zstd'
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def history_rows(history, start=0, stop=None):
+    """Export rows for a snapshot of a ResultHistory (results added later are left out)"""
+    stop = len(history) if stop is None else stop
+    for record in history.records(start, stop):
+        yield {
+            'timestamp': record['timestamp'],
+            'station': None,
+            'result': record['result'],
+            'conforme': record['conforme'],
+            'distance': record['distance'],
+            'settle_time': record['settle_time'],
+            'samples': record['samples'],
+        }
+
+
+def store_rows(store, start=None, end=None, station=None):
+    """Export rows read from a MeasurementStore; start/end are datetimes or None"""
+    start = start.timestamp() if start else None
+    end = end.timestamp() if end else None
+    for row in store.results(start, end, station):
+        yield {
+            'timestamp': datetime.fromtimestamp(row['timestamp']),
+            'station': row['station'],
+            'result': row['result'],
+            'conforme': bool(row['conforme']),
+            'distance': row['distance'],
+            'settle_time': row['settle_time'],
+            'samples': row['samples'],
+        }
+
+
+def json_row(row):
+    return {
+        'timestamp': row['timestamp'].isoformat(),
+        'station': row['station'],
+        'result': row['result'],
+        'conforme': row['conforme'],
+        'distance_cm': row['distance'],
+        'settle_time_s': row['settle_time'],
+        'samples': row['samples']
+    }
+
+
+def write_csv(f, rows, tick):
+    writer = csv.writer(f)
+    writer.writerow(CSV_FIELDS)
+    for row in rows:
+        settle_time = row['settle_time']
+        writer.writerow([
+            row['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
+            row['result'],
+            row['conforme'],
+            row['distance'],
+            '' if settle_time is None else round(settle_time * 1000),
+            row['samples'] or '',
+            row['station'] or ''
+        ])
+        tick()
+
+
+def write_jsonl(f, rows, tick):
+    for row in rows:
+        f.write(json.dumps(json_row(row), ensure_ascii=False))
+        f.write("\n")
+        tick()
+
+
+def json_writer(header):
+    """Write a JSON document: the header dict, then its 'tests' list streamed row by row"""
+    def write_json(f, rows, tick):
+        head = json.dumps(header, indent=2, ensure_ascii=False)
+        # Reopen the closing brace to append the streamed list
+        f.write(head[:-2] + ',\n  "tests": [' if header else '{\n  "tests": [')
+        separator = "\n    "
+        for row in rows:
+            f.write(separator)
+            f.write(json.dumps(json_row(row), ensure_ascii=False))
+            separator = ",\n    "
+            tick()
+        f.write("\n  ]\n}\n")
+    return write_json
+
+
+def history_columns(history, stop=None):
+    """Copy of the history columns up to stop: one memcpy per column, no records"""
+    # slice() copies all the columns under the history's lock
+    rows = history.slice(slice(0, stop))
+    return {
+        'timestamp': rows.timestamps,
+        'distance': rows.distances,
+        'conforme': rows.conforme,
+        'settle_time': rows.settle_times,
+        'samples': rows.sample_counts,
+        'settled': rows.settled,
+    }
+
+
+def require(module, name, extension):
+    if module is None:
+        raise ImportError("{} export needs the {} package (pip install {})".format(extension, name, name))
+
+
+def numpy_columns(columns):
+    """Zero-copy numpy views of the column buffers"""
+    return {
+        'timestamp': np.frombuffer(columns['timestamp'], dtype=np.float64),
+        'distance': np.frombuffer(columns['distance'], dtype=np.float64),
+        'conforme': np.frombuffer(columns['conforme'], dtype=np.bool_),
+        'settle_time': np.frombuffer(columns['settle_time'], dtype=np.float64),
+        'samples': np.frombuffer(columns['samples'], dtype=np.int32),
+        'settled': np.frombuffer(columns['settled'], dtype=np.bool_),
+    }
+
+
+def write_npy(path, columns, advance):
+    """(n, 2) float64 array: epoch timestamp, distance in cm"""
+    require(np, "numpy", ".npy")
+    arrays = numpy_columns(columns)
+    np.save(path, np.column_stack((arrays['timestamp'], arrays['distance'])))
+    advance(len(columns['timestamp']))
+
+
+def write_npz(path, columns, advance):
+    """One named array per column"""
+    require(np, "numpy", ".npz")
+    np.savez(path, **numpy_columns(columns))
+    advance(len(columns['timestamp']))
+
+
+def arrow_table(columns):
+    """Arrow table over the column buffers (no copy for the numeric columns)"""
+    count = len(columns['timestamp'])
+
+    def column(buffer, arrow_type):
+        return pa.Array.from_buffers(arrow_type, count, [None, pa.py_buffer(buffer)])
+
+    return pa.table({
+        'timestamp': column(columns['timestamp'], pa.float64()),
+        'distance': column(columns['distance'], pa.float64()),
+        'conforme': column(columns['conforme'], pa.uint8()).cast(pa.bool_()),
+        'settle_time': column(columns['settle_time'], pa.float64()),
+        'samples': column(columns['samples'], pa.int32()),
+        'settled': column(columns['settled'], pa.uint8()).cast(pa.bool_()),
+    })
+
+
+def write_parquet(path, columns, advance):
+    require(pa, "pyarrow", "Parquet")
+    table = arrow_table(columns)
+    with pq.ParquetWriter(path, table.schema, compression=PARQUET_COMPRESSION) as writer:
+        # One row group at a time, so progress and cancellation keep working
+        for offset in range(0, table.num_rows, ROW_GROUP_SIZE):
+            part = table.slice(offset, ROW_GROUP_SIZE)
+            writer.write_table(part, row_group_size=ROW_GROUP_SIZE)
+            advance(part.num_rows)
+
+
+def write_arrow(path, columns, advance):
+    require(pa, "pyarrow", "Arrow")
+    table = arrow_table(columns)
+    with pa.OSFile(str(path), 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        for batch in table.to_batches(max_chunksize=ROW_GROUP_SIZE):
+            writer.write_batch(batch)
+            advance(batch.num_rows)
+
+
+COLUMNAR_WRITERS = {
+    '.parquet': write_parquet,
+    '.arrow': write_arrow,
+    '.feather': write_arrow,
+    '.npy': write_npy,
+    '.npz': write_npz,
+}
+
+
+def extension_of(path):
+    return os.path.splitext(str(path))[1].lower()
+
+
+def is_columnar(path):
+    return extension_of(path) in COLUMNAR_WRITERS
+
+
+def writer_for(path, header=None, columnar=False):
+    """Pick the writer from the file extension, within the family the caller's data fits.
+
+    Row exports (columnar=False) write .csv, .jsonl or JSON for any other
+    extension; column exports write one of COLUMNAR_WRITERS. An extension
+    of the other family raises ValueError, before any file is opened.
+    """
+    extension = extension_of(path)
+    if columnar:
+        if extension not in COLUMNAR_WRITERS:
+            raise ValueError("{} is not a columnar format; choose one of: {}".format(
+                extension or "No extension", ", ".join(sorted(COLUMNAR_WRITERS))))
+        return COLUMNAR_WRITERS[extension]
+    if extension in COLUMNAR_WRITERS:
+        raise ValueError("{} is a columnar format; choose one of: .csv, .jsonl, .json".format(extension))
+    if extension == '.csv':
+        return write_csv
+    if extension in ('.jsonl', '.ndjson'):
+        return write_jsonl
+    return json_writer(header or {})
+
+
+class ExportJob:
+    """Run one export on a worker thread; poll done/progress from the GUI.
+
+    Text writers get an open file and call tick() per row; columnar writers
+    (text=False) get the path and the columns and call advance(count).
+    """
+
+    def __init__(self, path, rows, total, writer, text=True):
+        self.path = path
+        self.rows = rows
+        self.total = total
+        self.writer = writer
+        self.text = text
+        self.written = 0
+        self.error = None
+        self.cancelled = False
+        self.cancel_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    @property
+    def progress(self):
+        """Fraction written, 0.0 to 1.0 (1.0 if the total is unknown and done)"""
+        if not self.total:
+            return 1.0 if self.done else 0.0
+        return min(1.0, self.written / self.total)
+
+    def tick(self):
+        self.written += 1
+        if self.written % CHUNK_ROWS == 0 and self.cancel_event.is_set():
+            raise ExportCancelled()
+
+    def advance(self, count):
+        self.written += count
+        if self.cancel_event.is_set():
+            raise ExportCancelled()
+
+    def run(self):
+        try:
+            if self.text:
+                with open(self.path, 'w', newline='', encoding='utf-8', buffering=WRITE_BUFFER) as f:
+                    self.writer(f, self.rows, self.tick)
+            else:
+                self.writer(self.path, self.rows, self.advance)
+        except ExportCancelled:
+            self.cancelled = True
+        except Exception as e:
+            self.error = e
+        if self.cancelled or self.error:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+
+
+def export(path, rows, total=None, header=None, columnar=None):
+    """Write rows (or columns, columnar=True) to path, format from its extension (blocking).
+
+    columnar=None takes the family from the extension.
+    """
+    if columnar is None:
+        columnar = is_columnar(path)
+    job = ExportJob(path, rows, total, writer_for(path, header, columnar), text=not columnar)
+    job.run()
+    if job.error:
+        raise job.error
+    return job.written
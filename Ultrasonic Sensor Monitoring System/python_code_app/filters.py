@@ -0,0 +1,191 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Signal filters for raw HC-SR04 readings.
+
+The sensor returns 0 cm when pulseIn times out and the odd multipath
+outlier. A filter pipeline sits between parsing and the conformity decision:
+the engine hands it every sample decoded from one serial chunk at once, and
+each stage processes the whole batch in a single loop with its state kept in
+locals. Stages return the values they keep, so rejecting a sample is just
+leaving it out.
+
+Stages:
+
+- DropoutFilter: drop readings outside the sensor's valid range (0 cm echo
+  timeouts, beyond 400 cm);
+- MADFilter: drop outliers more than ``threshold`` robust standard
+  deviations (1.4826 * median absolute deviation) from the rolling median
+  (a Hampel filter);
+- MedianFilter: rolling median;
+- EMAFilter: exponential moving average;
+- KalmanFilter: 1-D constant-position Kalman filter.
+"""
+
+import bisect
+from collections import deque
+
+
+class DropoutFilter:
+    def __init__(self, minimum=2.0, maximum=400.0):
+        self.minimum = minimum
+        self.maximum = maximum
+
+    def process(self, values):
+        minimum, maximum = self.minimum, self.maximum
+        return [value for value in values if minimum <= value <= maximum]
+
+    def reset(self):
+        pass
+
+
+class MedianFilter:
+    """Rolling median over the last ``size`` readings (sorted window, bisect updates)"""
+
+    def __init__(self, size=5):
+        self.size = size
+        self.reset()
+
+    def reset(self):
+        self.window = deque()
+        self.ordered = []
+
+    def process(self, values):
+        window, ordered, size = self.window, self.ordered, self.size
+        insort, index = bisect.insort, bisect.bisect_left
+        out = []
+        for value in values:
+            window.append(value)
+            insort(ordered, value)
+            if len(window) > size:
+                del ordered[index(ordered, window.popleft())]
+            out.append(ordered[len(ordered) // 2])
+        return out
+
+
+class EMAFilter:
+    def __init__(self, alpha=0.3):
+        self.alpha = alpha
+        self.reset()
+
+    def reset(self):
+        self.value = None
+
+    def process(self, values):
+        alpha, value = self.alpha, self.value
+        out = []
+        for sample in values:
+            value = sample if value is None else value + alpha * (sample - value)
+            out.append(value)
+        self.value = value
+        return out
+
+
+class KalmanFilter:
+    """1-D Kalman filter for a distance that is constant between parts"""
+
+    def __init__(self, process_variance=0.05, measurement_variance=0.5):
+        self.process_variance = process_variance
+        self.measurement_variance = measurement_variance
+        self.reset()
+
+    def reset(self):
+        self.estimate = None
+        self.error = 1.0
+
+    def process(self, values):
+        q, r = self.process_variance, self.measurement_variance
+        estimate, error = self.estimate, self.error
+        out = []
+        for sample in values:
+            if estimate is None:
+                estimate = sample
+            else:
+                error += q
+                gain = error / (error + r)
+                estimate += gain * (sample - estimate)
+                error *= 1 - gain
+            out.append(estimate)
+        self.estimate, self.error = estimate, error
+        return out
+
+
+class MADFilter:
+    """Hampel filter: reject readings far from the median of the last ``size`` readings.
+
+    Rejected readings stay in the window, so when a new part arrives the
+    median follows the step after ``size // 2`` samples instead of locking
+    onto the previous distance.
+    """
+
+    def __init__(self, size=15, threshold=3.5, min_deviation=0.2):
+        self.size = size
+        self.threshold = threshold
+        # Floor on the robust deviation so a perfectly steady part doesn't
+        # make every millimetre of noise an outlier
+        self.min_deviation = min_deviation
+        self.reset()
+
+    def reset(self):
+        self.window = deque()
+        self.ordered = []
+
+    def process(self, values):
+        window, ordered, size = self.window, self.ordered, self.size
+        threshold, floor = self.threshold, self.min_deviation
+        insort, index = bisect.insort, bisect.bisect_left
+        warmup = max(3, size // 2)
+        out = []
+        for value in values:
+            count = len(ordered)
+            if count < warmup:
+                out.append(value)
+            else:
+                median = ordered[count // 2]
+                deviations = sorted([abs(x - median) for x in ordered])
+                spread = max(floor, 1.4826 * deviations[count // 2])
+                if abs(value - median) <= threshold * spread:
+                    out.append(value)
+            window.append(value)
+            insort(ordered, value)
+            if len(window) > size:
+                del ordered[index(ordered, window.popleft())]
+        return out
+
+
+class FilterPipeline:
+    def __init__(self, stages, name=None):
+        self.stages = list(stages)
+        self.name = name
+
+    def process(self, values):
+        """Run a batch through every stage; return the values that survived"""
+        for stage in self.stages:
+            if not values:
+                break
+            values = stage.process(values)
+        return values
+
+    def reset(self):
+        for stage in self.stages:
+            stage.reset()
+
+
+# Filters selectable in the Settings tab and on the command line
+FILTERS = {
+    "none": lambda: [],
+    "median": lambda: [DropoutFilter(), MedianFilter()],
+    "ema": lambda: [DropoutFilter(), EMAFilter()],
+    "kalman": lambda: [DropoutFilter(), KalmanFilter()],
+    "mad": lambda: [DropoutFilter(), MADFilter()],
+    "mad+median": lambda: [DropoutFilter(), MADFilter(), MedianFilter()],
+}
+
+
+def build_filter(name):
+    """Return a FilterPipeline for one of FILTERS, or None for the raw signal"""
+    if name not in FILTERS:
+        raise ValueError("Unknown filter: {} (choose from {})".format(name, ", ".join(FILTERS)))
+    stages = FILTERS[name]()
+    if not stages:
+        return None
+    return FilterPipeline(stages, name)
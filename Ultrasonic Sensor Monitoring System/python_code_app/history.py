@@ -0,0 +1,150 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Compact, column-oriented test history.
+
+A result used to be a dict holding a datetime, a string, a bool and a few
+numbers: 400+ bytes each once the objects are counted. ResultHistory keeps
+one typed array per field instead (about 30 bytes per result), appends in
+O(1), slices without building dicts, and computes its summaries with the C
+loops of array/bytearray. Indexing still returns the familiar record dict,
+built on demand, so code that shows a handful of rows does not change.
+
+The reader thread appends while the Tk thread and the export worker read,
+so append, clear and every copy out (slice, records, indexing) hold a lock:
+a reader never sees a row with some columns written and others not.
+"""
+
+import math
+import threading
+from array import array
+from datetime import datetime
+
+
+# Stored in place of None for the optional fields
+NO_SETTLE_TIME = math.nan
+NO_SAMPLES = -1
+
+# Rows copied out per lock hold when iterating records
+RECORD_CHUNK = 4096
+
+
+class ResultHistory:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset_columns()
+
+    def reset_columns(self):
+        self.timestamps = array('d')     # epoch seconds
+        self.distances = array('d')      # cm
+        self.conforme = bytearray()      # 1 = PASS, 0 = FAIL
+        self.settle_times = array('d')   # seconds, NaN if unknown
+        self.sample_counts = array('i')  # -1 if unknown
+        self.settled = bytearray()
+        self.pass_count = 0
+
+    def append(self, timestamp, conforme, distance, settle_time=None, samples=None, settled=True):
+        """Add one result; timestamp is a datetime or epoch seconds"""
+        if isinstance(timestamp, datetime):
+            timestamp = timestamp.timestamp()
+        with self.lock:
+            self.distances.append(distance)
+            self.conforme.append(1 if conforme else 0)
+            self.settle_times.append(NO_SETTLE_TIME if settle_time is None else settle_time)
+            self.sample_counts.append(NO_SAMPLES if samples is None else samples)
+            self.settled.append(1 if settled else 0)
+            if conforme:
+                self.pass_count += 1
+            # Last: len() counts timestamps, so it only ever covers complete rows
+            self.timestamps.append(timestamp)
+
+    def clear(self):
+        with self.lock:
+            self.reset_columns()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    def __bool__(self):
+        return len(self.timestamps) > 0
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self.slice(index)
+        with self.lock:
+            if index < 0:
+                index += len(self.timestamps)
+            return self.record(index)
+
+    def __iter__(self):
+        return self.records()
+
+    def record(self, i):
+        """Return result i as a dict, the shape the rest of the code works with"""
+        settle_time = self.settle_times[i]
+        samples = self.sample_counts[i]
+        conforme = bool(self.conforme[i])
+        return {
+            'timestamp': datetime.fromtimestamp(self.timestamps[i]),
+            'result': "PASS" if conforme else "FAIL",
+            'conforme': conforme,
+            'distance': self.distances[i],
+            'settle_time': None if math.isnan(settle_time) else settle_time,
+            'samples': None if samples == NO_SAMPLES else samples,
+            'settled': bool(self.settled[i])
+        }
+
+    def records(self, start=0, stop=None):
+        """Yield record dicts one at a time, oldest first.
+
+        Rows are copied out RECORD_CHUNK at a time; a clear() meanwhile ends
+        the iteration early instead of raising.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        for first in range(start, stop, RECORD_CHUNK):
+            part = self.slice(slice(first, min(stop, first + RECORD_CHUNK)))
+            for i in range(len(part)):
+                yield part.record(i)
+            if len(part) < min(stop - first, RECORD_CHUNK):
+                return
+
+    def slice(self, index):
+        """Consistent copy of the rows in a slice, as a new ResultHistory"""
+        part = ResultHistory()
+        with self.lock:
+            part.timestamps = self.timestamps[index]
+            part.distances = self.distances[index]
+            part.conforme = self.conforme[index]
+            part.settle_times = self.settle_times[index]
+            part.sample_counts = self.sample_counts[index]
+            part.settled = self.settled[index]
+        part.pass_count = part.conforme.count(1)
+        return part
+
+    # Summaries
+    @property
+    def fail_count(self):
+        return len(self) - self.pass_count
+
+    def summary(self):
+        with self.lock:
+            total = len(self.timestamps)
+            passed = self.pass_count
+            distances = self.distances[:total]
+        if not total:
+            return {'total': 0, 'pass': 0, 'fail': 0, 'success_rate': 0,
+                    'min_distance': None, 'max_distance': None, 'avg_distance': None}
+        return {
+            'total': total,
+            'pass': passed,
+            'fail': total - passed,
+            'success_rate': passed / total * 100,
+            'min_distance': min(distances),
+            'max_distance': max(distances),
+            'avg_distance': math.fsum(distances) / total,
+        }
+
+    def nbytes(self):
+        """Bytes used by the column buffers"""
+        return sum(column.itemsize * len(column) for column in
+                   (self.timestamps, self.distances, self.settle_times, self.sample_counts)) \
+            + len(self.conforme) + len(self.settled)
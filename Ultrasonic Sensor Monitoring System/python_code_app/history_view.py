@@ -0,0 +1,225 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Virtualized test history table for the Statistics tab.
+
+The Treeview only ever holds the handful of rows that fit on screen; they are
+rewritten in place from HistoryModel whenever the user scrolls, filters or
+sorts. The model maps view positions to records without copying them, so a
+session of a million results scrolls as fast as one of ten.
+"""
+
+import bisect
+from tkinter import ttk
+import customtkinter as ctk
+
+
+SORT_NEWEST = "newest"
+SORT_DISTANCE_ASC = "distance_asc"
+SORT_DISTANCE_DESC = "distance_desc"
+
+COLUMNS = ('🕐 Time', '✅ Result', '📏 Distance', '⏱️ Duration')
+
+
+class HistoryModel:
+    """View order over a ResultHistory: filter by PASS/FAIL, sort by distance"""
+
+    def __init__(self, get_records):
+        self.get_records = get_records
+        self.result_filter = None
+        self.sort_key = SORT_NEWEST
+        self.invalidate()
+
+    def invalidate(self):
+        # Ascending record indices (newest first view) or (distance, index) pairs (sorted view)
+        self.index = []
+        self.indexed = 0
+
+    def set_filter(self, result_filter):
+        """result_filter: None for all results, True for PASS only, False for FAIL only"""
+        self.result_filter = result_filter
+        self.invalidate()
+
+    def set_sort(self, sort_key):
+        self.sort_key = sort_key
+        self.invalidate()
+
+    @property
+    def identity(self):
+        return self.result_filter is None and self.sort_key == SORT_NEWEST
+
+    def sync(self):
+        """Index the records appended since the last call"""
+        records = self.get_records()
+        total = len(records)
+        if total < self.indexed:
+            # The history was reset
+            self.invalidate()
+        if self.identity or total == self.indexed:
+            self.indexed = total
+            return
+
+        # Copy of the new rows' columns only (taken under the history's lock);
+        # no record dicts are built for indexing
+        base = self.indexed
+        added = records.slice(slice(base, total))
+        total = base + len(added)
+        conforme = added.conforme
+        distances = added.distances
+        if self.result_filter is None:
+            new = range(base, total)
+        else:
+            wanted = 1 if self.result_filter else 0
+            new = [i for i in range(base, total) if conforme[i - base] == wanted]
+        if self.sort_key == SORT_NEWEST:
+            self.index.extend(new)
+        elif base == 0:
+            self.index = sorted((distances[i - base], i) for i in new)
+        else:
+            for i in new:
+                bisect.insort(self.index, (distances[i - base], i))
+        self.indexed = total
+
+    def __len__(self):
+        if self.identity:
+            return len(self.get_records())
+        return len(self.index)
+
+    def record_index(self, position):
+        """Return the record index shown at a view position"""
+        if self.identity:
+            return len(self.get_records()) - 1 - position
+        if self.sort_key == SORT_NEWEST:
+            return self.index[len(self.index) - 1 - position]
+        if self.sort_key == SORT_DISTANCE_DESC:
+            return self.index[len(self.index) - 1 - position][1]
+        return self.index[position][1]
+
+    def window(self, first, count):
+        """Return (record number, record) pairs for count positions from first"""
+        records = self.get_records()
+        last = min(first + count, len(self))
+        rows = []
+        for position in range(first, last):
+            i = self.record_index(position)
+            rows.append((i + 1, records[i]))
+        return rows
+
+
+class HistoryView:
+    """Fixed-height Treeview whose rows are recycled as the user scrolls"""
+
+    def __init__(self, parent, get_records, height=12, style="Custom.Treeview"):
+        self.model = HistoryModel(get_records)
+        self.height = height
+        self.first = 0
+
+        self.tree = ttk.Treeview(
+            parent,
+            columns=COLUMNS,
+            show='headings',
+            height=height,
+            style=style,
+            selectmode='browse'
+        )
+
+        # Configure column headings and widths
+        self.tree.heading('🕐 Time', text='🕐 Time', anchor='center')
+        self.tree.heading('✅ Result', text='✅ Result', anchor='center')
+        self.tree.heading('📏 Distance', text='📏 Distance (cm)', anchor='center',
+                          command=self.toggle_distance_sort)
+        self.tree.heading('⏱️ Duration', text='⏱️ Settle (ms)', anchor='center')
+
+        self.tree.column('🕐 Time', width=120, anchor='center')
+        self.tree.column('✅ Result', width=150, anchor='center')
+        self.tree.column('📏 Distance', width=120, anchor='center')
+        self.tree.column('⏱️ Duration', width=120, anchor='center')
+
+        # The only row widgets that will ever exist
+        self.row_ids = [self.tree.insert('', 'end', values=('', '', '', '')) for _ in range(height)]
+
+        self.scrollbar = ctk.CTkScrollbar(
+            parent,
+            orientation="vertical",
+            command=self.on_scrollbar
+        )
+
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.tree.bind(sequence, self.on_mousewheel)
+
+    def pack(self):
+        self.tree.pack(side="left", fill="both", expand=True, padx=10, pady=10)
+        self.scrollbar.pack(side="right", fill="y", pady=10, padx=(0, 10))
+
+    # Model controls
+    def set_filter(self, result_filter):
+        self.model.set_filter(result_filter)
+        self.first = 0
+        self.refresh()
+
+    def set_sort(self, sort_key):
+        self.model.set_sort(sort_key)
+        self.first = 0
+        self.refresh()
+
+    def toggle_distance_sort(self):
+        if self.model.sort_key == SORT_DISTANCE_ASC:
+            self.set_sort(SORT_DISTANCE_DESC)
+        elif self.model.sort_key == SORT_DISTANCE_DESC:
+            self.set_sort(SORT_NEWEST)
+        else:
+            self.set_sort(SORT_DISTANCE_ASC)
+
+    def reset(self):
+        self.model.invalidate()
+        self.first = 0
+        self.refresh()
+
+    # Navigation
+    def jump_to(self, position):
+        """Show the given view position at the top of the table"""
+        self.first = max(0, min(int(position), len(self.model) - self.height))
+        self.refresh()
+
+    def jump_to_record(self, number):
+        """Show record number (1 = first recorded) in the unfiltered newest-first view"""
+        if not self.model.identity:
+            self.model.set_filter(None)
+            self.model.set_sort(SORT_NEWEST)
+        self.jump_to(len(self.model) - number)
+
+    def on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self.jump_to(float(args[0]) * len(self.model))
+        elif action == "scroll":
+            amount = int(args[0]) * (self.height if args[1] == "pages" else 1)
+            self.jump_to(self.first + amount)
+
+    def on_mousewheel(self, event):
+        if getattr(event, 'num', None) == 4 or getattr(event, 'delta', 0) > 0:
+            self.jump_to(self.first - 3)
+        else:
+            self.jump_to(self.first + 3)
+        return "break"
+
+    # Rendering
+    def refresh(self):
+        """Re-index new records and rewrite the visible rows"""
+        self.model.sync()
+        total = len(self.model)
+        rows = self.model.window(self.first, self.height)
+
+        for row_id, (number, record) in zip(self.row_ids, rows):
+            settle_time = record.get('settle_time')
+            self.tree.item(row_id, values=(
+                record['timestamp'].strftime("%H:%M:%S"),
+                "✅ PASS" if record['conforme'] else "❌ FAIL",
+                f"{record['distance']:.1f}",
+                "--" if settle_time is None else "{:.0f}".format(settle_time * 1000)
+            ))
+        for row_id in self.row_ids[len(rows):]:
+            self.tree.item(row_id, values=('', '', '', ''))
+
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
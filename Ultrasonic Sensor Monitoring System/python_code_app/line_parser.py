@@ -0,0 +1,96 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Parser for the text lines sent by code_arduino.ino.
+
+Every line format is one alternative of a single precompiled pattern, so a
+line is classified by one anchored match instead of a chain of startswith
+checks and regexes compiled on the fly. The alternative that matched gives
+the line kind (``match.lastgroup``) and LINE_KINDS turns its groups into a
+value. Lines that match none of them get one more search for a bare
+``<number> cm`` anywhere in the line, as the old parser did.
+
+parse_line(line) returns ``(kind, value, device_conforme)``:
+
+==============  ==========================  ==============================
+kind            line                        value
+==============  ==========================  ==============================
+distance        ``Distance:12.34cm,         distance in cm; device_conforme
+                Statut:Conforme``,          is the firmware's own verdict
+                ``DIST:12.3``, ``12.3``     (None when it didn't send one)
+result          ``OK`` / ``NON``            True / False
+ack_binary      ``ACK:BIN[:115200]``        new baudrate or None
+ack_rate        ``ACK:RATE:10``             rate in Hz
+ack_text        ``ACK:TXT``                 None
+text            anything else               the line
+==============  ==========================  ==============================
+"""
+
+import re
+
+
+KIND_DISTANCE = "distance"
+KIND_RESULT = "result"
+KIND_ACK_BINARY = "ack_binary"
+KIND_ACK_RATE = "ack_rate"
+KIND_ACK_TEXT = "ack_text"
+KIND_TEXT = "text"
+
+NUMBER = r'-?(?:\d+\.?\d*|\.\d+)'
+
+# One named alternative per line format, in order of frequency
+LINE_PATTERN = re.compile(r"""
+    (?P<status_line>Distance:\s*(?P<status_distance>{n})\s*cm
+        (?:\s*,\s*Statut:\s*(?P<status>Non\s+Conforme|Conforme))?.*)
+  | (?P<dist_line>DIST:\s*(?P<dist>{n}))
+  | (?P<number_line>(?P<number>{n}))
+  | (?P<ok_line>OK)
+  | (?P<non_line>NON)
+  | (?P<ack_binary_line>ACK:BIN(?::(?P<baudrate>\d+))?)
+  | (?P<ack_rate_line>ACK:RATE:(?P<rate>\d+))
+  | (?P<ack_text_line>ACK:TXT)
+""".format(n=NUMBER), re.VERBOSE | re.IGNORECASE)
+
+FALLBACK_PATTERN = re.compile(r'(\d+\.?\d*)\s*cm', re.IGNORECASE)
+
+
+# Firmware verdict, keyed by the status token lowercased with its spaces collapsed
+STATUS_TOKENS = {
+    'conforme': True,
+    'non conforme': False,
+}
+
+
+def _status_line(match):
+    status = match.group('status')
+    if status is None:
+        return KIND_DISTANCE, float(match.group('status_distance')), None
+    device_conforme = STATUS_TOKENS.get(" ".join(status.split()).lower())
+    if device_conforme is None:
+        # A verdict we cannot read is not guessed at: the line is a miss
+        return KIND_TEXT, match.string, None
+    return KIND_DISTANCE, float(match.group('status_distance')), device_conforme
+
+
+# Alternative name -> (kind, value, device_conforme) builder
+LINE_KINDS = {
+    'status_line': _status_line,
+    'dist_line': lambda m: (KIND_DISTANCE, float(m.group('dist')), None),
+    'number_line': lambda m: (KIND_DISTANCE, float(m.group('number')), None),
+    'ok_line': lambda m: (KIND_RESULT, True, None),
+    'non_line': lambda m: (KIND_RESULT, False, None),
+    'ack_binary_line': lambda m: (KIND_ACK_BINARY, m.group('baudrate') and int(m.group('baudrate')), None),
+    'ack_rate_line': lambda m: (KIND_ACK_RATE, int(m.group('rate')), None),
+    'ack_text_line': lambda m: (KIND_ACK_TEXT, None, None),
+}
+
+
+def parse_line(line, match=LINE_PATTERN.fullmatch, search=FALLBACK_PATTERN.search,
+               kinds=LINE_KINDS):
+    """Classify one stripped text line; return (kind, value, device_conforme)"""
+    m = match(line)
+    if m is not None:
+        return kinds[m.lastgroup](m)
+    m = search(line)
+    if m is not None:
+        return KIND_DISTANCE, float(m.group(1)), None
+    return KIND_TEXT, line, None
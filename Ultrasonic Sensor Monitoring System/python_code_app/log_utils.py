@@ -0,0 +1,111 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Logging helpers: emoji-free formatting, rotating file handler factory and
+per-category rate limiting."""
+
+import re
+import time
+import threading
+import logging
+import logging.handlers
+
+
+# Compiled once: emoji ranges plus the icons used by the GUI messages
+EMOJI_PATTERN = re.compile("["
+    "\U0001F600-\U0001F64F"  # emoticons
+    "\U0001F300-\U0001F5FF"  # symbols & pictographs
+    "\U0001F680-\U0001F6FF"  # transport & map symbols
+    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
+    "\U00002702-\U000027B0"
+    "\U000024C2-\U0001F251"
+    "⚠️⚡🔧🎉📏🔄✅❌🧪📊🔌📡📤💾🗑️📋📁📚ℹ️📅⏱️🚀🎯🛠️🎨📱🔵🟣🟡🔵🟢🔴📜🔔🔊🌙🕐"
+    "]+", flags=re.UNICODE)
+
+# Log console categories that map to a logging level other than INFO
+CATEGORY_LEVELS = {
+    'warning': logging.WARNING,
+    'error': logging.ERROR,
+}
+
+
+def strip_emoji(text):
+    """Remove emoji characters for logging; the regex only runs as a last resort"""
+    if text.isascii():
+        return text.strip()
+    # GUI messages are "<icon> <text>": drop the icon, keep ASCII text as is
+    icon, _, rest = text.partition(' ')
+    if rest.isascii() and not any(c.isalnum() for c in icon):
+        return rest.strip()
+    return EMOJI_PATTERN.sub('', text).strip()
+
+
+class UnicodeFormatter(logging.Formatter):
+    """Formatter that strips emoji characters to avoid encoding issues on Windows consoles"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cached_second = None
+        self.cached_time = None
+
+    def formatTime(self, record, datefmt=None):
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        # strftime once per second; only the milliseconds change between records
+        second = int(record.created)
+        if second != self.cached_second:
+            self.cached_second = second
+            self.cached_time = time.strftime(self.default_time_format, self.converter(record.created))
+        return self.default_msec_format % (self.cached_time, record.msecs)
+
+    def format(self, record):
+        msg = super().format(record)
+        if msg.isascii():
+            return msg
+        return EMOJI_PATTERN.sub('', msg)
+
+
+def build_log_file_handler(path, max_bytes=5 * 1024 * 1024, backup_count=5, when=None):
+    """Rotate by size, or by time when ``when`` is given (e.g. "midnight")"""
+    if when:
+        return logging.handlers.TimedRotatingFileHandler(
+            path, when=when, backupCount=backup_count, encoding='utf-8')
+    return logging.handlers.RotatingFileHandler(
+        path, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+
+
+class CategoryRateLimiter:
+    """Token bucket per log category; lines over the budget are counted, not shown.
+
+    rates maps a category to (lines per second, burst). Categories that are
+    not listed are never limited, so errors always get through.
+    """
+
+    def __init__(self, rates):
+        self.rates = dict(rates)
+        self.buckets = {}
+        self.suppressed = {}
+        self.total_suppressed = 0
+        self.lock = threading.Lock()
+
+    def allow(self, category):
+        rate = self.rates.get(category)
+        if rate is None:
+            return True
+        per_second, burst = rate
+        now = time.monotonic()
+        with self.lock:
+            tokens, last = self.buckets.get(category, (burst, now))
+            tokens = min(burst, tokens + (now - last) * per_second)
+            if tokens >= 1:
+                self.buckets[category] = (tokens - 1, now)
+                return True
+            self.buckets[category] = (tokens, now)
+            self.suppressed[category] = self.suppressed.get(category, 0) + 1
+            self.total_suppressed += 1
+            return False
+
+    def take_suppressed(self):
+        """Return and reset the per-category counts suppressed since the last call"""
+        with self.lock:
+            suppressed, self.suppressed = self.suppressed, {}
+        return suppressed
@@ -0,0 +1,160 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Watchdog for the Tk event loop.
+
+Everything the GUI does (refresh ticks, the clock, timers, status resets)
+runs as callbacks on the single Tk loop, so one slow callback delays all of
+them. The watchdog measures that delay with a heartbeat: a callback
+scheduled every ``interval_ms`` that records how late it actually ran.
+
+It also times every callback scheduled through ``root.after`` (install()
+wraps it) and keeps the slowest ones, so a stall can be traced to the code
+that caused it.
+
+When the smoothed lag stays over ``threshold_ms`` the watchdog reports the
+loop as degraded through ``on_change(True)``; the GUI then refreshes less
+often and logs less. It reports recovery once the lag has stayed under half
+the threshold for ``recover_seconds``.
+"""
+
+import time
+import heapq
+from serial_reader import LatencyRecorder
+
+
+def callback_name(func):
+    name = getattr(func, '__qualname__', None) or getattr(func, '__name__', None)
+    return name or repr(func)
+
+
+class LoopWatchdog:
+    def __init__(self, root, interval_ms=100, threshold_ms=250.0, recover_seconds=10.0,
+                 on_change=None, slowest=10, alpha=0.2):
+        self.root = root
+        self.interval_ms = interval_ms
+        self.threshold = threshold_ms / 1000
+        self.recover_seconds = recover_seconds
+        self.on_change = on_change
+        self.alpha = alpha
+
+        self.lag = LatencyRecorder(600)
+        self.last_lag = 0.0
+        self.smoothed_lag = 0.0
+        self.max_lag = 0.0
+        self.degraded = False
+        self.degraded_count = 0
+        self.calm_since = None
+        self.expected = None
+        self.running = False
+
+        # Slowest single runs as a min-heap of (seconds, time, name), and
+        # per-callback totals: name -> [count, total seconds, max seconds]
+        self.slowest_size = slowest
+        self.slowest = []
+        self.callbacks = {}
+        self.original_after = None
+
+    def install(self):
+        """Time every callback scheduled with root.after from now on"""
+        if self.original_after is None:
+            self.original_after = self.root.after
+            self.root.after = self.timed_after
+        return self
+
+    def timed_after(self, ms, func=None, *args):
+        if func is None:
+            return self.original_after(ms)
+
+        def timed(*call_args):
+            started = time.perf_counter()
+            try:
+                return func(*call_args)
+            finally:
+                self.record_callback(func, time.perf_counter() - started)
+
+        return self.original_after(ms, timed, *args)
+
+    def record_callback(self, func, elapsed):
+        name = callback_name(func)
+        stats = self.callbacks.get(name)
+        if stats is None:
+            stats = self.callbacks[name] = [0, 0.0, 0.0]
+        stats[0] += 1
+        stats[1] += elapsed
+        if elapsed > stats[2]:
+            stats[2] = elapsed
+
+        entry = (elapsed, time.time(), name)
+        if len(self.slowest) < self.slowest_size:
+            heapq.heappush(self.slowest, entry)
+        elif elapsed > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    def start(self):
+        self.running = True
+        self.expected = time.perf_counter() + self.interval_ms / 1000
+        self.schedule()
+        return self
+
+    def stop(self):
+        self.running = False
+
+    def schedule(self):
+        # The heartbeat itself is not timed as a callback
+        after = self.original_after or self.root.after
+        after(self.interval_ms, self.beat)
+
+    def beat(self):
+        if not self.running:
+            return
+        now = time.perf_counter()
+        lag = max(0.0, now - self.expected)
+        self.expected = now + self.interval_ms / 1000
+        self.schedule()
+
+        self.last_lag = lag
+        self.lag.add(lag)
+        if lag > self.max_lag:
+            self.max_lag = lag
+        self.smoothed_lag += self.alpha * (lag - self.smoothed_lag)
+        self.update_mode(now)
+
+    def update_mode(self, now):
+        if not self.degraded:
+            if self.smoothed_lag > self.threshold:
+                self.degraded = True
+                self.degraded_count += 1
+                self.calm_since = None
+                if self.on_change:
+                    self.on_change(True)
+            return
+
+        if self.smoothed_lag > self.threshold / 2:
+            self.calm_since = None
+        elif self.calm_since is None:
+            self.calm_since = now
+        elif now - self.calm_since >= self.recover_seconds:
+            self.degraded = False
+            self.calm_since = None
+            if self.on_change:
+                self.on_change(False)
+
+    @property
+    def lagging(self):
+        """True while the heartbeat runs late, before or during degraded mode"""
+        return self.degraded or self.smoothed_lag > self.threshold / 2
+
+    def slowest_callbacks(self):
+        """Slowest single runs, slowest first: [(seconds, time, name)]"""
+        return sorted(self.slowest, reverse=True)
+
+    def callback_summary(self, limit=10):
+        """Callbacks by worst run: [(name, count, mean ms, max ms)]"""
+        rows = sorted(self.callbacks.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+        return [(name, count, total / count * 1000, worst * 1000) for name, (count, total, worst) in rows]
+
+    def reset(self):
+        self.lag.reset()
+        self.max_lag = 0.0
+        self.slowest = []
+        self.callbacks = {}
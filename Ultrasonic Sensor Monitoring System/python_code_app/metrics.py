@@ -0,0 +1,295 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Prometheus / OpenMetrics metrics for the monitor.
+
+Nothing is updated on the reader thread beyond the plain counters the
+engine, decoder and latency recorders already keep (single writer, no
+locks). The registry reads them when a scrape or a textfile write asks for
+them, through collectors: callables returning MetricFamily objects.
+
+The metrics are served over HTTP (``/metrics``; OpenMetrics when the
+scraper asks for it, the Prometheus text format otherwise) and can be
+written periodically to a ``.prom`` file for node_exporter's textfile
+collector. The file is replaced atomically.
+
+    python -m acquisition --port COM3 --metrics-port 9105 --metrics-file /var/lib/node_exporter/ultrasonic.prom
+"""
+
+import os
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from serial_reader import LATENCY_BUCKETS
+
+
+PREFIX = "ultrasonic_"
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+
+COUNTER = "counter"
+GAUGE = "gauge"
+HISTOGRAM = "histogram"
+
+
+class MetricFamily:
+    def __init__(self, name, kind, help_text):
+        self.name = PREFIX + name
+        self.kind = kind
+        self.help = help_text
+        self.samples = []  # (suffix, labels, value)
+
+    def add(self, value, **labels):
+        self.samples.append(("_total" if self.kind == COUNTER else "", labels, value))
+        return self
+
+    def add_histogram(self, bounds, cumulative, total, count, **labels):
+        """bounds: bucket upper bounds; cumulative: counts per bound, plus +Inf last"""
+        for bound, value in zip(list(bounds) + [float("inf")], cumulative):
+            self.samples.append(("_bucket", dict(labels, le=format_value(bound)), value))
+        self.samples.append(("_sum", labels, total))
+        self.samples.append(("_count", labels, count))
+        return self
+
+
+def format_value(value):
+    if value is None:
+        return "NaN"
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, int):
+        return str(value)
+    if value == float("inf"):
+        return "+Inf"
+    if value == float("-inf"):
+        return "-Inf"
+    return repr(float(value))
+
+
+def escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def render(families, openmetrics=False):
+    lines = []
+    for family in families:
+        name = family.name
+        if openmetrics and family.kind == COUNTER:
+            # OpenMetrics names the family without the _total suffix
+            header = name
+        else:
+            header = name + "_total" if family.kind == COUNTER else name
+        lines.append("# HELP {} {}".format(header, escape(family.help)))
+        lines.append("# TYPE {} {}".format(header, family.kind))
+        for suffix, labels, value in family.samples:
+            label_text = ",".join('{}="{}"'.format(key, escape(label)) for key, label in labels.items())
+            lines.append("{}{}{} {}".format(name, suffix, "{" + label_text + "}" if label_text else "",
+                                            format_value(value)))
+    if openmetrics:
+        lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsRegistry:
+    def __init__(self, logger=None):
+        self.collectors = []
+        self.lock = threading.Lock()
+        self.logger = logger or logging.getLogger("metrics")
+
+    def register(self, collector):
+        with self.lock:
+            self.collectors.append(collector)
+        return collector
+
+    def unregister(self, collector):
+        with self.lock:
+            if collector in self.collectors:
+                self.collectors.remove(collector)
+
+    def collect(self):
+        """Run every collector; families with the same name are merged"""
+        with self.lock:
+            collectors = list(self.collectors)
+        families = {}
+        for collector in collectors:
+            try:
+                for family in collector():
+                    if family.name in families:
+                        families[family.name].samples.extend(family.samples)
+                    else:
+                        families[family.name] = family
+            except Exception as e:
+                self.logger.error("Metrics collector failed: {}".format(str(e)))
+        return list(families.values())
+
+    def render(self, openmetrics=False):
+        return render(self.collect(), openmetrics)
+
+
+# Collectors
+def engine_collector(engines):
+    """Metrics of AcquisitionEngine objects; engines is a list or a callable returning one"""
+    def collect():
+        current = engines() if callable(engines) else engines
+        received = MetricFamily("samples_received", COUNTER, "Distance samples parsed from the serial link")
+        out_of_range = MetricFamily("samples_out_of_range", COUNTER, "Samples outside 0-400 cm")
+        filtered = MetricFamily("samples_filtered", COUNTER, "Samples rejected by the signal filter")
+        dropouts = MetricFamily("dropouts", COUNTER, "Binary frames flagged no echo or out of range")
+        parse_errors = MetricFamily("parse_errors", COUNTER, "Text lines that failed to process")
+        crc_errors = MetricFamily("crc_errors", COUNTER, "Binary frames with a bad CRC")
+        lost_frames = MetricFamily("frames_lost", COUNTER, "Binary frames missing from the sequence")
+        overruns = MetricFamily("serial_overruns", COUNTER,
+                                "Receive buffer overruns (line longer than the decoder buffer)")
+        results = MetricFamily("results", COUNTER, "Part results by outcome")
+        connected = MetricFamily("connected", GAUGE, "1 when the serial link is open")
+        distance = MetricFamily("distance_cm", GAUGE, "Last accepted distance")
+        latency = MetricFamily("reader_latency_seconds", HISTOGRAM,
+                               "Byte arrival to end of processing, per serial chunk")
+
+        for engine in current:
+            station = str(engine.station or engine.port or "main")
+            decoder = engine.decoder
+            received.add(engine.samples_received, station=station)
+            out_of_range.add(engine.out_of_range, station=station)
+            filtered.add(engine.filtered_out, station=station)
+            dropouts.add(engine.dropouts, station=station)
+            parse_errors.add(engine.parse_errors, station=station)
+            crc_errors.add(decoder.crc_errors, station=station)
+            lost_frames.add(decoder.lost_frames, station=station)
+            overruns.add(decoder.overruns, station=station)
+            results.add(engine.conforme_count, station=station, result="PASS")
+            results.add(engine.non_conforme_count, station=station, result="FAIL")
+            connected.add(1 if engine.is_running else 0, station=station)
+            distance.add(engine.current_distance, station=station)
+            cumulative, total, count = engine.reader_latency.histogram()
+            latency.add_histogram(LATENCY_BUCKETS, cumulative, total, count, station=station)
+
+        return [received, out_of_range, filtered, dropouts, parse_errors, crc_errors, lost_frames,
+                overruns, results, connected, distance, latency]
+    return collect
+
+
+def supervisor_collector(supervisor):
+    def collect():
+        station = str(supervisor.engine.station or supervisor.engine.port or "main")
+        return [
+            MetricFamily("reconnects", COUNTER, "Links re-established after a loss").add(
+                supervisor.reconnects, station=station),
+            MetricFamily("connect_attempts", COUNTER, "Attempts to open the serial port").add(
+                supervisor.attempts, station=station),
+        ]
+    return collect
+
+
+def store_collector(store):
+    def collect():
+        return [
+            MetricFamily("store_rows_written", COUNTER, "Rows committed to the measurement store").add(
+                store.rows_written),
+            MetricFamily("store_rows_dropped", COUNTER, "Rows dropped because the store queue was full").add(
+                store.dropped),
+            MetricFamily("store_write_errors", COUNTER, "Failed store transactions").add(store.write_errors),
+            MetricFamily("store_queue_depth", GAUGE, "Rows waiting for the store writer").add(
+                store.rows.qsize()),
+        ]
+    return collect
+
+
+def queue_collector(queues):
+    """GUI hand-off buffers: {name: RingBuffer}"""
+    def collect():
+        depth = MetricFamily("gui_queue_depth", GAUGE, "Items waiting for the GUI refresh")
+        dropped = MetricFamily("gui_queue_dropped", COUNTER, "Items dropped because the GUI fell behind")
+        for name, buffer in queues.items():
+            depth.add(len(buffer), queue=name)
+            dropped.add(buffer.dropped_total, queue=name)
+        return [depth, dropped]
+    return collect
+
+
+def watchdog_collector(watchdog):
+    """Tk event-loop lag from a LoopWatchdog"""
+    def collect():
+        lag = MetricFamily("gui_loop_lag_seconds", HISTOGRAM, "How late the Tk event loop ran its heartbeat")
+        cumulative, total, count = watchdog.lag.histogram()
+        lag.add_histogram(LATENCY_BUCKETS, cumulative, total, count)
+        return [
+            lag,
+            MetricFamily("gui_degraded", GAUGE, "1 while the GUI runs in degraded mode").add(watchdog.degraded),
+            MetricFamily("gui_degraded_episodes", COUNTER, "Times the GUI switched to degraded mode").add(
+                watchdog.degraded_count),
+        ]
+    return collect
+
+
+# Outputs
+class MetricsServer:
+    """Serve the registry on http://host:port/metrics from a background thread"""
+
+    def __init__(self, registry, port=9105, host="127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] not in ("/metrics", "/"):
+                    handler.send_error(404)
+                    return
+                openmetrics = "application/openmetrics-text" in handler.headers.get("Accept", "")
+                body = registry.render(openmetrics).encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type",
+                                    OPENMETRICS_CONTENT_TYPE if openmetrics else PROMETHEUS_CONTENT_TYPE)
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def write_textfile(registry, path):
+    """Write the metrics for node_exporter's textfile collector (atomic replace)"""
+    temporary = "{}.{}.tmp".format(path, os.getpid())
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(registry.render())
+    os.replace(temporary, path)
+
+
+class TextfileWriter:
+    """Rewrite the textfile every ``interval`` seconds until closed"""
+
+    def __init__(self, registry, path, interval=15.0):
+        self.registry = registry
+        self.path = str(path)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self):
+        while True:
+            try:
+                write_textfile(self.registry, self.path)
+            except OSError as e:
+                self.registry.logger.error("Unable to write metrics to {}: {}".format(self.path, str(e)))
+            if self.stop_event.wait(self.interval):
+                break
+
+    def close(self):
+        self.stop_event.set()
+        self.thread.join(timeout=5)
+        # Last values on the way out
+        try:
+            write_textfile(self.registry, self.path)
+        except OSError:
+            pass
@@ -0,0 +1,169 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Live scrolling distance plot for the Statistics tab.
+
+Samples are folded into fixed time buckets as they arrive, keeping only the
+minimum and maximum of each bucket (min/max decimation). Every window length
+has its own decimator, updated in O(1) per sample, so a redraw only walks a
+constant number of buckets whether the window covers a minute or hours, and
+switching windows is instant.
+
+The canvas items are created once; a redraw only moves their coordinates,
+and redraws are capped at ``fps`` frames per second. The plot is fed from the
+GUI refresh tick, never from the reader thread.
+"""
+
+import time
+import tkinter as tk
+from collections import deque
+
+
+# Window lengths offered in the GUI (label, seconds)
+WINDOWS = [("1 min", 60), ("10 min", 600), ("1 h", 3600), ("4 h", 14400)]
+
+BUCKETS = 600
+
+
+class MinMaxDecimator:
+    """Per-bucket min/max of the samples of the last ``window`` seconds"""
+
+    def __init__(self, window, buckets=BUCKETS):
+        self.window = window
+        self.buckets = buckets
+        self.span = window / buckets
+        self.items = deque()  # [bucket index, min, max]
+
+    def add(self, timestamp, value):
+        index = int(timestamp // self.span)
+        if self.items and self.items[-1][0] == index:
+            bucket = self.items[-1]
+            if value < bucket[1]:
+                bucket[1] = value
+            elif value > bucket[2]:
+                bucket[2] = value
+            return
+        self.items.append([index, value, value])
+        oldest = index - self.buckets
+        while self.items[0][0] <= oldest:
+            self.items.popleft()
+
+    def clear(self):
+        self.items.clear()
+
+
+class DistancePlot:
+    def __init__(self, parent, height=220, fps=15, min_threshold=None, max_threshold=None,
+                 background="#1f2937"):
+        self.fps = fps
+        self.min_frame_interval = 1.0 / fps
+        self.last_frame = 0.0
+        self.dirty = True
+        self.width = 1
+        self.height = height
+        self.thresholds = (min_threshold, max_threshold)
+
+        self.decimators = {seconds: MinMaxDecimator(seconds) for _, seconds in WINDOWS}
+        self.window = WINDOWS[0][1]
+        self.last_value = None
+
+        self.canvas = tk.Canvas(parent, height=height, bg=background, highlightthickness=0)
+        self.canvas.bind("<Configure>", self.on_resize)
+
+        # Every item is created once and only moved afterwards
+        self.band = self.canvas.create_rectangle(0, 0, 0, 0, fill="#064e3b", outline="")
+        self.min_line = self.canvas.create_line(0, 0, 0, 0, fill="#10b981", dash=(4, 4))
+        self.max_line = self.canvas.create_line(0, 0, 0, 0, fill="#10b981", dash=(4, 4))
+        self.trace = self.canvas.create_line(0, 0, 0, 0, fill="#38bdf8", width=1)
+        self.top_label = self.canvas.create_text(6, 4, anchor="nw", fill="#94a3b8", font=("Segoe UI", 9))
+        self.bottom_label = self.canvas.create_text(6, height - 4, anchor="sw", fill="#94a3b8",
+                                                    font=("Segoe UI", 9))
+        self.window_label = self.canvas.create_text(0, height - 4, anchor="se", fill="#94a3b8",
+                                                    font=("Segoe UI", 9))
+
+    def pack(self, **kwargs):
+        self.canvas.pack(**kwargs)
+
+    def on_resize(self, event):
+        self.width = max(1, event.width)
+        self.height = max(1, event.height)
+        self.dirty = True
+
+    # Data
+    def add_samples(self, samples):
+        """samples: (monotonic time, distance) pairs"""
+        decimators = self.decimators.values()
+        for timestamp, value in samples:
+            for decimator in decimators:
+                decimator.add(timestamp, value)
+            self.last_value = value
+        if samples:
+            self.dirty = True
+
+    def set_window(self, seconds):
+        self.window = seconds
+        self.dirty = True
+
+    def set_thresholds(self, min_threshold, max_threshold):
+        self.thresholds = (min_threshold, max_threshold)
+        self.dirty = True
+
+    def clear(self):
+        for decimator in self.decimators.values():
+            decimator.clear()
+        self.last_value = None
+        self.dirty = True
+
+    # Rendering
+    def render(self, force=False):
+        """Redraw if the frame budget allows and something changed; return True if drawn"""
+        now = time.monotonic()
+        decimator = self.decimators[self.window]
+        buckets = decimator.items
+        # With data on screen the trace scrolls, so every frame changes
+        if not force and (now - self.last_frame < self.min_frame_interval or not (self.dirty or buckets)):
+            return False
+        self.last_frame = now
+        self.dirty = False
+
+        low_threshold, high_threshold = self.thresholds
+
+        # Vertical range: data and thresholds, with a little headroom
+        top = max((bucket[2] for bucket in buckets), default=0.0)
+        bottom = min((bucket[1] for bucket in buckets), default=0.0)
+        if high_threshold is not None:
+            top = max(top, high_threshold)
+        if low_threshold is not None:
+            bottom = min(bottom, low_threshold)
+        margin = max(1.0, (top - bottom) * 0.1)
+        top += margin
+        bottom = max(0.0, bottom - margin)
+        scale = (self.height - 1) / (top - bottom)
+        width, height = self.width, self.height
+
+        def y(value):
+            return height - 1 - (value - bottom) * scale
+
+        if low_threshold is not None and high_threshold is not None:
+            self.canvas.coords(self.band, 0, y(high_threshold), width, y(low_threshold))
+            self.canvas.coords(self.min_line, 0, y(low_threshold), width, y(low_threshold))
+            self.canvas.coords(self.max_line, 0, y(high_threshold), width, y(high_threshold))
+
+        # Two points per bucket (min and max): the envelope of every sample
+        coords = []
+        span = decimator.span
+        x_scale = width / decimator.window
+        end = now - decimator.window
+        for index, low, high in buckets:
+            x = (index * span - end) * x_scale
+            coords.extend((x, y(low), x, y(high)))
+        if len(coords) < 4:
+            coords = [0, -10, 0, -10]
+        self.canvas.coords(self.trace, *coords)
+
+        self.canvas.itemconfigure(self.top_label, text="{:.0f} cm".format(top))
+        self.canvas.itemconfigure(self.bottom_label, text="{:.0f} cm".format(bottom))
+        self.canvas.coords(self.window_label, width - 6, height - 4)
+        label = next(name for name, seconds in WINDOWS if seconds == self.window)
+        current = "" if self.last_value is None else "  |  {:.1f} cm".format(self.last_value)
+        self.canvas.itemconfigure(self.window_label, text="last {}{}".format(label, current))
+        return True
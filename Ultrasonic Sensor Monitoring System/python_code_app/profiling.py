@@ -0,0 +1,146 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Timing spans around the pipeline stages, and on-demand profiler captures.
+
+Spans are off by default. A stage is instrumented with::
+
+    started = SPANS.start()
+    ...
+    if started:
+        SPANS.stop("engine.batch", started)
+
+When disabled, start() returns 0.0 after a single attribute check, so the
+cost is one call per stage. When enabled, each stage keeps a
+LatencyRecorder (bounded window for p50/p99, plus an all-time histogram).
+Stages are stopped from the reader, writer and Tk threads alike, so the
+recorders are only touched under the recorder's lock.
+
+Two profilers capture N seconds to a file for offline analysis:
+
+- SamplingProfiler: samples the stack of every thread (reader threads, the
+  Tk main loop, writers) every few ms and writes collapsed stacks
+  (``thread;module:function;... count``), the input of flamegraph.pl and
+  speedscope.
+- ProfileCapture: cProfile on the calling thread (the Tk thread in the
+  GUI) and writes a .prof file for pstats or snakeviz.
+"""
+
+import sys
+import time
+import cProfile
+import threading
+from collections import Counter
+import serial_reader
+
+
+class SpanRecorder:
+    def __init__(self, size=5000):
+        self.enabled = False
+        self.size = size
+        self.stages = {}
+        self.lock = threading.Lock()
+
+    def enable(self, enabled=True):
+        self.enabled = enabled
+
+    def reset(self):
+        with self.lock:
+            self.stages = {}
+
+    def start(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def stop(self, stage, started):
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            recorder = self.stages.get(stage)
+            if recorder is None:
+                recorder = self.stages[stage] = serial_reader.LatencyRecorder(self.size)
+            recorder.add(elapsed)
+
+    def summary(self):
+        """{stage: LatencyRecorder.summary()} for the stages that ran, by name"""
+        summaries = {}
+        with self.lock:
+            for stage, recorder in sorted(self.stages.items()):
+                summary = recorder.summary()
+                if summary:
+                    summaries[stage] = summary
+        return summaries
+
+
+# Shared by every module of the process
+SPANS = SpanRecorder()
+
+
+def frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return "{}:{}".format(module, code.co_name)
+
+
+class SamplingProfiler:
+    """Sample every thread's stack for ``seconds`` and write collapsed stacks to ``path``"""
+
+    def __init__(self, path, seconds=10.0, interval=0.005):
+        self.path = str(path)
+        self.seconds = seconds
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="sampling-profiler", daemon=True)
+        self.error = None
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    @property
+    def done(self):
+        return not self.thread.is_alive()
+
+    def run(self):
+        own = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while not self.stop_event.is_set() and time.monotonic() < deadline:
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_name(frame))
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+            self.stop_event.wait(self.interval)
+        try:
+            with open(self.path, 'w', encoding='utf-8') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write("{} {}\n".format(stack, count))
+        except OSError as e:
+            self.error = e
+
+
+class ProfileCapture:
+    """cProfile the calling thread from start() to stop(); stop() writes the .prof file"""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.profile = cProfile.Profile()
+        self.started = None
+
+    def start(self):
+        self.started = time.monotonic()
+        self.profile.enable()
+        return self
+
+    def stop(self):
+        self.profile.disable()
+        self.profile.dump_stats(self.path)
+        return time.monotonic() - self.started
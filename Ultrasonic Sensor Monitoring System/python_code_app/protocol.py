@@ -0,0 +1,207 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Serial protocol between code_arduino.ino and the Python app.
+
+The firmware starts in the historical text mode (``Distance:12.34cm,
+Statut:Conforme``). When the host sends ``BIN`` (or ``BIN:<baudrate>``) a
+firmware that knows the binary protocol answers ``ACK:BIN[:<baudrate>]`` and
+switches to fixed-size frames; older firmware ignores the command and simply
+keeps talking text, so the host falls back without any configuration.
+Acknowledgements keep coming as text lines in binary mode, between two
+frames (``ACK:RATE:<hz>``); ``TXT`` switches back: the firmware answers
+``ACK:TXT`` and the decoder returns to text mode on it.
+
+Binary frame (11 bytes, little endian)::
+
+    0      sync byte 0xA5
+    1-2    sequence number (uint16, wraps)
+    3-6    device timestamp in microseconds (uint32, micros())
+    7-8    distance in 0.1 mm (uint16)
+    9      status bits (STATUS_*)
+    10     CRC-8 (poly 0x07, init 0x00) over bytes 1..9
+"""
+
+import struct
+from collections import namedtuple
+
+
+SYNC_BYTE = 0xA5
+FRAME = struct.Struct('<BHIHBB')
+FRAME_SIZE = FRAME.size
+
+STATUS_CONFORME = 0x01
+STATUS_NO_ECHO = 0x02
+STATUS_OUT_OF_RANGE = 0x04
+
+BINARY_ACK = "ACK:BIN"
+TEXT_COMMAND = "TXT"
+TEXT_ACK = b"ACK:TXT"
+ACK_PREFIX = b"ACK:"
+MAX_ACK_LINE = 32
+
+Frame = namedtuple('Frame', ['sequence', 'timestamp_us', 'distance', 'status'])
+
+
+def _crc8_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return bytes(table)
+
+
+CRC8_TABLE = _crc8_table()
+
+
+def crc8(data):
+    crc = 0
+    for byte in data:
+        crc = CRC8_TABLE[crc ^ byte]
+    return crc
+
+
+def encode_frame(sequence, timestamp_us, distance, status):
+    """Build a binary frame; distance is in cm (used by tests and simulators)"""
+    tenths_mm = min(max(int(round(distance * 100)), 0), 0xFFFF)
+    body = FRAME.pack(SYNC_BYTE, sequence & 0xFFFF, timestamp_us & 0xFFFFFFFF,
+                      tenths_mm, status, 0)[1:-1]
+    return bytes([SYNC_BYTE]) + body + bytes([crc8(body)])
+
+
+def binary_command(baudrate=None):
+    """Command asking the firmware to switch to binary frames (and optionally baudrate)"""
+    return "BIN:{}".format(baudrate) if baudrate else "BIN"
+
+
+def text_command():
+    """Command asking the firmware to go back to text lines"""
+    return TEXT_COMMAND
+
+
+class ProtocolDecoder:
+    """Incremental decoder for the text/binary serial stream.
+
+    feed(data) returns the decoded items in arrival order: ``str`` for text
+    lines and ``Frame`` for binary frames. The decoder starts in text mode and
+    switches to binary right after the firmware's ``ACK:BIN`` line, even when
+    the acknowledgement and the first frames arrive in the same chunk.
+    Between frames, ``ACK:...`` lines are still decoded as text; ``ACK:TXT``
+    also puts the decoder back in text mode.
+    """
+
+    def __init__(self, max_line=4096):
+        self.buffer = bytearray()
+        self.binary = False
+        self.max_line = max_line
+        self.last_sequence = None
+
+        # Optional callable receiving every raw chunk (simulator.CaptureWriter)
+        self.capture = None
+
+        # Link quality counters
+        self.frames = 0
+        self.crc_errors = 0
+        self.lost_frames = 0
+        self.skipped_bytes = 0
+        self.overruns = 0
+
+    def set_binary(self, binary):
+        self.binary = binary
+        self.last_sequence = None
+
+    def reset(self):
+        self.buffer.clear()
+        self.set_binary(False)
+
+    def feed(self, data):
+        if self.capture is not None:
+            self.capture(data)
+        self.buffer += data
+        items = []
+        pos = 0
+        while True:
+            if self.binary:
+                pos = self.decode_frames(pos, items)
+                if self.binary:
+                    break
+                # ACK:TXT: the rest of the buffer is text again
+                continue
+            end = self.buffer.find(b'\n', pos)
+            if end < 0:
+                break
+            line = self.buffer[pos:end].decode('utf-8', errors='ignore').strip()
+            pos = end + 1
+            if line:
+                items.append(line)
+                if line.startswith(BINARY_ACK):
+                    self.set_binary(True)
+
+        del self.buffer[:pos]
+        if not self.binary and len(self.buffer) > self.max_line:
+            # Guard against a peer that never sends a newline
+            self.buffer.clear()
+            self.overruns += 1
+        return items
+
+    def decode_frames(self, pos, items):
+        """Decode every complete frame from pos; return the first unconsumed offset"""
+        buffer = self.buffer
+        view = memoryview(buffer)
+        try:
+            end = len(buffer)
+            while pos < end:
+                if buffer[pos] != SYNC_BYTE:
+                    if buffer.startswith(TEXT_ACK, pos):
+                        # Left for the text decoder, which reports the line
+                        self.set_binary(False)
+                        return pos
+                    if buffer.startswith(ACK_PREFIX, pos):
+                        newline = buffer.find(b'\n', pos, pos + MAX_ACK_LINE)
+                        if newline >= 0:
+                            items.append(buffer[pos:newline].decode('ascii', errors='ignore').strip())
+                            pos = newline + 1
+                            continue
+                        if end - pos < MAX_ACK_LINE:
+                            # The rest of the line has not arrived yet
+                            return pos
+                    elif ACK_PREFIX.startswith(buffer[pos:end]):
+                        # Possibly the start of an ACK line: wait for the rest
+                        return pos
+                    # Skip to the next sync byte or possible ACK line
+                    candidates = [i for i in (buffer.find(SYNC_BYTE, pos + 1),
+                                              buffer.find(ACK_PREFIX[0], pos + 1)) if i >= 0]
+                    skip_to = min(candidates) if candidates else end
+                    self.skipped_bytes += skip_to - pos
+                    pos = skip_to
+                    continue
+                if end - pos < FRAME_SIZE:
+                    break
+
+                _, sequence, timestamp_us, tenths_mm, status, crc = FRAME.unpack_from(view, pos)
+                if crc8(view[pos + 1:pos + FRAME_SIZE - 1]) != crc:
+                    # Not a frame boundary: resynchronise on the next sync byte
+                    self.crc_errors += 1
+                    self.skipped_bytes += 1
+                    pos += 1
+                    continue
+
+                if self.last_sequence is not None:
+                    self.lost_frames += (sequence - self.last_sequence - 1) & 0xFFFF
+                self.last_sequence = sequence
+                self.frames += 1
+                items.append(Frame(sequence, timestamp_us, tenths_mm / 100.0, status))
+                pos += FRAME_SIZE
+            return pos
+        finally:
+            view.release()
+
+    def stats(self):
+        return {
+            'frames': self.frames,
+            'crc_errors': self.crc_errors,
+            'lost_frames': self.lost_frames,
+            'skipped_bytes': self.skipped_bytes,
+            'overruns': self.overruns,
+        }
@@ -0,0 +1,44 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Thread-safe bounded buffer used to hand items from worker threads to Tk."""
+
+import threading
+from collections import deque
+
+
+class RingBuffer:
+    """Fixed-size FIFO; when full the oldest item is dropped and counted"""
+
+    def __init__(self, size):
+        self.items = deque(maxlen=size)
+        self.dropped = 0
+        self.dropped_total = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.items)
+
+    def append(self, item):
+        with self.lock:
+            if len(self.items) == self.items.maxlen:
+                self.dropped += 1
+                self.dropped_total += 1
+            self.items.append(item)
+
+    def drain(self):
+        """Remove and return every buffered item, oldest first"""
+        with self.lock:
+            items = list(self.items)
+            self.items.clear()
+        return items
+
+    def take_dropped(self):
+        """Return the number of dropped items since the last call"""
+        with self.lock:
+            dropped = self.dropped
+            self.dropped = 0
+        return dropped
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
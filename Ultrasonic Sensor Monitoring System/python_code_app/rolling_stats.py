@@ -0,0 +1,158 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Constant-cost rolling statistics over the last N distance samples.
+
+Samples live in a fixed-size ring buffer. Min and max come from monotonic
+deques, mean and variance from a sliding Welford update, and percentiles from
+a fixed-resolution histogram of the window, so adding a sample costs the same
+whether the window holds a hundred or several million values.
+
+The reader thread appends while the Tk thread reads, clears and (manual
+tests) appends, so every method holds the window's lock: the deques, the
+running sums and the histogram are only ever seen consistent.
+"""
+
+import math
+import threading
+from array import array
+from collections import deque
+
+
+class RollingStats:
+    def __init__(self, size, resolution=0.1, upper=400.0):
+        if size < 1:
+            raise ValueError("Window size must be at least 1")
+        self.size = size
+        self.lock = threading.RLock()
+        self.resolution = resolution
+        self.upper = upper
+
+        self.buffer = array('d', bytes(8 * size))
+        self.head = 0
+        self.count = 0
+        self.seq = 0
+
+        # Monotonic deques of (sequence number, value)
+        self.min_deque = deque()
+        self.max_deque = deque()
+
+        # Sliding Welford accumulators
+        self.mean = 0.0
+        self.m2 = 0.0
+
+        # Histogram of the window for percentiles
+        self.bins = array('l', bytes(array('l').itemsize * (int(round(upper / resolution)) + 1)))
+
+    def __len__(self):
+        return self.count
+
+    def bin_index(self, value):
+        return min(max(int(round(value / self.resolution)), 0), len(self.bins) - 1)
+
+    def append(self, value):
+        with self.lock:
+            self.add(value)
+
+    def add(self, value):
+        """append() without the lock; the caller holds it"""
+        if self.count == self.size:
+            self.evict(self.buffer[self.head])
+        self.count += 1
+
+        self.buffer[self.head] = value
+        self.head = (self.head + 1) % self.size
+        self.seq += 1
+
+        # Welford add
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+        oldest = self.seq - self.size
+        while self.min_deque and self.min_deque[-1][1] >= value:
+            self.min_deque.pop()
+        self.min_deque.append((self.seq, value))
+        while self.min_deque[0][0] <= oldest:
+            self.min_deque.popleft()
+
+        while self.max_deque and self.max_deque[-1][1] <= value:
+            self.max_deque.pop()
+        self.max_deque.append((self.seq, value))
+        while self.max_deque[0][0] <= oldest:
+            self.max_deque.popleft()
+
+        self.bins[self.bin_index(value)] += 1
+
+    def evict(self, value):
+        """Remove the oldest value from the running sums (the buffer slot is reused)"""
+        n = self.count - 1
+        if n == 0:
+            self.mean = 0.0
+            self.m2 = 0.0
+        else:
+            delta = value - self.mean
+            self.mean -= delta / n
+            self.m2 = max(self.m2 - delta * (value - self.mean), 0.0)
+        self.count = n
+        self.bins[self.bin_index(value)] -= 1
+
+    def clear(self):
+        with self.lock:
+            self.head = 0
+            self.count = 0
+            self.seq = 0
+            self.min_deque.clear()
+            self.max_deque.clear()
+            self.mean = 0.0
+            self.m2 = 0.0
+            self.bins = array('l', bytes(len(self.bins) * self.bins.itemsize))
+
+    def values(self):
+        """Return the window contents, oldest first"""
+        with self.lock:
+            if self.count < self.size:
+                return self.buffer[:self.count].tolist()
+            return (self.buffer[self.head:] + self.buffer[:self.head]).tolist()
+
+    def minimum(self):
+        with self.lock:
+            return self.min_deque[0][1] if self.count else None
+
+    def maximum(self):
+        with self.lock:
+            return self.max_deque[0][1] if self.count else None
+
+    def variance(self):
+        with self.lock:
+            return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def std(self):
+        return math.sqrt(self.variance())
+
+    def percentile(self, p):
+        """Return the p-th percentile of the window, to within the histogram resolution"""
+        with self.lock:
+            if not self.count:
+                return None
+            rank = max(1, math.ceil(p / 100 * self.count))
+            seen = 0
+            for index, hits in enumerate(self.bins):
+                seen += hits
+                if seen >= rank:
+                    return index * self.resolution
+            return self.upper
+
+    def summary(self):
+        """Return min/max/avg/std/p50/p95 of the window, or None when empty"""
+        with self.lock:
+            if not self.count:
+                return None
+            return {
+                'count': self.count,
+                'min': self.minimum(),
+                'max': self.maximum(),
+                'avg': self.mean,
+                'std': self.std(),
+                'p50': self.percentile(50),
+                'p95': self.percentile(95),
+            }
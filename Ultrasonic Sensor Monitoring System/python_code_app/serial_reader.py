@@ -0,0 +1,148 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Event-driven serial line reader.
+
+Instead of polling ``in_waiting`` and sleeping, the reader blocks in
+``Serial.read`` until the first byte arrives (bounded by the port timeout),
+then drains everything already buffered in one call. Complete lines are split
+out locally and handed to the consumer as a batch, together with the time the
+bytes arrived, so the byte-arrival to processing latency can be measured.
+"""
+
+import time
+import bisect
+from collections import deque
+import profiling
+
+
+# Upper bounds (seconds) of the latency histogram buckets, the last one is +Inf
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class LatencyRecorder:
+    """Bounded record of latencies (seconds) with percentile summaries.
+
+    Also keeps an all-time histogram (LATENCY_BUCKETS) for the metrics
+    endpoint. There is a single writer, the thread that measures, so add()
+    takes no lock; readers work on snapshots.
+    """
+
+    def __init__(self, size=10000):
+        self.samples = deque(maxlen=size)
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, latency):
+        self.samples.append(latency)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.total += latency
+        self.count += 1
+
+    def reset(self):
+        self.samples.clear()
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def histogram(self):
+        """Return (cumulative bucket counts, sum, count), Prometheus style"""
+        cumulative, running = [], 0
+        for value in list(self.buckets):
+            running += value
+            cumulative.append(running)
+        return cumulative, self.total, self.count
+
+    def summary(self):
+        """Return count, mean and p50/p90/p99/max in milliseconds, or None when empty"""
+        samples = sorted(self.samples)
+        count = self.count
+        if not samples:
+            return None
+
+        def percentile(p):
+            return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000
+
+        return {
+            'count': count,
+            'mean_ms': sum(samples) / len(samples) * 1000,
+            'p50_ms': percentile(50),
+            'p90_ms': percentile(90),
+            'p99_ms': percentile(99),
+            'max_ms': samples[-1] * 1000,
+        }
+
+
+class LineSplitter:
+    """Accumulate raw bytes and return the complete, decoded lines"""
+
+    def __init__(self, max_line=4096):
+        self.buffer = bytearray()
+        self.max_line = max_line
+
+    def feed(self, data):
+        self.buffer += data
+        if b'\n' not in data:
+            # Guard against a peer that never sends a newline
+            if len(self.buffer) > self.max_line:
+                self.buffer.clear()
+            return []
+
+        *complete, rest = self.buffer.split(b'\n')
+        self.buffer = bytearray(rest)
+        lines = []
+        for raw in complete:
+            line = raw.decode('utf-8', errors='ignore').strip()
+            if line:
+                lines.append(line)
+        return lines
+
+    def reset(self):
+        self.buffer.clear()
+
+
+class SerialLineReader:
+    """Read lines from an open serial port and pass them on in batches.
+
+    on_batch(lines) is called on the reader thread for every chunk that
+    completed at least one line. The time from byte arrival to the end of
+    on_batch is recorded in ``latency``. Any object with a feed(data) method
+    returning decoded items can replace the default LineSplitter, e.g.
+    protocol.ProtocolDecoder for binary frames.
+    """
+
+    def __init__(self, port, on_batch, latency=None, chunk_size=4096, decoder=None):
+        self.port = port
+        self.on_batch = on_batch
+        self.latency = latency or LatencyRecorder()
+        self.chunk_size = chunk_size
+        self.decoder = decoder or LineSplitter()
+        self.bytes_read = 0
+        self.lines_read = 0
+
+    def read_chunk(self):
+        """Block until bytes are available, then return everything buffered"""
+        data = self.port.read(max(1, min(self.port.in_waiting, self.chunk_size)))
+        if data:
+            waiting = self.port.in_waiting
+            if waiting:
+                data += self.port.read(waiting)
+        return data
+
+    def poll(self):
+        """Process one chunk; return the number of lines handed on"""
+        data = self.read_chunk()
+        if not data:
+            return 0
+        arrived = time.perf_counter()
+        self.bytes_read += len(data)
+
+        started = profiling.SPANS.start()
+        lines = self.decoder.feed(data)
+        if started:
+            profiling.SPANS.stop("serial.decode", started)
+        if lines:
+            self.lines_read += len(lines)
+            self.on_batch(lines)
+            self.latency.add(time.perf_counter() - arrived)
+        return len(lines)
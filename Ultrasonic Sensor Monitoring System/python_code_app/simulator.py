@@ -0,0 +1,391 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Record and replay serial traffic, to exercise the app without an Arduino.
+
+A capture file holds the raw bytes read from the port with the time they
+arrived, so a replay reproduces the original chunking as well as the lines.
+Captures are taken with ``record`` (straight from a port) or with
+``--capture`` on the acquisition daemon, which taps the engine's decoder.
+
+Replays and synthetic traffic (firmware text lines, or binary frames) are
+written to one end of a pseudo-terminal pair; the app opens the other end
+like any serial port. Any pyserial URL works as well (``socket://`` to
+another machine); within one process a Replayer can also write to an
+engine connected to ``loop://``. The speed is a multiple of real time; ``max``
+writes as fast as the reader consumes, which is how ``bench`` measures the
+highest line rate the whole pipeline sustains.
+
+    python -m simulator record --port COM3 --out session.cap
+    python -m simulator replay session.cap --speed 10
+    python -m simulator replay --rate 40 --speed 1000
+    python -m simulator bench session.cap
+"""
+
+import os
+import sys
+import time
+import struct
+import random
+import argparse
+import threading
+from pathlib import Path
+from protocol import encode_frame, STATUS_CONFORME, STATUS_NO_ECHO
+
+
+CAPTURE_MAGIC = b"USCAP1\n"
+RECORD = struct.Struct('<dI')  # seconds since the start of the capture, length
+
+# Synthetic distance with no part under the sensor (cm)
+EMPTY_DISTANCE = 150.0
+
+# Largest write when replaying faster than real time
+MAX_WRITE = 64 * 1024
+
+
+class CaptureWriter:
+    """Append (time, bytes) records to a capture file; call it with each chunk read"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self.file = open(self.path, 'wb')
+        self.file.write(CAPTURE_MAGIC)
+        self.lock = threading.Lock()
+        self.start = time.monotonic()
+        self.chunks = 0
+        self.bytes = 0
+
+    def __call__(self, data):
+        elapsed = time.monotonic() - self.start
+        with self.lock:
+            if self.file.closed:
+                return
+            self.file.write(RECORD.pack(elapsed, len(data)))
+            self.file.write(data)
+            self.chunks += 1
+            self.bytes += len(data)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+
+def read_capture(path):
+    """Yield (seconds, bytes) records from a capture file"""
+    with open(path, 'rb') as f:
+        if f.read(len(CAPTURE_MAGIC)) != CAPTURE_MAGIC:
+            raise ValueError("{} is not a serial capture".format(path))
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                break
+            elapsed, length = RECORD.unpack(header)
+            data = f.read(length)
+            if len(data) < length:
+                break
+            yield elapsed, data
+
+
+def synthetic_traffic(rate=40, count=None, duration=None, binary=False, min_threshold=10.0,
+                      max_threshold=30.0, seed=1):
+    """Yield (seconds, bytes) of generated firmware output at rate samples/s.
+
+    A part sits under the sensor for two seconds out of three, with sensor
+    noise, 0 cm dropouts and the odd multipath spike. Text mode sends the firmware's
+    ``Distance:Xcm, Statut:...`` lines; binary mode sends the ACK:BIN line
+    followed by frames.
+    """
+    rng = random.Random(seed)
+    period = 1.0 / rate
+    if count is None:
+        count = int(duration * rate) if duration else None
+    if binary:
+        yield 0.0, b"ACK:BIN\r\n"
+
+    cycle = max(3, int(rate * 3))
+    i = 0
+    distance = EMPTY_DISTANCE
+    while count is None or i < count:
+        elapsed = i * period
+        phase = i % cycle
+        if phase == 0:
+            distance = rng.uniform(5.0, 45.0)
+        elif phase == cycle * 2 // 3:
+            distance = EMPTY_DISTANCE
+        roll = rng.random()
+        if roll < 0.01:
+            value = 0.0
+        elif roll < 0.015:
+            value = distance + rng.uniform(40.0, 200.0)
+        else:
+            value = max(0.0, distance + rng.gauss(0.0, 0.2))
+        conforme = min_threshold <= value <= max_threshold
+
+        if binary:
+            status = (STATUS_CONFORME if conforme else 0) | (STATUS_NO_ECHO if value <= 0 else 0)
+            data = encode_frame(i, int(elapsed * 1e6), value, status)
+        else:
+            data = "Distance:{:.2f}cm, Statut:{}\r\n".format(
+                value, "Conforme" if conforme else "Non Conforme").encode()
+        yield elapsed, data
+        i += 1
+
+
+class Replayer:
+    """Write (seconds, bytes) records to write() at speed x real time (None: as fast as possible).
+
+    Records that fall due together are coalesced into one write, so a
+    1000x replay of a 40 Hz capture doesn't sleep 40000 times a second.
+    """
+
+    def __init__(self, records, write, speed=1.0):
+        self.records = records
+        self.write = write
+        self.speed = speed
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.chunks = 0
+        self.bytes = 0
+        self.max_lag = 0.0
+        self.started = None
+        self.finished = None
+        self.error = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+
+    def join(self, timeout=None):
+        self.thread.join(timeout)
+
+    def run(self):
+        speed = self.speed
+        pending = bytearray()
+        self.started = time.monotonic()
+        try:
+            for elapsed, data in self.records:
+                if self.stop_event.is_set():
+                    break
+                if speed:
+                    wait = self.started + elapsed / speed - time.monotonic()
+                    if wait > 0.001:
+                        # Ahead of schedule: send what is due, then sleep
+                        if pending:
+                            self.flush(pending)
+                        self.stop_event.wait(wait)
+                    elif wait < 0:
+                        self.max_lag = max(self.max_lag, -wait)
+                self.chunks += 1
+                pending += data
+                if len(pending) >= MAX_WRITE:
+                    self.flush(pending)
+            if pending:
+                self.flush(pending)
+        except OSError as e:
+            self.error = e
+        self.finished = time.monotonic()
+
+    def flush(self, pending):
+        self.write(bytes(pending))
+        self.bytes += len(pending)
+        pending.clear()
+
+
+class PtyPort:
+    """Pseudo-terminal pair (POSIX): the app opens ``name``, the replayer writes to the master"""
+
+    def __init__(self):
+        import tty
+        self.master, slave = os.openpty()
+        tty.setraw(slave)
+        self.slave = slave
+        self.name = os.ttyname(slave)
+
+    def write(self, data):
+        view = memoryview(data)
+        while view:
+            written = os.write(self.master, view)
+            view = view[written:]
+
+    def close(self):
+        for fd in (self.master, self.slave):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def records_from_args(args):
+    if args.capture:
+        return read_capture(args.capture)
+    return synthetic_traffic(rate=args.rate, count=args.count, duration=args.duration,
+                             binary=args.binary)
+
+
+def parse_speed(value):
+    return None if value == "max" else float(value)
+
+
+def record(args):
+    import serial
+    port = serial.serial_for_url(args.port, args.baudrate, timeout=0.1)
+    capture = CaptureWriter(args.out)
+    deadline = time.monotonic() + args.duration if args.duration else None
+    print("Recording {} to {} (Ctrl+C to stop)".format(args.port, args.out))
+    try:
+        while deadline is None or time.monotonic() < deadline:
+            data = port.read(max(1, port.in_waiting))
+            if data:
+                capture(data)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        port.close()
+        capture.close()
+    print("{} chunks, {} bytes".format(capture.chunks, capture.bytes))
+    return 0
+
+
+def replay(args):
+    if args.url:
+        import serial
+        port = serial.serial_for_url(args.url, args.baudrate)
+        write, name, close = port.write, args.url, port.close
+    else:
+        pty = PtyPort()
+        write, name, close = pty.write, pty.name, pty.close
+    print("Serving on {} - open it as the serial port".format(name))
+    if not args.url:
+        input("Press Enter to start the replay...")
+
+    replayer = Replayer(records_from_args(args), write, parse_speed(args.speed)).start()
+    try:
+        while replayer.thread.is_alive():
+            replayer.join(0.5)
+    except KeyboardInterrupt:
+        replayer.stop()
+    close()
+    print("{} chunks, {} bytes, max lag {:.1f} ms".format(
+        replayer.chunks, replayer.bytes, replayer.max_lag * 1000))
+    return 0
+
+
+def run_bench(records, speed=None, direct=False, baudrate=9600, signal_filter="none"):
+    """Replay records into an AcquisitionEngine through a pty (or feed() when direct); return the stats"""
+    from acquisition import AcquisitionEngine, EVENT_MEASUREMENT, EVENT_RESULT
+
+    engine = AcquisitionEngine(baudrate=baudrate, signal_filter=signal_filter)
+    counts = {'samples': 0, 'results': 0}
+
+    def on_event(event, payload):
+        if event == EVENT_MEASUREMENT:
+            counts['samples'] += 1
+        elif event == EVENT_RESULT:
+            counts['results'] += 1
+
+    engine.subscribe(on_event)
+    records = list(records)
+
+    pty = None
+    if direct:
+        write, via = engine.feed, "feed()"
+    else:
+        pty = PtyPort()
+        engine.connect(pty.name, baudrate)
+        write, via = pty.write, pty.name
+
+    start = time.monotonic()
+    replayer = Replayer(records, write, speed).start()
+    replayer.join()
+    # Let the reader catch up with what is still buffered
+    last, idle = -1, time.monotonic()
+    while time.monotonic() - idle < 1.0:
+        if counts['samples'] != last:
+            last, idle = counts['samples'], time.monotonic()
+        time.sleep(0.01)
+    elapsed = idle - start
+
+    if pty:
+        engine.disconnect()
+        pty.close()
+
+    latency = engine.reader_latency.summary() or {}
+    return {
+        'via': via,
+        'chunks': replayer.chunks,
+        'bytes': replayer.bytes,
+        'samples': counts['samples'],
+        'results': counts['results'],
+        'seconds': elapsed,
+        'samples_per_s': counts['samples'] / elapsed if elapsed else 0.0,
+        'max_lag_ms': replayer.max_lag * 1000,
+        'reader_p50_ms': latency.get('p50_ms'),
+        'reader_p99_ms': latency.get('p99_ms'),
+    }
+
+
+def bench(args):
+    speed = parse_speed(args.speed)
+    result = run_bench(records_from_args(args), speed, args.direct, args.baudrate, args.filter)
+    print("{} chunks ({} bytes) sent via {} at {} speed".format(
+        result['chunks'], result['bytes'], result['via'], args.speed))
+    print("  samples processed : {} ({} results)".format(result['samples'], result['results']))
+    print("  sustained rate    : {:,.0f} samples/s".format(result['samples_per_s']))
+    if speed:
+        print("  max replay lag    : {:.1f} ms".format(result['max_lag_ms']))
+    if result['reader_p99_ms'] is not None:
+        print("  reader latency    : p50 {:.2f} ms, p99 {:.2f} ms".format(
+            result['reader_p50_ms'], result['reader_p99_ms']))
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m simulator",
+                                     description="Record and replay ultrasonic serial traffic")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser("record", help="capture the raw bytes of a serial port")
+    record_parser.add_argument("--port", required=True)
+    record_parser.add_argument("--baudrate", type=int, default=9600)
+    record_parser.add_argument("--out", required=True, help="capture file to write")
+    record_parser.add_argument("--duration", type=float, help="stop after this many seconds")
+
+    for name, help_text in (("replay", "serve a capture or synthetic traffic on a pty"),
+                            ("bench", "measure the highest rate the engine sustains")):
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("capture", nargs="?", help="capture file (synthetic traffic if omitted)")
+        command.add_argument("--speed", default="1" if name == "replay" else "max",
+                             help="multiple of real time (1, 10, 1000...) or 'max'")
+        command.add_argument("--rate", type=float, default=40, help="synthetic samples per second")
+        command.add_argument("--count", type=int, help="synthetic samples to generate")
+        command.add_argument("--duration", type=float, default=60.0 if name == "replay" else None,
+                             help="synthetic traffic length in seconds")
+        command.add_argument("--binary", action="store_true", help="synthetic binary frames")
+        command.add_argument("--baudrate", type=int, default=9600)
+        if name == "replay":
+            command.add_argument("--url", help="pyserial URL to write to instead of a pty")
+        else:
+            command.add_argument("--direct", action="store_true",
+                                 help="call engine.feed() instead of going through a pty")
+            command.add_argument("--filter", default="none", help="signal filter of the engine")
+
+    args = parser.parse_args(argv)
+    if args.command == "bench" and not args.capture and not args.count and not args.duration:
+        args.count = 200000
+    if os.name != "posix" and args.command != "record" and not (getattr(args, "url", None)
+                                                                 or getattr(args, "direct", False)):
+        parser.error("pseudo-terminals need Linux or macOS: use --url (replay) or --direct (bench)")
+
+    if args.command == "record":
+        return record(args)
+    if args.command == "replay":
+        return replay(args)
+    bench(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
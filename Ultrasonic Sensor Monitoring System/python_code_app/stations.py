@@ -0,0 +1,251 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Several sensor stations served by one reader thread.
+
+Each station keeps its own AcquisitionEngine (thresholds, rolling statistics,
+part detector and result history), but none of them owns a thread. The
+StationManager opens every port non-blocking and waits on all of them at once
+with a selector, so CPU use stays flat as stations are added. On platforms
+where serial ports cannot be selected (Windows), the same thread polls the
+ports round-robin and only sleeps when none of them had data.
+"""
+
+import os
+import time
+import socket
+import logging
+import selectors
+import threading
+import serial
+import serial.tools.list_ports
+from acquisition import AcquisitionEngine
+
+
+def available_ports():
+    """Return the device names of the serial ports present on this machine"""
+    return sorted(port.device for port in serial.tools.list_ports.comports())
+
+
+class Station:
+    """One sensor: its engine plus the reader bookkeeping kept by the manager"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.errors = 0
+        self.bytes_read = 0
+        self.samples = 0
+        self.rate = 0.0
+        self.rate_mark = (time.monotonic(), 0)
+
+    @property
+    def port(self):
+        return self.engine.port
+
+    def update_rate(self, now):
+        """Refresh the measured rate of decoded samples (Hz), at most once a second"""
+        last_time, last_samples = self.rate_mark
+        if now - last_time >= 1.0:
+            self.rate = (self.samples - last_samples) / (now - last_time)
+            self.rate_mark = (now, self.samples)
+        return self.rate
+
+
+class StationManager:
+    def __init__(self, logger=None, idle_sleep=0.005, max_errors=5, **engine_options):
+        self.logger = logger or logging.getLogger("stations")
+        self.engine_options = engine_options
+        self.idle_sleep = idle_sleep
+        self.max_errors = max_errors
+        self.stations = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.is_running = False
+
+        # A socket pair wakes the selector when stations are added or removed
+        self.selector = None
+        self.wakeup_reader = None
+        self.wakeup_writer = None
+
+    # Station management
+    def add_station(self, port, engine=None, **options):
+        """Open port and start serving it; raises serial.SerialException on failure"""
+        if port in self.stations:
+            return self.stations[port]
+        if engine is None:
+            engine_options = dict(self.engine_options, **options)
+            engine_options.setdefault('logger', self.logger)
+            engine = AcquisitionEngine(port=port, **engine_options)
+        engine.connect(port, start_reader=False)
+
+        station = Station(engine)
+        with self.lock:
+            self.stations[port] = station
+            self.register(station)
+        self.wake()
+        return station
+
+    def remove_station(self, port):
+        with self.lock:
+            station = self.stations.pop(port, None)
+            if station:
+                self.unregister(station)
+        if station:
+            station.engine.disconnect()
+        self.wake()
+        return station
+
+    def open_all(self, exclude=()):
+        """Open every detected port not already served; return the ports that failed"""
+        failed = {}
+        for port in available_ports():
+            if port in self.stations or port in exclude:
+                continue
+            try:
+                self.add_station(port)
+            except serial.SerialException as e:
+                self.logger.error("Unable to open station %s: %s", port, e)
+                failed[port] = str(e)
+        return failed
+
+    def engines(self):
+        with self.lock:
+            return [station.engine for station in self.stations.values()]
+
+    def __len__(self):
+        return len(self.stations)
+
+    # Reader loop
+    def start(self):
+        if self.is_running:
+            return
+        self.is_running = True
+        self.setup_selector()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.is_running = False
+        self.wake()
+        if self.thread:
+            self.thread.join(timeout=2)
+            self.thread = None
+        for port in list(self.stations):
+            self.remove_station(port)
+        if self.selector:
+            self.selector.close()
+            self.wakeup_reader.close()
+            self.wakeup_writer.close()
+            self.selector = None
+
+    def setup_selector(self):
+        if os.name == 'nt':
+            # Windows can only select sockets: use the polling loop
+            return
+        self.selector = selectors.DefaultSelector()
+        self.wakeup_reader, self.wakeup_writer = socket.socketpair()
+        self.wakeup_reader.setblocking(False)
+        self.wakeup_writer.setblocking(False)
+        self.selector.register(self.wakeup_reader, selectors.EVENT_READ, None)
+        with self.lock:
+            for station in self.stations.values():
+                self.register(station)
+
+    def register(self, station):
+        if self.selector:
+            self.selector.register(station.engine.arduino.fileno(), selectors.EVENT_READ, station)
+
+    def unregister(self, station):
+        if self.selector:
+            try:
+                self.selector.unregister(station.engine.arduino.fileno())
+            except (KeyError, ValueError, OSError):
+                pass
+
+    def wake(self):
+        if self.wakeup_writer:
+            try:
+                self.wakeup_writer.send(b'\0')
+            except OSError:
+                pass
+
+    def run(self):
+        if self.selector:
+            self.run_selector()
+        else:
+            self.run_polling()
+
+    def run_selector(self):
+        while self.is_running:
+            for key, _ in self.selector.select(timeout=1.0):
+                if key.data is None:
+                    try:
+                        self.wakeup_reader.recv(4096)
+                    except OSError:
+                        pass
+                    continue
+                self.service(key.data, ready=True)
+
+    def run_polling(self):
+        while self.is_running:
+            with self.lock:
+                stations = list(self.stations.values())
+            busy = False
+            for station in stations:
+                busy = self.service(station) or busy
+            if not busy:
+                time.sleep(self.idle_sleep)
+
+    def service(self, station, ready=False):
+        """Read what one station has buffered and feed it to its engine"""
+        engine = station.engine
+        if not engine.is_running:
+            return False
+        try:
+            waiting = engine.arduino.in_waiting
+            if not waiting and not ready:
+                return False
+            # Readable with nothing waiting means the device went away: the
+            # read raises instead of letting the selector spin
+            data = engine.arduino.read(waiting or 1)
+            if not data:
+                return False
+            station.bytes_read += len(data)
+            station.samples += engine.feed(data)
+            station.errors = 0
+            return True
+        except Exception as e:
+            if not engine.is_running:
+                return False
+            station.errors += 1
+            self.logger.error("Unexpected error reading station %s: %s", station.port, e)
+            if station.errors >= self.max_errors:
+                with self.lock:
+                    self.unregister(station)
+                engine.connection_lost(e)
+            return False
+
+    # Dashboard
+    def snapshot(self):
+        """Per-station live figures for a dashboard, in port order"""
+        now = time.monotonic()
+        with self.lock:
+            stations = sorted(self.stations.values(), key=lambda station: station.port)
+        rows = []
+        for station in stations:
+            engine = station.engine
+            history = engine.test_history
+            last = None
+            if history:
+                last = "PASS" if history.conforme[-1] else "FAIL"
+            rows.append({
+                'port': station.port,
+                'connected': engine.is_running,
+                'distance': engine.current_distance,
+                'conforme': engine.check_conformity(engine.current_distance),
+                'last_result': last,
+                'rate': station.update_rate(now),
+                'summary': engine.summary(),
+                'min_threshold': engine.min_threshold,
+                'max_threshold': engine.max_threshold,
+            })
+        return rows
@@ -0,0 +1,190 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Append-only measurement store (SQLite in WAL mode).
+
+Every sample and every result of the attached engines is written to disk as
+it happens. Subscribers only enqueue rows; a writer thread commits them in
+batched transactions (every ``flush_interval`` seconds, at most
+``batch_size`` rows each), so the reader never waits on the disk. WAL mode keeps committed
+batches safe across a crash: at most the batch in flight is lost.
+
+Timestamps are stored as epoch seconds.
+"""
+
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from transport import EventQueue, DROP_NEWEST
+from profiling import SPANS
+from acquisition import EVENT_MEASUREMENT, EVENT_RESULT
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS samples (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    station TEXT,
+    distance REAL NOT NULL,
+    conforme INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    id INTEGER PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    station TEXT,
+    result TEXT NOT NULL,
+    conforme INTEGER NOT NULL,
+    distance REAL,
+    settle_time REAL,
+    samples INTEGER,
+    settled INTEGER
+);
+CREATE INDEX IF NOT EXISTS samples_timestamp ON samples (timestamp);
+CREATE INDEX IF NOT EXISTS samples_station ON samples (station, timestamp);
+CREATE INDEX IF NOT EXISTS results_timestamp ON results (timestamp);
+CREATE INDEX IF NOT EXISTS results_station ON results (station, timestamp);
+CREATE INDEX IF NOT EXISTS results_result ON results (result, timestamp);
+"""
+
+INSERT_SAMPLE = "INSERT INTO samples (timestamp, station, distance, conforme) VALUES (?, ?, ?, ?)"
+INSERT_RESULT = ("INSERT INTO results (timestamp, station, result, conforme, distance, settle_time, "
+                 "samples, settled) VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+
+RESULT_COLUMNS = ('timestamp', 'station', 'result', 'conforme', 'distance',
+                  'settle_time', 'samples', 'settled')
+SAMPLE_COLUMNS = ('timestamp', 'station', 'distance', 'conforme')
+
+
+def where(start=None, end=None, station=None, result=None):
+    """Return the WHERE clause and parameters for the common filters"""
+    clauses, params = [], []
+    for clause, value in (("timestamp >= ?", start), ("timestamp < ?", end),
+                          ("station = ?", station), ("result = ?", result)):
+        if value is not None:
+            clauses.append(clause)
+            params.append(value)
+    if not clauses:
+        return "", params
+    return " WHERE " + " AND ".join(clauses), params
+
+
+class MeasurementStore:
+    def __init__(self, path, batch_size=1000, flush_interval=0.5, queue_size=100000, logger=None):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.logger = logger or logging.getLogger("store")
+
+        # Rows waiting for the writer; if the disk stalls for minutes the
+        # newest samples are dropped (and counted) rather than block the reader
+        self.rows = EventQueue(queue_size, policy=DROP_NEWEST)
+        self.rows_written = 0
+        self.batches = 0
+        self.write_errors = 0
+
+        connection = self.connect()
+        connection.executescript(SCHEMA)
+        connection.close()
+
+        self.stop_event = threading.Event()
+        self.writer_thread = threading.Thread(target=self.run, daemon=True)
+        self.writer_thread.start()
+
+    def connect(self):
+        connection = sqlite3.connect(str(self.path), timeout=10)
+        connection.execute("PRAGMA journal_mode=WAL")
+        # With WAL, NORMAL only risks the last transaction on power loss
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    @property
+    def dropped(self):
+        return self.rows.dropped
+
+    # Ingest
+    def attach(self, engine):
+        """Persist the samples and results of an engine; returns the subscription"""
+        offer = self.rows.offer
+
+        def on_event(event, payload):
+            # Looked up per event: the GUI attaches before the port is chosen
+            station = engine.station or engine.port
+            if event == EVENT_MEASUREMENT:
+                offer((INSERT_SAMPLE, (time.time(), station, payload['distance'], int(payload['conforme']))))
+            elif event == EVENT_RESULT:
+                offer((INSERT_RESULT, (
+                    payload['timestamp'].timestamp(), station, payload['result'],
+                    int(payload['conforme']), payload['distance'], payload['settle_time'],
+                    payload['samples'], int(payload['settled'])
+                )))
+
+        return engine.subscribe(on_event)
+
+    def run(self):
+        connection = self.connect()
+        while True:
+            stopping = self.stop_event.wait(self.flush_interval)
+            # One transaction per batch_size rows of what accumulated meanwhile
+            batch = self.rows.drain()
+            for first in range(0, len(batch), self.batch_size):
+                self.write_batch(connection, batch[first:first + self.batch_size])
+            if stopping:
+                break
+        connection.close()
+
+    def write_batch(self, connection, batch):
+        samples = [row for statement, row in batch if statement is INSERT_SAMPLE]
+        results = [row for statement, row in batch if statement is INSERT_RESULT]
+        started = SPANS.start()
+        try:
+            with connection:
+                if samples:
+                    connection.executemany(INSERT_SAMPLE, samples)
+                if results:
+                    connection.executemany(INSERT_RESULT, results)
+            self.rows_written += len(batch)
+            self.batches += 1
+            if started:
+                SPANS.stop("store.write", started)
+        except sqlite3.Error as e:
+            self.write_errors += 1
+            self.logger.error("Error writing {} rows to {}: {}".format(len(batch), self.path, str(e)))
+
+    def close(self):
+        """Write out the queued rows and stop the writer"""
+        self.stop_event.set()
+        self.writer_thread.join(timeout=10)
+
+    # Queries (each on its own connection, safe from any thread)
+    def query(self, table, columns, start=None, end=None, station=None, result=None, batch=1000):
+        """Yield rows as dicts, oldest first; start/end are epoch seconds"""
+        clause, params = where(start, end, station, result)
+        sql = "SELECT {} FROM {}{} ORDER BY timestamp".format(", ".join(columns), table, clause)
+
+        connection = self.connect()
+        try:
+            cursor = connection.execute(sql, params)
+            while True:
+                rows = cursor.fetchmany(batch)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(zip(columns, row))
+        finally:
+            connection.close()
+
+    def results(self, start=None, end=None, station=None, result=None):
+        return self.query("results", RESULT_COLUMNS, start, end, station, result)
+
+    def samples(self, start=None, end=None, station=None):
+        return self.query("samples", SAMPLE_COLUMNS, start, end, station)
+
+    def count(self, table, start=None, end=None, station=None):
+        clause, params = where(start, end, station)
+        sql = "SELECT COUNT(*) FROM {}{}".format(table, clause)
+        connection = self.connect()
+        try:
+            return connection.execute(sql, params).fetchone()[0]
+        finally:
+            connection.close()
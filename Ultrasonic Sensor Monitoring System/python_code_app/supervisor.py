@@ -0,0 +1,189 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Background connection supervisor.
+
+Opening a serial port can take a while and reboots the Arduino, so neither
+belongs on the Tk main thread. ConnectionSupervisor opens the port on its own
+thread and, when the link is lost, reconnects with jittered exponential
+backoff until it is told to stop. Progress is reported through the engine's
+events (EVENT_CONNECTED, EVENT_CONNECT_FAILED, EVENT_READY, messages).
+
+The time from losing the link (or from asking to connect) to the first valid
+sample is recorded in ``first_sample_latency``.
+"""
+
+import time
+import random
+import logging
+import threading
+from serial_reader import LatencyRecorder
+from acquisition import EVENT_CONNECT_FAILED, EVENT_CONNECTION_LOST, EVENT_READY
+
+
+STATE_IDLE = "idle"
+STATE_CONNECTING = "connecting"
+STATE_WAITING = "waiting"
+STATE_CONNECTED = "connected"
+STATE_BACKOFF = "backoff"
+
+
+class ConnectionSupervisor:
+    def __init__(self, engine, reconnect=False, base_delay=0.5, max_delay=30.0, jitter=0.5,
+                 ready_timeout=5.0, logger=None):
+        self.engine = engine
+        self.reconnect = reconnect
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.ready_timeout = ready_timeout
+        self.logger = logger or logging.getLogger("supervisor")
+
+        self.state = STATE_IDLE
+        self.thread = None
+        self.stop_event = threading.Event()
+        self.link_lost = threading.Event()
+        self.ready = threading.Event()
+
+        # Metrics
+        self.attempts = 0
+        self.reconnects = 0
+        self.started_at = None
+        self.first_sample_latency = LatencyRecorder(1000)
+        self.last_first_sample = None
+
+        engine.subscribe(self.on_engine_event)
+
+    @property
+    def active(self):
+        """True while supervising (a thread told to stop no longer counts)"""
+        return self.thread is not None and self.thread.is_alive() and not self.stop_event.is_set()
+
+    def connect(self, port=None, baudrate=None, reconnect=None):
+        """Start connecting in the background; returns immediately"""
+        self.disconnect()
+        if port:
+            self.engine.port = port
+            self.engine.station = self.engine.station or port
+        if baudrate:
+            self.engine.baudrate = baudrate
+        if reconnect is not None:
+            self.reconnect = reconnect
+
+        # A fresh stop event per run: a previous run that has not exited yet
+        # (stuck opening the port) keeps seeing its own, set, event
+        previous = self.thread if self.thread is not None and self.thread.is_alive() else None
+        self.stop_event = threading.Event()
+        self.started_at = time.monotonic()
+        self.thread = threading.Thread(target=self.run, args=(self.stop_event, previous), daemon=True)
+        self.thread.start()
+
+    def disconnect(self):
+        """Stop supervising and close the link"""
+        self.stop_event.set()
+        self.link_lost.set()
+        # Also wakes the wait for the first sample
+        self.ready.set()
+        thread = self.thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout=3)
+        if thread is not None and not thread.is_alive():
+            self.thread = None
+        port = self.engine.arduino
+        if self.engine.is_running or (port and port.is_open):
+            self.engine.disconnect()
+        self.state = STATE_IDLE
+
+    def backoff_delay(self, attempt):
+        """Exponential delay for the given retry, shortened by a random jitter"""
+        # The exponent is capped: 2 ** 1024 no longer converts to a float,
+        # and max_delay is reached long before that anyway
+        delay = min(self.max_delay, self.base_delay * (2 ** min(attempt, 16)))
+        return delay * (1 - self.jitter * random.random())
+
+    def on_engine_event(self, event, payload):
+        if event == EVENT_CONNECTION_LOST:
+            self.link_lost.set()
+        elif event == EVENT_READY:
+            self.ready.set()
+            if self.started_at is not None:
+                elapsed = time.monotonic() - self.started_at
+                self.first_sample_latency.add(elapsed)
+                self.last_first_sample = elapsed
+                self.started_at = None
+                self.engine.message("⏱️ First sample {:.0f} ms after {}".format(
+                    elapsed * 1000, "reconnect" if self.reconnects else "connect"))
+
+    def run(self, stop_event, previous=None):
+        if previous is not None:
+            # Never two runs driving the engine: the previous one has been
+            # told to stop and exits as soon as its blocking call returns
+            previous.join()
+        attempt = 0
+        while not stop_event.is_set():
+            self.state = STATE_CONNECTING
+            self.attempts += 1
+            self.link_lost.clear()
+            self.ready.clear()
+            # disconnect() sets stop_event before link_lost and ready: if the
+            # clears above swallowed them, stop_event is already set
+            if stop_event.is_set():
+                break
+            try:
+                self.engine.connect()
+            except Exception as e:
+                self.engine.publish(EVENT_CONNECT_FAILED, {
+                    'port': self.engine.port, 'error': str(e), 'attempt': attempt + 1
+                })
+                if not self.reconnect:
+                    break
+                if self.wait_backoff(attempt, stop_event):
+                    break
+                attempt += 1
+                continue
+            if stop_event.is_set():
+                # disconnect() gave up waiting while the port was opening
+                self.engine.disconnect()
+                break
+
+            self.state = STATE_WAITING
+            self.ready.wait(self.ready_timeout)
+            if stop_event.is_set():
+                break
+            if not self.ready.is_set() and not self.link_lost.is_set():
+                self.engine.message("⚠️ No data from {} after {:.0f} s".format(
+                    self.engine.port, self.ready_timeout), "warning")
+            if self.ready.is_set():
+                # Only a link that delivered data resets the backoff, so a
+                # device that keeps dropping out is retried less and less often
+                self.state = STATE_CONNECTED
+                attempt = 0
+
+            self.link_lost.wait()
+            if stop_event.is_set() or not self.reconnect:
+                break
+            self.reconnects += 1
+            self.started_at = time.monotonic()
+            if self.wait_backoff(attempt, stop_event):
+                break
+            attempt += 1
+        if stop_event is self.stop_event:
+            self.state = STATE_IDLE
+
+    def wait_backoff(self, attempt, stop_event):
+        """Sleep before the next attempt; return True if stopped meanwhile"""
+        self.state = STATE_BACKOFF
+        delay = self.backoff_delay(attempt)
+        self.engine.message("🔄 Reconnecting to {} in {:.1f} s (attempt {})".format(
+            self.engine.port, delay, attempt + 1))
+        return stop_event.wait(delay)
+
+    def stats(self):
+        latency = self.first_sample_latency.summary()
+        return {
+            'state': self.state,
+            'attempts': self.attempts,
+            'reconnects': self.reconnects,
+            'last_first_sample_ms': None if self.last_first_sample is None else self.last_first_sample * 1000,
+            'first_sample_p50_ms': latency['p50_ms'] if latency else None,
+            'first_sample_max_ms': latency['max_ms'] if latency else None,
+        }
@@ -0,0 +1,111 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Tests for PartDetector at the edges of its thresholds."""
+
+import pytest
+
+from conformity import PartDetector, STATE_IDLE, STATE_SETTLING, STATE_DECIDED
+
+STEP = 0.25  # seconds between samples; exact in binary, like the thresholds below
+
+
+def detector(**options):
+    settings = dict(presence_distance=80.0, hysteresis=5.0, debounce_samples=3,
+                    settle_samples=3, settle_tolerance=0.5, min_dwell=0.5)
+    settings.update(options)
+    return PartDetector(**settings)
+
+
+def feed(part_detector, values, start=0.0):
+    """Feed values STEP seconds apart; return [(sample index, Decision)]"""
+    decisions = []
+    for i, value in enumerate(values):
+        decision = part_detector.update(value, start + i * STEP)
+        if decision is not None:
+            decisions.append((i, decision))
+    return decisions
+
+
+def test_presence_distance_is_inclusive():
+    part_detector = detector()
+    feed(part_detector, [80.0] * 3)
+    assert part_detector.present
+
+    part_detector = detector()
+    feed(part_detector, [80.5] * 10)
+    assert part_detector.state == STATE_IDLE
+
+
+def test_arrival_needs_debounce_samples_in_a_row():
+    part_detector = detector()
+    feed(part_detector, [20.0, 20.0, 150.0, 20.0, 20.0, 150.0])
+    assert part_detector.state == STATE_IDLE
+    feed(part_detector, [20.0, 20.0, 20.0], start=10.0)
+    assert part_detector.present
+    # Arrival is dated from the first of the debounced samples
+    assert part_detector.arrival_time == 10.0
+
+
+def test_settles_at_exactly_the_tolerance_and_dwell():
+    part_detector = detector()
+    # Spread of exactly 0.5 cm; the third sample arrives 0.5 s after the first
+    decisions = feed(part_detector, [20.0, 20.5, 20.0])
+    assert len(decisions) == 1
+    index, decision = decisions[0]
+    assert index == 2
+    assert decision.settled
+    assert decision.settle_time == 0.5
+    assert decision.samples == 3
+    assert decision.distance == pytest.approx((20.0 + 20.5 + 20.0) / 3)
+    assert part_detector.state == STATE_DECIDED
+
+
+def test_spread_just_over_the_tolerance_does_not_settle():
+    part_detector = detector()
+    assert feed(part_detector, [20.0, 20.75, 20.0]) == []
+    assert part_detector.state == STATE_SETTLING
+
+
+def test_waits_for_min_dwell():
+    part_detector = detector(min_dwell=0.75)
+    decisions = feed(part_detector, [20.0] * 5)
+    # Samples at 0, 0.25, 0.5 are stable, but 0.75 s have only passed at the fourth
+    assert [index for index, _ in decisions] == [3]
+
+
+def test_one_decision_per_part():
+    part_detector = detector()
+    decisions = feed(part_detector, [20.0] * 20 + [150.0] * 3 + [30.0] * 20)
+    assert [decision.distance for _, decision in decisions] == [20.0, 30.0]
+    assert part_detector.parts == 2
+
+
+def test_departure_uses_the_hysteresis_limit():
+    part_detector = detector()
+    feed(part_detector, [20.0] * 5)
+    # 85 cm is presence + hysteresis: still present
+    feed(part_detector, [85.0] * 5, start=5.0)
+    assert part_detector.present
+    feed(part_detector, [85.5] * 3, start=10.0)
+    assert part_detector.state == STATE_IDLE
+
+
+def test_part_leaving_before_settling_is_decided_unsettled():
+    part_detector = detector()
+    decisions = feed(part_detector, [20.0, 25.0, 30.0, 35.0, 150.0, 150.0, 150.0])
+    assert len(decisions) == 1
+    index, decision = decisions[0]
+    assert index == 6
+    assert not decision.settled
+    # Departure is dated from the first sample above the limit
+    assert decision.settle_time == 4 * STEP
+    assert decision.samples == 4
+
+
+def test_short_glitch_during_settling_counts_as_part_readings():
+    part_detector = detector(settle_samples=5, min_dwell=0.0)
+    decisions = feed(part_detector, [20.0, 20.0, 20.0, 90.0, 20.0])
+    # The 90 cm reading was not a departure, so it lands in the settle window
+    assert decisions == []
+    assert part_detector.present
+    assert part_detector.samples == 5
@@ -0,0 +1,46 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Tests for picking an export writer from the file extension."""
+
+import pytest
+
+from exporters import writer_for, write_csv, write_jsonl, write_parquet, write_npz, export
+
+
+@pytest.mark.parametrize("path, writer", [
+    ("tests.csv", write_csv),
+    ("tests.CSV", write_csv),
+    ("tests.jsonl", write_jsonl),
+    ("tests.ndjson", write_jsonl),
+])
+def test_row_writers(path, writer):
+    assert writer_for(path) is writer
+
+
+def test_other_row_extensions_are_written_as_json():
+    assert writer_for("tests.json").__name__ == "write_json"
+    assert writer_for("tests").__name__ == "write_json"
+
+
+@pytest.mark.parametrize("path", ["tests.parquet", "tests.arrow", "tests.feather", "tests.npy", "tests.npz"])
+def test_columnar_extension_in_a_row_export_is_rejected(path):
+    with pytest.raises(ValueError):
+        writer_for(path)
+
+
+@pytest.mark.parametrize("path", ["tests.csv", "tests.json", "tests"])
+def test_row_extension_in_a_columnar_export_is_rejected(path):
+    with pytest.raises(ValueError):
+        writer_for(path, columnar=True)
+
+
+def test_columnar_writers():
+    assert writer_for("tests.Parquet", columnar=True) is write_parquet
+    assert writer_for("tests.npz", columnar=True) is write_npz
+
+
+def test_mismatch_fails_before_the_file_is_created(tmp_path):
+    path = tmp_path / "tests.parquet"
+    with pytest.raises(ValueError):
+        export(path, iter([]), columnar=False)
+    assert not path.exists()
@@ -0,0 +1,75 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Tests for the table-driven firmware line parser."""
+
+import pytest
+
+from line_parser import (
+    parse_line, LINE_PATTERN, LINE_KINDS, STATUS_TOKENS,
+    KIND_DISTANCE, KIND_RESULT, KIND_ACK_BINARY, KIND_ACK_RATE, KIND_ACK_TEXT, KIND_TEXT
+)
+
+
+@pytest.mark.parametrize("line, expected", [
+    # Firmware status lines
+    ("Distance:12.34cm, Statut:Conforme", (KIND_DISTANCE, 12.34, True)),
+    ("Distance:45.00cm, Statut:Non Conforme", (KIND_DISTANCE, 45.0, False)),
+    ("Distance: 7 cm ,Statut: Non  Conforme", (KIND_DISTANCE, 7.0, False)),
+    ("distance:0.00cm, statut:conforme", (KIND_DISTANCE, 0.0, True)),
+    ("Distance:3.00cm, Statut:NON\tCONFORME", (KIND_DISTANCE, 3.0, False)),
+    ("Distance:20.5cm", (KIND_DISTANCE, 20.5, None)),
+    # Older formats
+    ("DIST:12.3", (KIND_DISTANCE, 12.3, None)),
+    ("DIST: .5", (KIND_DISTANCE, 0.5, None)),
+    ("12.3", (KIND_DISTANCE, 12.3, None)),
+    ("-1", (KIND_DISTANCE, -1.0, None)),
+    # Results
+    ("OK", (KIND_RESULT, True, None)),
+    ("NON", (KIND_RESULT, False, None)),
+    # Acknowledgements
+    ("ACK:BIN", (KIND_ACK_BINARY, None, None)),
+    ("ACK:BIN:115200", (KIND_ACK_BINARY, 115200, None)),
+    ("ACK:RATE:10", (KIND_ACK_RATE, 10, None)),
+    ("ACK:TXT", (KIND_ACK_TEXT, None, None)),
+    # Bare "<n> cm" anywhere, as the old parser accepted
+    ("Mesure 33.5 cm", (KIND_DISTANCE, 33.5, None)),
+    # Everything else is text
+    ("Systeme pret", (KIND_TEXT, "Systeme pret", None)),
+    ("OKAY", (KIND_TEXT, "OKAY", None)),
+    ("ACK:RATE:", (KIND_TEXT, "ACK:RATE:", None)),
+    ("ACK:BIN:fast", (KIND_TEXT, "ACK:BIN:fast", None)),
+    ("", (KIND_TEXT, "", None)),
+])
+def test_parse_line(line, expected):
+    kind, value, device_conforme = parse_line(line)
+    assert (kind, device_conforme) == (expected[0], expected[2])
+    if isinstance(expected[1], float):
+        assert value == pytest.approx(expected[1])
+    else:
+        assert value == expected[1]
+
+
+def test_every_alternative_has_a_handler():
+    alternatives = {name for name in LINE_PATTERN.groupindex if name.endswith("_line")}
+    assert alternatives == set(LINE_KINDS)
+
+
+def test_whole_line_must_match():
+    # An alternative is only taken when it covers the whole line
+    assert parse_line("12.3 volts")[0] == KIND_TEXT
+    assert parse_line("NON CONFORME")[0] == KIND_TEXT
+
+
+def test_every_status_token_has_a_verdict():
+    # Each spelling the pattern accepts must normalise to a STATUS_TOKENS key
+    for token in ("Conforme", "CONFORME", "Non Conforme", "non   conforme", "Non\tConforme"):
+        line = "Distance:1.00cm, Statut:" + token
+        assert LINE_PATTERN.fullmatch(line).group('status') is not None
+        assert parse_line(line)[2] == STATUS_TOKENS[" ".join(token.split()).lower()]
+
+
+def test_unknown_status_token_is_a_miss(monkeypatch):
+    # A token the pattern admits but the table lacks is not guessed at
+    monkeypatch.delitem(STATUS_TOKENS, 'non conforme')
+    line = "Distance:1.00cm, Statut:Non Conforme"
+    assert parse_line(line) == (KIND_TEXT, line, None)
@@ -0,0 +1,110 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Tests for the text/binary serial protocol decoder."""
+
+from protocol import ProtocolDecoder, Frame, encode_frame, crc8, FRAME_SIZE, STATUS_CONFORME, STATUS_NO_ECHO
+
+
+def binary_decoder():
+    decoder = ProtocolDecoder()
+    assert decoder.feed(b"ACK:BIN\r\n") == ["ACK:BIN"]
+    assert decoder.binary
+    return decoder
+
+
+def test_crc8_check_value():
+    # CRC-8/SMBUS (poly 0x07, init 0x00)
+    assert crc8(b"123456789") == 0xF4
+
+
+def test_frames_round_trip():
+    decoder = binary_decoder()
+    frames = [Frame(sequence, sequence * 25000, distance, status)
+              for sequence, distance, status in [(0, 0.0, 0), (1, 12.34, STATUS_CONFORME),
+                                                 (2, 655.35, STATUS_NO_ECHO), (3, 399.99, 0)]]
+    data = b"".join(encode_frame(*frame) for frame in frames)
+    assert len(data) == FRAME_SIZE * len(frames)
+    assert decoder.feed(data) == frames
+    assert decoder.stats()['frames'] == 4
+    assert decoder.crc_errors == decoder.lost_frames == decoder.skipped_bytes == 0
+
+
+def test_frames_split_at_every_byte():
+    decoder = binary_decoder()
+    data = encode_frame(7, 1, 20.5, 0) + encode_frame(8, 2, 21.5, 0)
+    items = []
+    for i in range(len(data)):
+        items += decoder.feed(data[i:i + 1])
+    assert items == [Frame(7, 1, 20.5, 0), Frame(8, 2, 21.5, 0)]
+
+
+def test_ack_and_frames_in_one_chunk():
+    decoder = ProtocolDecoder()
+    items = decoder.feed(b"Distance:5.00cm\r\nACK:BIN:115200\r\n" + encode_frame(0, 0, 5.0, 0))
+    assert items == ["Distance:5.00cm", "ACK:BIN:115200", Frame(0, 0, 5.0, 0)]
+
+
+def test_corrupted_frame_is_dropped_and_decoder_resyncs():
+    decoder = binary_decoder()
+    bad = bytearray(encode_frame(1, 10, 30.0, 0))
+    bad[7] ^= 0x10
+    data = encode_frame(0, 0, 30.0, 0) + bytes(bad) + encode_frame(2, 20, 31.0, 0)
+    assert decoder.feed(data) == [Frame(0, 0, 30.0, 0), Frame(2, 20, 31.0, 0)]
+    assert decoder.crc_errors == 1
+    assert decoder.lost_frames == 1
+    assert decoder.skipped_bytes == FRAME_SIZE
+
+
+def test_resync_after_garbage_and_sync_bytes_in_noise():
+    decoder = binary_decoder()
+    noise = b"\x00\xa5\xa5\x13\x37\xa5"
+    items = decoder.feed(noise + encode_frame(5, 0, 42.0, 0))
+    assert items == [Frame(5, 0, 42.0, 0)]
+    assert decoder.skipped_bytes == len(noise)
+
+
+def test_sequence_wrap_is_not_a_loss():
+    decoder = binary_decoder()
+    data = encode_frame(0xFFFF, 0, 1.0, 0) + encode_frame(0, 0, 1.0, 0) + encode_frame(2, 0, 1.0, 0)
+    assert len(decoder.feed(data)) == 3
+    assert decoder.lost_frames == 1
+
+
+def test_text_overrun_clears_the_buffer():
+    decoder = ProtocolDecoder(max_line=16)
+    assert decoder.feed(b"x" * 32) == []
+    assert decoder.overruns == 1
+    assert decoder.feed(b"Distance:1.00cm\n") == ["Distance:1.00cm"]
+
+
+def test_text_ack_switches_back_to_text():
+    decoder = binary_decoder()
+    data = encode_frame(1, 100, 12.5, STATUS_CONFORME) + b"ACK:TXT\r\nDistance:20.00cm\r\n"
+    items = decoder.feed(data)
+    assert items == [Frame(1, 100, 12.5, STATUS_CONFORME), "ACK:TXT", "Distance:20.00cm"]
+    assert not decoder.binary
+
+
+def test_text_ack_split_across_chunks():
+    decoder = binary_decoder()
+    assert decoder.feed(encode_frame(1, 100, 12.5, 0) + b"ACK") == [Frame(1, 100, 12.5, 0)]
+    assert decoder.binary
+    assert decoder.feed(b":TXT\r\n") == ["ACK:TXT"]
+    assert not decoder.binary
+    assert decoder.skipped_bytes == 0
+
+
+def test_text_ack_after_garbage():
+    decoder = binary_decoder()
+    assert decoder.feed(b"\x00\x13AB" + b"ACK:TXT\n") == ["ACK:TXT"]
+    assert not decoder.binary
+    assert decoder.skipped_bytes == 4
+
+
+def test_rate_ack_between_frames_stays_binary():
+    decoder = binary_decoder()
+    data = encode_frame(1, 0, 10.0, 0) + b"ACK:RATE:20\r\n" + encode_frame(2, 0, 11.0, 0)
+    assert decoder.feed(data[:14]) == [Frame(1, 0, 10.0, 0)]
+    assert decoder.feed(data[14:]) == ["ACK:RATE:20", Frame(2, 0, 11.0, 0)]
+    assert decoder.binary
+    assert decoder.skipped_bytes == 0
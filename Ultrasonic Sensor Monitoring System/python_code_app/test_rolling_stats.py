@@ -0,0 +1,115 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Tests for RollingStats, checked against a naive recompute of the window."""
+
+import math
+import random
+import statistics
+import threading
+
+import pytest
+
+from rolling_stats import RollingStats
+
+
+def naive(window):
+    return {
+        'min': min(window),
+        'max': max(window),
+        'avg': statistics.fmean(window),
+        'variance': statistics.variance(window) if len(window) > 1 else 0.0,
+    }
+
+
+def percentile(window, p):
+    ordered = sorted(window)
+    return ordered[max(1, math.ceil(p / 100 * len(ordered))) - 1]
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 100])
+def test_matches_naive_recompute(size):
+    rng = random.Random(size)
+    stats = RollingStats(size)
+    values = []
+    for i in range(1000):
+        # Plateaus and repeats exercise the monotonic deques
+        value = round(rng.choice([rng.uniform(0, 400), 25.0, 25.0, 180.5]), 1)
+        stats.append(value)
+        values.append(value)
+        window = values[-size:]
+        expected = naive(window)
+        summary = stats.summary()
+        assert stats.values() == window
+        assert summary['count'] == len(window)
+        assert summary['min'] == expected['min']
+        assert summary['max'] == expected['max']
+        assert summary['avg'] == pytest.approx(expected['avg'], abs=1e-6)
+        # Sliding removal leaves rounding residue (~1e-9 cm²), not drift
+        assert stats.variance() == pytest.approx(expected['variance'], rel=1e-9, abs=1e-6)
+        assert summary['p50'] == pytest.approx(percentile(window, 50))
+        assert summary['p95'] == pytest.approx(percentile(window, 95))
+
+
+def test_out_of_range_values_are_clamped_in_the_histogram_only():
+    stats = RollingStats(3)
+    for value in (-5.0, 10.0, 500.0):
+        stats.append(value)
+    assert stats.minimum() == -5.0
+    assert stats.maximum() == 500.0
+    assert stats.percentile(0) == 0.0
+    assert stats.percentile(100) == 400.0
+
+
+def test_clear_starts_a_new_window():
+    stats = RollingStats(4)
+    for value in (1.0, 2.0, 3.0, 4.0, 5.0):
+        stats.append(value)
+    stats.clear()
+    assert len(stats) == 0
+    assert stats.summary() is None
+    stats.append(7.0)
+    assert stats.summary() == {'count': 1, 'min': 7.0, 'max': 7.0, 'avg': 7.0,
+                               'std': 0.0, 'p50': pytest.approx(7.0), 'p95': pytest.approx(7.0)}
+
+
+def test_rejects_empty_window():
+    with pytest.raises(ValueError):
+        RollingStats(0)
+
+
+def test_concurrent_append_summary_and_clear():
+    stats = RollingStats(50)
+    stop = threading.Event()
+    errors = []
+
+    def writer():
+        rng = random.Random(1)
+        while not stop.is_set():
+            stats.append(round(rng.uniform(0, 400), 1))
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    try:
+        for i in range(3000):
+            summary = stats.summary()
+            if summary:
+                window = stats.values()
+                assert summary['min'] <= summary['p50'] + stats.resolution
+                assert summary['p50'] <= summary['max'] + stats.resolution
+                assert 0 < len(window) <= 50
+            if i % 100 == 0:
+                stats.clear()
+    except Exception as e:
+        errors.append(e)
+    finally:
+        stop.set()
+        thread.join()
+    assert not errors
+
+    # Still consistent after the churn
+    values = stats.values()
+    if len(values) > 1:
+        assert stats.minimum() == min(values)
+        assert stats.maximum() == max(values)
+        assert stats.mean == pytest.approx(statistics.fmean(values), abs=1e-6)
+        assert sum(stats.bins) == len(values)
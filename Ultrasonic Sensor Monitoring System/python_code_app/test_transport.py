@@ -0,0 +1,59 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""Tests for the EventQueue backpressure policies."""
+
+import time
+import asyncio
+
+import pytest
+
+from transport import EventQueue, DROP_OLDEST, DROP_NEWEST, BLOCK
+
+
+def full_queue(policy, **options):
+    events = EventQueue(2, policy=policy, **options)
+    assert events.offer(1) and events.offer(2)
+    return events
+
+
+def test_drop_oldest_keeps_the_newest_events():
+    events = full_queue(DROP_OLDEST)
+    assert not events.offer(3)
+    assert events.drain() == [2, 3]
+    assert events.dropped == 1
+
+
+def test_drop_newest_keeps_the_queued_events():
+    events = full_queue(DROP_NEWEST)
+    assert not events.offer(3)
+    assert events.drain() == [1, 2]
+    assert events.dropped == 1
+
+
+def test_block_waits_for_the_timeout_then_drops():
+    events = full_queue(BLOCK, block_timeout=0.05)
+    started = time.monotonic()
+    assert not events.offer(3)
+    assert time.monotonic() - started >= 0.05
+    assert events.drain() == [1, 2]
+    assert events.dropped == 1
+
+
+def test_block_never_waits_on_an_event_loop():
+    events = full_queue(BLOCK, block_timeout=5.0)
+
+    async def offer():
+        started = time.monotonic()
+        accepted = events.offer(3)
+        return accepted, time.monotonic() - started
+
+    accepted, elapsed = asyncio.run(offer())
+    assert not accepted
+    assert elapsed < 1.0
+    assert events.drain() == [1, 2]
+    assert events.dropped == 1
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        EventQueue(1, policy="spill")
@@ -0,0 +1,168 @@
+# Projet réalisé par Noreddine Akouchah
+
+"""asyncio serial transport and bounded subscriber queues.
+
+SerialTransport drives an AcquisitionEngine from an asyncio event loop: the
+port is opened in an executor so the loop never blocks, then read from a
+reader callback registered on the port's file descriptor (or from an executor
+read loop where the event loop cannot watch serial ports, as on Windows).
+
+EventQueue gives each consumer its own bounded queue with an explicit policy
+for the moment it falls behind, so a slow exporter or recorder never slows
+the reader down for everybody else:
+
+- DROP_OLDEST: discard the oldest queued event (live displays);
+- DROP_NEWEST: discard the incoming event (statistics that can miss a few);
+- BLOCK: wait for room, up to ``block_timeout`` seconds, then drop (records
+  that must not be lost; only use it for consumers that keep up).
+
+An event offered from a thread running an asyncio loop (an engine fed by
+SerialTransport) never waits: one full queue would stall every port on the
+loop. There BLOCK drops the incoming event at once, like DROP_NEWEST.
+"""
+
+import queue
+import asyncio
+import logging
+
+
+DROP_OLDEST = "drop-oldest"
+DROP_NEWEST = "drop-newest"
+BLOCK = "block"
+
+POLICIES = (DROP_OLDEST, DROP_NEWEST, BLOCK)
+
+
+def on_event_loop():
+    """True when called from a thread that is running an asyncio loop"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class EventQueue(queue.Queue):
+    """queue.Queue with an overflow policy and a count of dropped events"""
+
+    def __init__(self, maxsize=0, policy=DROP_NEWEST, block_timeout=1.0):
+        if policy not in POLICIES:
+            raise ValueError("Unknown backpressure policy: {}".format(policy))
+        super().__init__(maxsize)
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.dropped = 0
+
+    def offer(self, item):
+        """Enqueue item according to the policy; return False if an event was dropped"""
+        if self.policy == BLOCK and not on_event_loop():
+            try:
+                self.put(item, timeout=self.block_timeout)
+                return True
+            except queue.Full:
+                self.dropped += 1
+                return False
+
+        with self.mutex:
+            full = 0 < self.maxsize <= self._qsize()
+            if full:
+                self.dropped += 1
+                if self.policy != DROP_OLDEST:
+                    return False
+                self._get()
+                self.unfinished_tasks -= 1
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+        return not full
+
+    def drain(self):
+        """Remove and return every queued event, oldest first"""
+        with self.mutex:
+            items = list(self.queue)
+            self.queue.clear()
+            self.unfinished_tasks -= len(items)
+            if self.unfinished_tasks <= 0:
+                self.unfinished_tasks = 0
+                self.all_tasks_done.notify_all()
+            self.not_full.notify_all()
+        return items
+
+
+class SerialTransport:
+    """Feed one engine from an asyncio loop instead of a reader thread"""
+
+    def __init__(self, engine, max_errors=5, logger=None):
+        self.engine = engine
+        self.max_errors = max_errors
+        self.logger = logger or engine.logger or logging.getLogger("transport")
+        self.loop = None
+        self.fd = None
+        self.task = None
+        self.errors = 0
+
+    async def open(self, port=None, baudrate=None):
+        """Open the port without blocking the loop (raises serial.SerialException)"""
+        self.loop = asyncio.get_running_loop()
+        await self.loop.run_in_executor(None, lambda: self.engine.connect(port, baudrate, start_reader=False))
+        try:
+            self.fd = self.engine.arduino.fileno()
+            self.loop.add_reader(self.fd, self.on_readable)
+        except (AttributeError, NotImplementedError, ValueError, OSError):
+            # No file descriptor readiness on this platform/loop
+            self.fd = None
+            self.task = self.loop.create_task(self.read_loop())
+
+    def on_readable(self):
+        port = self.engine.arduino
+        try:
+            # Readable with nothing waiting means the device went away: read raises
+            data = port.read(port.in_waiting or 1)
+            if data:
+                self.engine.feed(data)
+                self.errors = 0
+        except Exception as e:
+            self.read_error(e)
+
+    async def read_loop(self):
+        port = self.engine.arduino
+
+        def read_blocking():
+            # Short timeout so close() is noticed quickly
+            port.timeout = 0.1
+            data = port.read(max(1, port.in_waiting))
+            waiting = port.in_waiting
+            return data + port.read(waiting) if data and waiting else data
+
+        while self.engine.is_running:
+            try:
+                data = await self.loop.run_in_executor(None, read_blocking)
+                if data:
+                    self.engine.feed(data)
+                    self.errors = 0
+            except Exception as e:
+                if not self.engine.is_running:
+                    break
+                self.read_error(e)
+
+    def read_error(self, error):
+        if not self.engine.is_running:
+            return
+        self.errors += 1
+        self.logger.error("Unexpected error reading %s: %s", self.engine.port, error)
+        if self.errors >= self.max_errors:
+            self.stop_reading()
+            self.engine.connection_lost(error)
+
+    def stop_reading(self):
+        if self.fd is not None:
+            self.loop.remove_reader(self.fd)
+            self.fd = None
+
+    async def close(self):
+        self.stop_reading()
+        self.engine.is_running = False
+        if self.task:
+            await self.task
+            self.task = None
+        self.engine.disconnect()
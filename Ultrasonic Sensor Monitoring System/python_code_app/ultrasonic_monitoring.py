@@ -6,14 +6,62 @@ import customtkinter as ctk
 from tkinter import messagebox, filedialog
 import tkinter as tk
 from tkinter import ttk
-import threading
 import time
 import json
-import csv
 from datetime import datetime
 from pathlib import Path
 import logging
-import re
+import logging.handlers
+import queue
+import sqlite3
+from ring_buffer import RingBuffer
+from log_utils import (
+    CategoryRateLimiter, UnicodeFormatter, CATEGORY_LEVELS, build_log_file_handler, strip_emoji
+)
+from conformity import PartDetector
+from history_view import HistoryView, SORT_NEWEST, SORT_DISTANCE_ASC, SORT_DISTANCE_DESC
+from plot import DistancePlot, WINDOWS
+from filters import FILTERS
+from acquisition import (
+    AcquisitionEngine, EVENT_CONNECTED, EVENT_CONNECT_FAILED, EVENT_CONNECTION_LOST,
+    EVENT_MEASUREMENT, EVENT_MESSAGE, EVENT_RESULT
+)
+from stations import StationManager
+from supervisor import ConnectionSupervisor
+from store import MeasurementStore
+import metrics
+from profiling import SPANS, SamplingProfiler, ProfileCapture
+from loop_watchdog import LoopWatchdog
+from exporters import (
+    ExportJob, history_columns, history_rows, store_rows, writer_for
+)
+
+# Log file rotation: by size, or by time when LOG_ROTATE_WHEN is set (e.g. "midnight")
+LOG_FILE = 'arduino_control.log'
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUP_COUNT = 5
+LOG_ROTATE_WHEN = None
+
+# Every sample and result is persisted here (set "store_file" to "" in config.json to disable)
+STORE_FILE = 'measurements.db'
+
+# Lines kept in the log console, and per-category rate limits (lines/s, burst)
+LOG_MAX_LINES = 1000
+LOG_RATE_LIMITS = {
+    'measurement': (2, 5),
+    'device': (5, 20),
+    'warning': (5, 10),
+}
+
+# While the Tk loop is stalling: slower refreshes and a tighter log budget
+DEGRADED_REFRESH_MS = 100
+DEGRADED_STATION_REFRESH_MS = 2000
+DEGRADED_PLOT_FPS = 4
+DEGRADED_LOG_RATE_LIMITS = {
+    'measurement': (0.2, 1),
+    'device': (1, 5),
+    'warning': (1, 5),
+}
 
 # Set appearance mode and color theme
 ctk.set_appearance_mode("dark")
@@ -32,26 +80,23 @@ class ModernArduinoInterface:
                 pass
         
         # Connection properties
-        self.arduino = None
-        self.is_running = False
-        self.port = None
         self.baudrate = 9600
         
-        # Statistics
-        self.conforme_count = 0
-        self.non_conforme_count = 0
-        self.session_start_time = None
-        self.test_history = []
-        
-        # Ultrasonic sensor data
-        self.current_distance = 0.0
-        self.distance_history = []
-        self.max_distance_history = 100
-        
         # Configuration
         self.config_file = Path("config.json")
         self.auto_reconnect = False
         self.sound_enabled = True
+        self.max_distance_history = 100
+        self.binary_protocol = False
+        self.binary_baudrate = None
+        self.sample_rate = None
+        self.signal_filter = "none"
+        self.part_detection = {}
+        self.store_file = STORE_FILE
+        self.metrics_port = None
+        self.metrics_host = "127.0.0.1"
+        self.metrics_file = None
+        self.loop_lag_threshold_ms = 250
         
         # Setup logging
         self.setup_logging()
@@ -59,41 +104,95 @@ class ModernArduinoInterface:
         # Load configuration
         self.load_config()
         
+        # Acquisition engine (serial I/O, parsing, statistics, recording)
+        self.engine = AcquisitionEngine(baudrate=self.baudrate,
+                                        max_distance_history=self.max_distance_history,
+                                        binary_protocol=self.binary_protocol,
+                                        binary_baudrate=self.binary_baudrate,
+                                        sample_rate=self.sample_rate,
+                                        signal_filter=self.signal_filter,
+                                        part_detector=PartDetector(**self.part_detection),
+                                        logger=self.logger)
+        self.engine.subscribe(self.on_engine_event)
+        
+        # Opens the port off the Tk thread and reconnects with backoff
+        self.supervisor = ConnectionSupervisor(self.engine, reconnect=self.auto_reconnect,
+                                               logger=self.logger)
+        self.connection_timer_running = False
+        self.export_job = None
+        
+        # Persistent append-only store of samples and results
+        self.store = None
+        if self.store_file:
+            try:
+                self.store = MeasurementStore(self.store_file, logger=self.logger)
+                self.store.attach(self.engine)
+            except sqlite3.Error as e:
+                self.logger.error("Unable to open measurement store {}: {}".format(self.store_file, str(e)))
+        
+        # Extra stations for the dashboard, all read by a single thread
+        self.station_manager = StationManager(logger=self.logger,
+                                              baudrate=self.baudrate,
+                                              max_distance_history=self.max_distance_history,
+                                              binary_protocol=self.binary_protocol,
+                                              binary_baudrate=self.binary_baudrate,
+                                              sample_rate=self.sample_rate,
+                                              signal_filter=self.signal_filter)
+        self.station_cards = {}
+        self.station_refresh_ms = 500
+        
+        # Batched GUI updates: engine events and log lines are buffered here
+        # and drained once per refresh tick
+        self.refresh_interval_ms = 33
+        self.event_buffer = RingBuffer(10000)
+        self.log_buffer = RingBuffer(2000)
+        
+        # Metrics for Prometheus (metrics_port / metrics_file in config.json)
+        self.setup_metrics()
+        
         # Setup GUI
         self.setup_gui()
+        self.loop_watchdog.start()
+        self.metrics.register(metrics.watchdog_collector(self.loop_watchdog))
+        self.root.after(self.refresh_interval_ms, self.refresh_tick)
+        self.root.after(self.station_refresh_ms, self.refresh_stations)
         
         # Auto-connect if configured
         if hasattr(self, 'last_port') and self.last_port:
             self.port_var.set(self.last_port)
 
+    def setup_metrics(self):
+        """Collect the engine, station, store and GUI queue metrics; serve and/or write them"""
+        self.metrics = metrics.MetricsRegistry(self.logger)
+        self.metrics.register(metrics.engine_collector(
+            lambda: [self.engine] + self.station_manager.engines()))
+        self.metrics.register(metrics.supervisor_collector(self.supervisor))
+        self.metrics.register(metrics.queue_collector({'events': self.event_buffer, 'log': self.log_buffer}))
+        if self.store:
+            self.metrics.register(metrics.store_collector(self.store))
+
+        self.metrics_server = None
+        self.metrics_writer = None
+        if self.metrics_port is not None:
+            try:
+                self.metrics_server = metrics.MetricsServer(self.metrics, self.metrics_port, self.metrics_host)
+                self.logger.info("Metrics on http://{}:{}/metrics".format(self.metrics_host, self.metrics_server.port))
+            except OSError as e:
+                self.logger.error("Unable to serve metrics on port {}: {}".format(self.metrics_port, str(e)))
+        if self.metrics_file:
+            self.metrics_writer = metrics.TextfileWriter(self.metrics, self.metrics_file)
+
     def setup_logging(self):
-        # Create a custom formatter that handles Unicode properly
-        class UnicodeFormatter(logging.Formatter):
-            def format(self, record):
-                # Remove emoji characters for console logging to avoid encoding issues
-                msg = super().format(record)
-                # Remove emoji characters for file logging on Windows
-                import re
-                # Remove all emoji characters
-                emoji_pattern = re.compile("["
-                    "\U0001F600-\U0001F64F"  # emoticons
-                    "\U0001F300-\U0001F5FF"  # symbols & pictographs
-                    "\U0001F680-\U0001F6FF"  # transport & map symbols
-                    "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-                    "\U00002702-\U000027B0"
-                    "\U000024C2-\U0001F251"
-                    "]+", flags=re.UNICODE)
-                return emoji_pattern.sub('', msg)
-        
         # Configure logging with UTF-8 support
         formatter = UnicodeFormatter('%(asctime)s - %(levelname)s - %(message)s')
         
-        # File handler with UTF-8 encoding
-        try:
-            file_handler = logging.FileHandler('arduino_control.log', encoding='utf-8')
-        except:
-            # Fallback for systems that don't support UTF-8
-            file_handler = logging.FileHandler('arduino_control.log')
+        # Rotating file handler with UTF-8 encoding
+        file_handler = build_log_file_handler(
+            LOG_FILE,
+            max_bytes=LOG_MAX_BYTES,
+            backup_count=LOG_BACKUP_COUNT,
+            when=LOG_ROTATE_WHEN
+        )
         file_handler.setFormatter(formatter)
         
         # Console handler with UTF-8 encoding
@@ -107,12 +206,21 @@ class ModernArduinoInterface:
         # Clear existing handlers
         self.logger.handlers.clear()
         
-        # Add handlers
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
+        # File and console writes happen on a background listener thread,
+        # the caller only enqueues the record
+        log_queue = queue.Queue(-1)
+        self.log_listener = logging.handlers.QueueListener(
+            log_queue, file_handler, console_handler, respect_handler_level=True
+        )
+        self.log_listener.start()
+        self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
         
         # Prevent propagation to avoid duplicate logs
         self.logger.propagate = False
+        
+        # Per-category budget (lines/s, burst) for the log console and file
+        self.log_limiter = CategoryRateLimiter(LOG_RATE_LIMITS)
+        self.suppressed_log_lines = 0
 
     def load_config(self):
         try:
@@ -123,6 +231,19 @@ class ModernArduinoInterface:
                     self.baudrate = config.get('baudrate', 9600)
                     self.auto_reconnect = config.get('auto_reconnect', False)
                     self.sound_enabled = config.get('sound_enabled', True)
+                    self.max_distance_history = config.get('max_distance_history', 100)
+                    self.binary_protocol = config.get('binary_protocol', False)
+                    self.binary_baudrate = config.get('binary_baudrate')
+                    self.sample_rate = config.get('sample_rate')
+                    self.signal_filter = config.get('signal_filter', 'none')
+                    if self.signal_filter not in FILTERS:
+                        self.signal_filter = 'none'
+                    self.part_detection = config.get('part_detection', {})
+                    self.store_file = config.get('store_file', STORE_FILE)
+                    self.metrics_port = config.get('metrics_port')
+                    self.metrics_host = config.get('metrics_host', "127.0.0.1")
+                    self.metrics_file = config.get('metrics_file')
+                    self.loop_lag_threshold_ms = config.get('loop_lag_threshold_ms', 250)
                     
                     # Log without emojis
                     clean_msg = "Configuration loaded successfully"
@@ -138,7 +259,18 @@ class ModernArduinoInterface:
                 'last_port': self.port_var.get(),
                 'baudrate': self.baudrate,
                 'auto_reconnect': self.auto_reconnect,
-                'sound_enabled': self.sound_enabled
+                'sound_enabled': self.sound_enabled,
+                'max_distance_history': self.max_distance_history,
+                'binary_protocol': self.binary_protocol,
+                'binary_baudrate': self.binary_baudrate,
+                'sample_rate': self.sample_rate,
+                'signal_filter': self.signal_filter,
+                'part_detection': self.part_detection,
+                'store_file': self.store_file,
+                'metrics_port': self.metrics_port,
+                'metrics_host': self.metrics_host,
+                'metrics_file': self.metrics_file,
+                'loop_lag_threshold_ms': self.loop_lag_threshold_ms
             }
             with open(self.config_file, 'w', encoding='utf-8') as f:
                 json.dump(config, f, indent=2, ensure_ascii=False)
@@ -158,6 +290,11 @@ class ModernArduinoInterface:
         
         # Set gradient background colors
         self.root.configure(fg_color=("#f0f0f0", "#0a0a0a"))
+        
+        # Heartbeat on the Tk loop; every root.after callback from here on is timed
+        self.degraded_settings = None
+        self.loop_watchdog = LoopWatchdog(self.root, threshold_ms=self.loop_lag_threshold_ms,
+                                          on_change=self.set_degraded_mode).install()
 
         # Main container with gradient effect
         self.main_container = ctk.CTkFrame(
@@ -184,6 +321,7 @@ class ModernArduinoInterface:
         # Setup tabs
         self.setup_main_tab()
         self.setup_stats_tab()
+        self.setup_stations_tab()
         self.setup_settings_tab()
 
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -247,6 +385,17 @@ class ModernArduinoInterface:
         )
         status_panel.pack(side="right", padx=30, pady=20, fill="y")
 
+        # Event-loop lag badge, shown only while the GUI is lagging
+        self.lag_badge = ctk.CTkLabel(
+            header_frame,
+            text="",
+            font=ctk.CTkFont(size=12, weight="bold"),
+            fg_color="#f59e0b",
+            text_color="white",
+            corner_radius=10
+        )
+        self.lag_badge_visible = False
+
         # Connection status
         self.connection_indicator = ctk.CTkLabel(
             status_panel,
@@ -279,8 +428,46 @@ class ModernArduinoInterface:
     def update_time(self):
         current_time = datetime.now().strftime("%H:%M:%S")
         self.time_label.configure(text=f"🕐 {current_time}")
+        self.update_lag_badge()
         self.root.after(1000, self.update_time)
 
+    def update_lag_badge(self):
+        watchdog = self.loop_watchdog
+        if not watchdog.lagging:
+            if self.lag_badge_visible:
+                self.lag_badge.pack_forget()
+                self.lag_badge_visible = False
+            return
+        
+        lag_ms = watchdog.smoothed_lag * 1000
+        if watchdog.degraded:
+            self.lag_badge.configure(text="🐢 DEGRADED · UI lag {:.0f} ms".format(lag_ms), fg_color="#ef4444")
+        else:
+            self.lag_badge.configure(text="⚠️ UI lag {:.0f} ms".format(lag_ms), fg_color="#f59e0b")
+        if not self.lag_badge_visible:
+            self.lag_badge.pack(side="right", padx=(0, 10), ipadx=10, ipady=4)
+            self.lag_badge_visible = True
+
+    def set_degraded_mode(self, degraded):
+        """Refresh less often and log less while the Tk loop is stalling; restore afterwards"""
+        if degraded and self.degraded_settings is None:
+            slowest = ", ".join("{} {:.0f} ms".format(name, seconds * 1000)
+                                for seconds, _, name in self.loop_watchdog.slowest_callbacks()[:3])
+            self.log_message("🐢 UI lag {:.0f} ms, switching to degraded mode (slowest: {})".format(
+                self.loop_watchdog.smoothed_lag * 1000, slowest or "n/a"), "warning")
+            self.degraded_settings = (self.refresh_interval_ms, self.station_refresh_ms,
+                                      self.distance_plot.min_frame_interval, self.log_limiter.rates)
+            self.refresh_interval_ms = DEGRADED_REFRESH_MS
+            self.station_refresh_ms = DEGRADED_STATION_REFRESH_MS
+            self.distance_plot.min_frame_interval = 1.0 / DEGRADED_PLOT_FPS
+            self.log_limiter.rates = dict(DEGRADED_LOG_RATE_LIMITS)
+        elif not degraded and self.degraded_settings is not None:
+            (self.refresh_interval_ms, self.station_refresh_ms,
+             self.distance_plot.min_frame_interval, self.log_limiter.rates) = self.degraded_settings
+            self.degraded_settings = None
+            self.log_message("✅ UI responsive again, normal refresh restored")
+        self.update_lag_badge()
+
     def setup_tabview(self):
         # Custom tabview with modern styling
         self.tabview = ctk.CTkTabview(
@@ -300,6 +487,7 @@ class ModernArduinoInterface:
         # Add tabs with icons
         self.tab_main = self.tabview.add("🎛️ Contrôle Principal")
         self.tab_stats = self.tabview.add("📊 Statistiques")
+        self.tab_stations = self.tabview.add("🏭 Stations")
         self.tab_settings = self.tabview.add("⚙️ Paramètres")
 
     def setup_main_tab(self):
@@ -438,6 +626,19 @@ class ModernArduinoInterface:
         )
         auto_reconnect_cb.pack(side="right", padx=(0, 30))
 
+        # Binary protocol option (old firmware keeps sending text)
+        self.binary_protocol_var = ctk.BooleanVar(value=self.binary_protocol)
+        binary_protocol_cb = ctk.CTkCheckBox(
+            connect_row,
+            text="⚡ Binary Frames",
+            variable=self.binary_protocol_var,
+            command=self.toggle_binary_protocol,
+            font=ctk.CTkFont(size=12),
+            checkbox_width=20,
+            checkbox_height=20
+        )
+        binary_protocol_cb.pack(side="right", padx=(0, 15))
+
         self.refresh_ports()
 
     def setup_distance_section(self, parent):
@@ -552,7 +753,14 @@ class ModernArduinoInterface:
         stats_row.pack(fill="x", padx=20, pady=(0, 20))
 
         # Stats cards
-        for i, (label, color) in enumerate([("Min", "#ef4444"), ("Max", "#f59e0b"), ("Avg", "#06b6d4")]):
+        stat_configs = [
+            ("Min: -- cm", "#ef4444", "min_distance_label"),
+            ("Max: -- cm", "#f59e0b", "max_distance_label"),
+            ("Avg: -- cm", "#06b6d4", "avg_distance_label"),
+            ("Std: -- cm", "#8b5cf6", "std_distance_label"),
+            ("P50/P95: -- cm", "#10b981", "percentile_distance_label")
+        ]
+        for text, color, attr_name in stat_configs:
             stat_card = ctk.CTkFrame(
                 stats_row,
                 fg_color=("#ffffff", "#1f2937"),
@@ -562,30 +770,14 @@ class ModernArduinoInterface:
             )
             stat_card.pack(side="left", fill="x", expand=True, padx=5)
 
-            if i == 0:
-                self.min_distance_label = ctk.CTkLabel(
-                    stat_card,
-                    text="Min: -- cm",
-                    font=ctk.CTkFont(size=12, weight="bold"),
-                    text_color=color
-                )
-                self.min_distance_label.pack(pady=10)
-            elif i == 1:
-                self.max_distance_label = ctk.CTkLabel(
-                    stat_card,
-                    text="Max: -- cm",
-                    font=ctk.CTkFont(size=12, weight="bold"),
-                    text_color=color
-                )
-                self.max_distance_label.pack(pady=10)
-            else:
-                self.avg_distance_label = ctk.CTkLabel(
-                    stat_card,
-                    text="Avg: -- cm",
-                    font=ctk.CTkFont(size=12, weight="bold"),
-                    text_color=color
-                )
-                self.avg_distance_label.pack(pady=10)
+            label = ctk.CTkLabel(
+                stat_card,
+                text=text,
+                font=ctk.CTkFont(size=12, weight="bold"),
+                text_color=color
+            )
+            label.pack(pady=10)
+            setattr(self, attr_name, label)
 
         # Reset button
         reset_distance_btn = ctk.CTkButton(
@@ -600,10 +792,6 @@ class ModernArduinoInterface:
         )
         reset_distance_btn.pack(side="right", padx=15)
 
-        # Initialize thresholds
-        self.min_threshold = 10.0
-        self.max_threshold = 50.0
-
     def setup_test_controls_section(self, parent):
         # Test controls card
         test_card = ctk.CTkFrame(
@@ -870,6 +1058,15 @@ class ModernArduinoInterface:
         )
         auto_scroll_cb.pack(side="right", padx=15)
 
+        # Lines dropped by the per-category rate limits
+        self.suppressed_label = ctk.CTkLabel(
+            controls_frame,
+            text="🔇 Suppressed: 0",
+            font=ctk.CTkFont(size=12),
+            text_color=("#64748b", "#94a3b8")
+        )
+        self.suppressed_label.pack(side="right", padx=15)
+
         # Log text area with modern styling
         self.log_text = ctk.CTkTextbox(
             log_card,
@@ -891,6 +1088,40 @@ class ModernArduinoInterface:
         )
         stats_scroll.pack(fill="both", expand=True, padx=20, pady=20)
 
+        # Live distance plot card
+        plot_card = ctk.CTkFrame(
+            stats_scroll,
+            fg_color=("#f8fafc", "#111827"),
+            corner_radius=20,
+            border_width=1,
+            border_color=("#e5e7eb", "#374151")
+        )
+        plot_card.pack(fill="x", pady=(0, 25))
+
+        plot_header = ctk.CTkFrame(plot_card, fg_color="transparent")
+        plot_header.pack(fill="x", padx=20, pady=(15, 5))
+
+        ctk.CTkLabel(
+            plot_header,
+            text="📈 Live Distance",
+            font=ctk.CTkFont(size=20, weight="bold")
+        ).pack(side="left")
+
+        self.plot_window_var = ctk.StringVar(value=WINDOWS[0][0])
+        ctk.CTkSegmentedButton(
+            plot_header,
+            values=[name for name, _ in WINDOWS],
+            variable=self.plot_window_var,
+            command=self.change_plot_window
+        ).pack(side="right")
+
+        self.distance_plot = DistancePlot(
+            plot_card,
+            min_threshold=self.engine.min_threshold,
+            max_threshold=self.engine.max_threshold
+        )
+        self.distance_plot.pack(fill="x", padx=20, pady=(5, 20))
+
         # Session info card
         session_card = ctk.CTkFrame(
             stats_scroll,
@@ -967,6 +1198,58 @@ class ModernArduinoInterface:
         )
         title_label.pack(pady=15)
 
+        # Filter, sort and jump controls
+        history_controls = ctk.CTkFrame(history_card, fg_color="transparent")
+        history_controls.pack(fill="x", padx=20, pady=(0, 10))
+
+        self.history_filter_var = ctk.StringVar(value="All")
+        ctk.CTkSegmentedButton(
+            history_controls,
+            values=["All", "PASS", "FAIL"],
+            variable=self.history_filter_var,
+            command=self.change_history_filter
+        ).pack(side="left", padx=(0, 15))
+
+        self.history_sort_var = ctk.StringVar(value="Newest first")
+        ctk.CTkComboBox(
+            history_controls,
+            variable=self.history_sort_var,
+            values=["Newest first", "Distance ↑", "Distance ↓"],
+            command=self.change_history_sort,
+            width=150,
+            state="readonly",
+            border_color=("#8b5cf6", "#7c3aed")
+        ).pack(side="left", padx=5)
+
+        ctk.CTkButton(
+            history_controls,
+            text="⏭ Oldest",
+            command=lambda: self.history_view.jump_to(len(self.history_view.model)),
+            width=100,
+            height=30,
+            fg_color=("#64748b", "#475569"),
+            hover_color=("#475569", "#334155")
+        ).pack(side="right", padx=5)
+
+        ctk.CTkButton(
+            history_controls,
+            text="⏮ Newest",
+            command=lambda: self.history_view.jump_to(0),
+            width=100,
+            height=30,
+            fg_color=("#64748b", "#475569"),
+            hover_color=("#475569", "#334155")
+        ).pack(side="right", padx=5)
+
+        self.history_jump_entry = ctk.CTkEntry(
+            history_controls,
+            width=100,
+            placeholder_text="Go to #",
+            border_color=("#8b5cf6", "#7c3aed")
+        )
+        self.history_jump_entry.pack(side="right", padx=5)
+        self.history_jump_entry.bind("<Return>", self.jump_to_history_record)
+
         # Create modern table using tkinter Treeview with custom styling
         table_container = ctk.CTkFrame(
             history_card,
@@ -998,38 +1281,229 @@ class ModernArduinoInterface:
                  background=[('selected', '#3b82f6')],
                  foreground=[('selected', '#ffffff')])
 
-        # Create treeview
-        columns = ('🕐 Time', '✅ Result', '📏 Distance', '⏱️ Duration')
-        self.history_tree = ttk.Treeview(
+        # Virtualized table: only the visible rows exist as widgets
+        self.history_view = HistoryView(
             table_container,
-            columns=columns,
-            show='headings',
+            lambda: self.engine.test_history,
             height=12,
             style="Custom.Treeview"
         )
-        
-        # Configure column headings and widths
-        self.history_tree.heading('🕐 Time', text='🕐 Time', anchor='center')
-        self.history_tree.heading('✅ Result', text='✅ Result', anchor='center')
-        self.history_tree.heading('📏 Distance', text='📏 Distance (cm)', anchor='center')
-        self.history_tree.heading('⏱️ Duration', text='⏱️ Duration (ms)', anchor='center')
-        
-        self.history_tree.column('🕐 Time', width=120, anchor='center')
-        self.history_tree.column('✅ Result', width=150, anchor='center')
-        self.history_tree.column('📏 Distance', width=120, anchor='center')
-        self.history_tree.column('⏱️ Duration', width=120, anchor='center')
+        self.history_view.pack()
 
-        # Add scrollbar
-        tree_scroll = ctk.CTkScrollbar(
-            table_container,
-            orientation="vertical",
-            command=self.history_tree.yview
+    def setup_stations_tab(self):
+        # Multi-station dashboard: one card per additional sensor
+        stations_scroll = ctk.CTkScrollableFrame(
+            self.tab_stations,
+            fg_color="transparent"
+        )
+        stations_scroll.pack(fill="both", expand=True, padx=20, pady=20)
+
+        stations_card = ctk.CTkFrame(
+            stations_scroll,
+            fg_color=("#f8fafc", "#111827"),
+            corner_radius=20,
+            border_width=1,
+            border_color=("#e5e7eb", "#374151")
+        )
+        stations_card.pack(fill="both", expand=True)
+
+        # Header
+        header = ctk.CTkFrame(
+            stations_card,
+            fg_color=("#f59e0b", "#d97706"),
+            corner_radius=15,
+            height=60
+        )
+        header.pack(fill="x", padx=15, pady=15)
+        header.pack_propagate(False)
+
+        ctk.CTkLabel(
+            header,
+            text="🏭 Station Dashboard",
+            font=ctk.CTkFont(size=20, weight="bold"),
+            text_color="white"
+        ).pack(pady=15)
+
+        # Controls
+        controls = ctk.CTkFrame(stations_card, fg_color="transparent")
+        controls.pack(fill="x", padx=20, pady=(0, 10))
+
+        ctk.CTkButton(
+            controls,
+            text="🔍 Open All Ports",
+            command=self.open_all_stations,
+            width=160,
+            height=35,
+            fg_color=("#f59e0b", "#d97706"),
+            hover_color=("#d97706", "#b45309"),
+            font=ctk.CTkFont(weight="bold")
+        ).pack(side="left", padx=(0, 10))
+
+        ctk.CTkButton(
+            controls,
+            text="🔌 Close All",
+            command=self.close_all_stations,
+            width=120,
+            height=35,
+            fg_color=("#ef4444", "#dc2626"),
+            hover_color=("#dc2626", "#b91c1c"),
+            font=ctk.CTkFont(weight="bold")
+        ).pack(side="left", padx=5)
+
+        self.stations_count_label = ctk.CTkLabel(
+            controls,
+            text="No station open",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color=("#64748b", "#94a3b8")
+        )
+        self.stations_count_label.pack(side="right", padx=10)
+
+        # Card grid, filled as stations are opened
+        self.stations_grid = ctk.CTkFrame(stations_card, fg_color="transparent")
+        self.stations_grid.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        for column in range(3):
+            self.stations_grid.grid_columnconfigure(column, weight=1)
+
+    def add_station_card(self, port):
+        index = len(self.station_cards)
+        card = ctk.CTkFrame(
+            self.stations_grid,
+            fg_color=("#ffffff", "#1f2937"),
+            corner_radius=15,
+            border_width=2,
+            border_color=("#64748b", "#475569")
         )
-        self.history_tree.configure(yscrollcommand=tree_scroll.set)
+        card.grid(row=index // 3, column=index % 3, padx=10, pady=10, sticky="ew")
 
-        # Pack treeview and scrollbar
-        self.history_tree.pack(side="left", fill="both", expand=True, padx=10, pady=10)
-        tree_scroll.pack(side="right", fill="y", pady=10, padx=(0, 10))
+        ctk.CTkLabel(
+            card,
+            text="📡 {}".format(port),
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color=("#1f2937", "#f9fafb")
+        ).pack(pady=(12, 2))
+
+        widgets = {'card': card}
+        widgets['distance'] = ctk.CTkLabel(
+            card,
+            text="-- cm",
+            font=ctk.CTkFont(size=26, weight="bold"),
+            text_color=("#1f2937", "#f9fafb")
+        )
+        widgets['distance'].pack()
+
+        widgets['result'] = ctk.CTkLabel(card, text="⏳ Waiting", font=ctk.CTkFont(size=13, weight="bold"))
+        widgets['result'].pack()
+
+        widgets['details'] = ctk.CTkLabel(
+            card,
+            text="",
+            font=ctk.CTkFont(size=11),
+            text_color=("#64748b", "#94a3b8")
+        )
+        widgets['details'].pack(pady=(2, 5))
+
+        # Per-station thresholds
+        threshold_row = ctk.CTkFrame(card, fg_color="transparent")
+        threshold_row.pack(pady=(0, 12))
+        engine = self.station_manager.stations[port].engine
+        for key, value in (('min', engine.min_threshold), ('max', engine.max_threshold)):
+            entry = ctk.CTkEntry(threshold_row, width=55, justify="center")
+            entry.insert(0, str(value))
+            entry.pack(side="left", padx=2)
+            widgets[key] = entry
+        ctk.CTkButton(
+            threshold_row,
+            text="✅",
+            command=lambda: self.apply_station_thresholds(port),
+            width=35,
+            height=28
+        ).pack(side="left", padx=2)
+
+        self.station_cards[port] = widgets
+
+    def open_all_stations(self):
+        """Open every detected port except the one used on the main tab"""
+        # The supervisor owns that port even while it is closed between
+        # reconnect attempts, or disconnected until the next Connect
+        exclude = [self.supervisor.engine.port] if self.supervisor.engine.port else []
+        known = set(self.station_manager.stations)
+        failed = self.station_manager.open_all(exclude=exclude)
+        for port in failed:
+            self.log_message("❌ Station {} unavailable: {}".format(port, failed[port]))
+
+        opened = [port for port in self.station_manager.stations if port not in known]
+        for port in opened:
+            engine = self.station_manager.stations[port].engine
+            engine.subscribe(self.station_event_handler(port))
+            if self.store:
+                self.store.attach(engine)
+            self.log_message("🏭 Station {} opened".format(port))
+        if opened:
+            self.station_manager.start()
+        elif not failed:
+            self.log_message("⚠️ No additional serial port detected")
+        self.refresh_stations(reschedule=False)
+
+    def close_all_stations(self):
+        self.station_manager.stop()
+        for widgets in self.station_cards.values():
+            widgets['card'].destroy()
+        self.station_cards = {}
+        self.stations_count_label.configure(text="No station open")
+        self.log_message("🔌 All stations closed")
+
+    def station_event_handler(self, port):
+        def on_event(event, payload):
+            # Reader thread: only queue log lines, cards are refreshed by the timer
+            if event == EVENT_MESSAGE and payload['category'] in CATEGORY_LEVELS:
+                self.log_message("[{}] {}".format(port, payload['text']), payload['category'])
+            elif event == EVENT_CONNECTION_LOST:
+                self.log_message("❌ Station {} lost: {}".format(port, payload['error']), "error")
+        return on_event
+
+    def apply_station_thresholds(self, port):
+        widgets = self.station_cards[port]
+        try:
+            min_val = float(widgets['min'].get())
+            max_val = float(widgets['max'].get())
+            self.station_manager.stations[port].engine.set_thresholds(min_val, max_val)
+        except (ValueError, KeyError) as e:
+            messagebox.showerror("Error", "Invalid thresholds for {}: {}".format(port, str(e)))
+            return
+        self.log_message("⚙️ [{}] Seuils appliqués: Min={:.1f}cm, Max={:.1f}cm".format(port, min_val, max_val))
+
+    def refresh_stations(self, reschedule=True):
+        """Update the station cards from a snapshot; cheap enough to run twice a second"""
+        started = SPANS.start()
+        try:
+            rows = self.station_manager.snapshot()
+            for row in rows:
+                if row['port'] not in self.station_cards:
+                    self.add_station_card(row['port'])
+                widgets = self.station_cards[row['port']]
+                color = "#10b981" if row['conforme'] else "#ef4444"
+                if not row['connected']:
+                    color = "#64748b"
+                widgets['card'].configure(border_color=(color, color))
+                widgets['distance'].configure(text="{:.1f} cm".format(row['distance']))
+                if row['last_result']:
+                    widgets['result'].configure(
+                        text="✅ PASS" if row['last_result'] == "PASS" else "❌ FAIL",
+                        text_color="#10b981" if row['last_result'] == "PASS" else "#ef4444"
+                    )
+                summary = row['summary']
+                widgets['details'].configure(text="{:.1f} Hz | {} tests | {:.1f}% pass{}".format(
+                    row['rate'], summary['total'], summary['success_rate'],
+                    "" if row['connected'] else " | disconnected"))
+            if rows:
+                self.stations_count_label.configure(text="{} station(s) open".format(len(rows)))
+        except Exception as e:
+            self.logger.error("Error refreshing stations: {}".format(str(e)))
+        if started:
+            SPANS.stop("gui.stations", started)
+        
+        if reschedule:
+            self.root.after(self.station_refresh_ms, self.refresh_stations)
 
     def setup_settings_tab(self):
         # Settings tab with modern cards
@@ -1208,6 +1682,61 @@ class ModernArduinoInterface:
         )
         json_btn.pack(side="left", padx=15)
 
+        store_btn = ctk.CTkButton(
+            export_frame,
+            text="🗄️ Export Time Range",
+            command=self.export_from_store,
+            width=180,
+            height=50,
+            fg_color=("#8b5cf6", "#7c3aed"),
+            hover_color=("#7c3aed", "#6d28d9"),
+            font=ctk.CTkFont(size=14, weight="bold"),
+            corner_radius=15
+        )
+        store_btn.pack(side="left", padx=15)
+
+        columnar_btn = ctk.CTkButton(
+            export_frame,
+            text="🧮 Export Parquet/NumPy",
+            command=self.export_columnar,
+            width=180,
+            height=50,
+            fg_color=("#f59e0b", "#d97706"),
+            hover_color=("#d97706", "#b45309"),
+            font=ctk.CTkFont(size=14, weight="bold"),
+            corner_radius=15
+        )
+        columnar_btn.pack(side="left", padx=15)
+
+        # Export progress (exports run on a worker thread)
+        progress_frame = ctk.CTkFrame(export_card, fg_color="transparent")
+        progress_frame.pack(fill="x", padx=20, pady=(0, 20))
+
+        self.export_progress = ctk.CTkProgressBar(progress_frame, progress_color=("#10b981", "#059669"))
+        self.export_progress.set(0)
+        self.export_progress.pack(side="left", fill="x", expand=True, padx=(15, 10))
+
+        self.export_status_label = ctk.CTkLabel(
+            progress_frame,
+            text="",
+            width=160,
+            font=ctk.CTkFont(size=12),
+            text_color=("#64748b", "#94a3b8")
+        )
+        self.export_status_label.pack(side="left", padx=5)
+
+        self.export_cancel_btn = ctk.CTkButton(
+            progress_frame,
+            text="🛑 Cancel",
+            command=self.cancel_export,
+            width=100,
+            height=30,
+            state="disabled",
+            fg_color=("#ef4444", "#dc2626"),
+            hover_color=("#dc2626", "#b91c1c")
+        )
+        self.export_cancel_btn.pack(side="left", padx=(5, 15))
+
         # Advanced settings card
         advanced_card = ctk.CTkFrame(
             settings_scroll,
@@ -1266,6 +1795,156 @@ class ModernArduinoInterface:
         )
         log_folder_btn.pack(side="left", padx=15)
 
+        # Firmware acquisition rate
+        rate_frame = ctk.CTkFrame(advanced_card, fg_color="transparent")
+        rate_frame.pack(fill="x", padx=20, pady=(0, 20))
+
+        ctk.CTkLabel(
+            rate_frame,
+            text="📶 Sample rate (Hz):",
+            font=ctk.CTkFont(size=14, weight="bold")
+        ).pack(side="left", padx=(15, 15))
+
+        self.sample_rate_var = ctk.StringVar(value=str(self.sample_rate or 2))
+        rate_combo = ctk.CTkComboBox(
+            rate_frame,
+            variable=self.sample_rate_var,
+            values=["2", "5", "10", "20", "40"],
+            command=self.set_sample_rate,
+            width=120,
+            border_color=("#ef4444", "#dc2626")
+        )
+        rate_combo.pack(side="left", padx=5)
+
+        # Filter applied to the raw readings before the conformity decision
+        filter_frame = ctk.CTkFrame(advanced_card, fg_color="transparent")
+        filter_frame.pack(fill="x", padx=20, pady=(0, 20))
+
+        ctk.CTkLabel(
+            filter_frame,
+            text="🎚️ Signal filter:",
+            font=ctk.CTkFont(size=14, weight="bold")
+        ).pack(side="left", padx=(15, 15))
+
+        self.signal_filter_var = ctk.StringVar(value=self.signal_filter)
+        filter_combo = ctk.CTkComboBox(
+            filter_frame,
+            variable=self.signal_filter_var,
+            values=list(FILTERS),
+            command=self.set_signal_filter,
+            width=150,
+            border_color=("#ef4444", "#dc2626")
+        )
+        filter_combo.pack(side="left", padx=5)
+
+        self.setup_performance_card(settings_scroll)
+
+    def setup_performance_card(self, parent):
+        # Per-stage timings and profiler captures
+        performance_card = ctk.CTkFrame(
+            parent,
+            fg_color=("#f8fafc", "#111827"),
+            corner_radius=20,
+            border_width=1,
+            border_color=("#e5e7eb", "#374151")
+        )
+        performance_card.pack(fill="x", pady=(25, 0))
+
+        header = ctk.CTkFrame(
+            performance_card,
+            fg_color=("#0ea5e9", "#0284c7"),
+            corner_radius=15,
+            height=60
+        )
+        header.pack(fill="x", padx=15, pady=15)
+        header.pack_propagate(False)
+
+        ctk.CTkLabel(
+            header,
+            text="⏱️ Performance",
+            font=ctk.CTkFont(size=20, weight="bold"),
+            text_color="white"
+        ).pack(pady=15)
+
+        spans_frame = ctk.CTkFrame(performance_card, fg_color="transparent")
+        spans_frame.pack(fill="x", padx=20, pady=(0, 10))
+
+        self.spans_var = ctk.BooleanVar(value=SPANS.enabled)
+        ctk.CTkCheckBox(
+            spans_frame,
+            text="⏱️ Time each stage (p50/p99)",
+            variable=self.spans_var,
+            command=self.toggle_spans,
+            font=ctk.CTkFont(size=14, weight="bold"),
+            checkbox_width=20,
+            checkbox_height=20
+        ).pack(side="left", padx=15)
+
+        ctk.CTkButton(
+            spans_frame,
+            text="🔄 Reset",
+            command=self.reset_spans,
+            width=100,
+            height=32,
+            fg_color=("#64748b", "#475569"),
+            hover_color=("#475569", "#334155"),
+            corner_radius=10
+        ).pack(side="left", padx=5)
+
+        self.performance_text = ctk.CTkTextbox(
+            performance_card,
+            height=200,
+            font=ctk.CTkFont(family="Consolas", size=11),
+            fg_color=("#1e293b", "#0f172a"),
+            text_color=("#e2e8f0", "#cbd5e1"),
+            corner_radius=10
+        )
+        self.performance_text.pack(fill="x", padx=20, pady=(0, 10))
+        self.performance_text.configure(state="disabled")
+        self.root.after(1000, self.refresh_performance)
+
+        profile_frame = ctk.CTkFrame(performance_card, fg_color="transparent")
+        profile_frame.pack(fill="x", padx=20, pady=(0, 20))
+
+        self.profile_mode_var = ctk.StringVar(value="Sampling (all threads)")
+        ctk.CTkComboBox(
+            profile_frame,
+            variable=self.profile_mode_var,
+            values=["Sampling (all threads)", "cProfile (GUI thread)"],
+            width=200,
+            state="readonly",
+            border_color=("#0ea5e9", "#0284c7")
+        ).pack(side="left", padx=(15, 5))
+
+        self.profile_seconds_var = ctk.StringVar(value="10")
+        ctk.CTkEntry(
+            profile_frame,
+            textvariable=self.profile_seconds_var,
+            width=60
+        ).pack(side="left", padx=5)
+        ctk.CTkLabel(profile_frame, text="s").pack(side="left")
+
+        self.profile_btn = ctk.CTkButton(
+            profile_frame,
+            text="🔬 Capture Profile",
+            command=self.capture_profile,
+            width=170,
+            height=36,
+            fg_color=("#0ea5e9", "#0284c7"),
+            hover_color=("#0284c7", "#0369a1"),
+            font=ctk.CTkFont(size=13, weight="bold"),
+            corner_radius=12
+        )
+        self.profile_btn.pack(side="left", padx=10)
+
+        self.profile_status_label = ctk.CTkLabel(
+            profile_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color=("#64748b", "#94a3b8")
+        )
+        self.profile_status_label.pack(side="left", padx=5)
+
     def change_appearance(self, new_appearance):
         ctk.set_appearance_mode(new_appearance)
 
@@ -1294,7 +1973,7 @@ class ModernArduinoInterface:
             self.log_message("⚠️ No serial port detected")
 
     def toggle_connection(self):
-        if self.is_running:
+        if self.engine.is_running or self.supervisor.active:
             self.disconnect()
         else:
             self.connect()
@@ -1308,38 +1987,48 @@ class ModernArduinoInterface:
         selected_port = selected_port_display.split(' - ')[0]
         self.baudrate = int(self.baudrate_var.get())
 
-        try:
-            self.arduino = serial.Serial(selected_port, self.baudrate, timeout=1)
-            time.sleep(2)
-            
-            self.is_running = True
-            self.port = selected_port
-            self.session_start_time = datetime.now()
-            
-            self.update_connection_ui(True)
-            self.start_reading_thread()
-            self.start_connection_timer()
-            
-            self.log_message("🚀 Connected to {} at {} baud".format(selected_port, self.baudrate))
-            self.save_config()
-            
-        except serial.SerialException as e:
+        # Opened in the background: the result arrives as an engine event
+        self.status_label.configure(text="⏳ Connecting to {}...".format(selected_port), text_color="#f59e0b")
+        self.port_combo.configure(state="disabled")
+        self.supervisor.connect(selected_port, self.baudrate, reconnect=self.auto_reconnect)
+
+    def on_connected(self, payload):
+        self.update_connection_ui(True)
+        self.start_connection_timer()
+        
+        self.log_message("🚀 Connected to {} at {} baud".format(payload['port'], payload['baudrate']))
+        self.save_config()
+
+    def on_connect_failed(self, payload):
+        self.log_message("❌ Connection failed on {}: {}".format(payload['port'], payload['error']))
+        if self.supervisor.reconnect and self.supervisor.active:
+            # The supervisor keeps retrying with backoff
+            self.status_label.configure(text="🔄 Reconnecting...", text_color="#f59e0b")
+            return
+        self.update_connection_ui(False)
+        if payload['attempt'] == 1:
             messagebox.showerror("Connection Error", 
-                               "Unable to connect to port {}\n\nError: {}".format(selected_port, str(e)))
+                               "Unable to connect to port {}\n\nError: {}".format(payload['port'], payload['error']))
+
+    def on_connection_lost(self):
+        if self.supervisor.reconnect and self.supervisor.active:
             self.update_connection_ui(False)
-            self.log_message("❌ Connection failed on {}: {}".format(selected_port, str(e)))
+            self.status_label.configure(text="🔄 Reconnecting...", text_color="#f59e0b")
+            self.connect_btn.configure(text="🔌 DISCONNECT")
+            return
+        self.disconnect()
 
     def disconnect(self):
-        self.is_running = False
-        if self.arduino and self.arduino.is_open:
-            try:
-                self.arduino.close()
-            except Exception as e:
-                self.logger.error(f"Error closing serial connection: {e}")
+        self.supervisor.disconnect()
         
         self.update_connection_ui(False)
         self.reset_status()
         self.log_message("🔌 Disconnected")
+        
+        latency = self.engine.reader_latency.summary()
+        if latency:
+            self.log_message("⏱️ Reader latency: p50={:.2f} ms, p99={:.2f} ms, max={:.2f} ms".format(
+                latency['p50_ms'], latency['p99_ms'], latency['max_ms']))
 
     def update_connection_ui(self, connected):
         if connected:
@@ -1364,212 +2053,141 @@ class ModernArduinoInterface:
             self.status_label.configure(text="⏳ Waiting for connection...", text_color="#94a3b8")
 
     def start_connection_timer(self):
+        # One timer chain, however many times the link comes back
+        if self.connection_timer_running:
+            return
+        self.connection_timer_running = True
+        
         def update_timer():
-            if self.is_running and self.session_start_time:
-                duration = datetime.now() - self.session_start_time
+            if self.engine.is_running and self.engine.session_start_time:
+                duration = datetime.now() - self.engine.session_start_time
                 hours, remainder = divmod(int(duration.total_seconds()), 3600)
                 minutes, seconds = divmod(remainder, 60)
                 time_str = f"⏱️ Duration: {hours:02d}:{minutes:02d}:{seconds:02d}"
                 self.session_duration_label.configure(text=time_str)
                 self.session_start_label.configure(
-                    text=f"📅 Started: {self.session_start_time.strftime('%H:%M:%S')}"
+                    text=f"📅 Started: {self.engine.session_start_time.strftime('%H:%M:%S')}"
                 )
                 self.root.after(1000, update_timer)
+            else:
+                self.connection_timer_running = False
         
         self.root.after(1000, update_timer)
 
-    def start_reading_thread(self):
-        threading.Thread(target=self.read_arduino, daemon=True).start()
-
-    def read_arduino(self):
-        errors = 0
-        max_errors = 5
-        
-        while self.is_running and errors < max_errors:
-            try:
-                if self.arduino and self.arduino.in_waiting > 0:
-                    data = self.arduino.readline().decode('utf-8', errors='ignore').strip()
-                    
-                    if data:
-                        self.process_arduino_data(data)
-                        errors = 0
-                        
-                time.sleep(0.05)
-                
-
-                    
-            except Exception as e:
-                errors += 1
-                clean_msg = "Unexpected error reading Arduino data: {}".format(str(e))
-                self.logger.error(clean_msg)
-                if errors >= max_errors:
-                    self.log_message("❌ Multiple errors: {}".format(str(e)))
-                    self.root.after(0, self.disconnect)
-                    break
-
-    def process_arduino_data(self, data):
+    def on_engine_event(self, event, payload):
+        """Engine callback, runs on the reader thread: only buffers, never touches Tk"""
+        if event == EVENT_MESSAGE:
+            self.log_message(payload['text'], payload['category'])
+        elif event in (EVENT_MEASUREMENT, EVENT_RESULT, EVENT_CONNECTION_LOST,
+                       EVENT_CONNECTED, EVENT_CONNECT_FAILED):
+            self.event_buffer.append((event, payload))
+
+    def refresh_tick(self):
+        """Drain buffered events and update widgets once, however many samples arrived"""
+        started = SPANS.start()
         try:
-            # Process distance data first
-            if data.startswith("DIST:"):
-                distance = float(data.replace("DIST:", "").strip())
-                self.process_distance_data(distance)
-                return
-            
-            # Check for pure numeric distance values
-            if data.replace('.', '').replace('-', '').isdigit():
-                distance = float(data)
-                self.process_distance_data(distance)
-                return
+            samples = []
+            results = []
+            connection_lost = False
+            for event, payload in self.event_buffer.drain():
+                if event == EVENT_MEASUREMENT:
+                    samples.append((payload['time'], payload['distance']))
+                elif event == EVENT_RESULT:
+                    results.append(payload)
+                elif event == EVENT_CONNECTION_LOST:
+                    connection_lost = True
+                elif event == EVENT_CONNECTED:
+                    connection_lost = False
+                    self.on_connected(payload)
+                elif event == EVENT_CONNECT_FAILED:
+                    self.on_connect_failed(payload)
             
-            # Process test results
-            if data.upper() == "OK":
-                self.root.after(0, lambda: self.process_result(conforme=True))
-                return
-            elif data.upper() == "NON":
-                self.root.after(0, lambda: self.process_result(conforme=False))
-                return
+            dropped = self.event_buffer.take_dropped()
+            if dropped:
+                self.log_message("⚠️ GUI fell behind, {} events dropped".format(dropped))
             
-            # Try to parse distance patterns
-            if self.parse_arduino_data(data):
-                return
+            if samples:
+                self.update_distance_display()
+                self.distance_plot.add_samples(samples)
+            if self.tabview.get() == "📊 Statistiques":
+                # Frame-rate capped; skipped entirely while the tab is hidden
+                plot_started = SPANS.start()
+                if self.distance_plot.render() and plot_started:
+                    SPANS.stop("gui.plot", plot_started)
+            if results:
+                results_started = SPANS.start()
+                self.process_results(results)
+                if results_started:
+                    SPANS.stop("gui.results", results_started)
+            if connection_lost:
+                self.on_connection_lost()
             
-            # Log other messages
-            if data:
-                self.log_message("📡 Arduino: {}".format(data))
-                
+            log_started = SPANS.start()
+            self.flush_log()
+            if log_started:
+                SPANS.stop("gui.log", log_started)
         except Exception as e:
-            clean_msg = "Error processing Arduino data '{}': {}".format(data, str(e))
-            self.logger.error(clean_msg)
-            self.log_message("⚠️ Processing error: {}".format(data))
-
-    def parse_arduino_data(self, data):
-        try:
-            if data.startswith("DIST:"):
-                distance = float(data.replace("DIST:", "").strip())
-                self.update_distance(distance)
-                return True
-            
-            elif data.replace('.', '').replace('-', '').isdigit():
-                distance = float(data)
-                if 0 <= distance <= 400:
-                    self.update_distance(distance)
-                    return True
-            
-            distance_patterns = [
-                r'Distance:\s*(\d+\.?\d*)\s*cm',
-                r'(\d+\.?\d*)\s*cm',
-
-            ]
-            
-            for pattern in distance_patterns:
-                match = re.search(pattern, data, re.IGNORECASE)
-                if match:
-                    distance = float(match.group(1))
-                    if 0 <= distance <= 400:
-                        self.update_distance(distance)
-                        return True
-            
-            return False
-        except (ValueError, AttributeError) as e:
-            self.logger.error(f"Error parsing distance data '{data}': {e}")
-            return False
-
-    def process_distance_data(self, distance):
-        if not (0 <= distance <= 400):
-            self.log_message("⚠️ Distance out of range: {:.1f}cm".format(distance))
-            return
-            
-        self.current_distance = distance
-        
-        self.distance_history.append(distance)
-        if len(self.distance_history) > self.max_distance_history:
-            self.distance_history.pop(0)
+            self.logger.error("Error refreshing display: {}".format(str(e)))
+        if started:
+            SPANS.stop("gui.refresh", started)
         
-        self.root.after(0, self.update_distance_display)
-        
-        self.log_message("📏 Measurement: {:.1f} cm".format(distance))
-
-    def update_distance(self, distance):
-        if not (0 <= distance <= 400):
-            self.log_message("⚠️ Suspicious distance: {:.1f}cm".format(distance))
-            return
-            
-        self.current_distance = distance
-        
-        self.distance_history.append(distance)
-        if len(self.distance_history) > self.max_distance_history:
-            self.distance_history.pop(0)
-        
-        self.root.after(0, self.update_distance_display)
-        
-        self.log_message("📏 Distance: {:.1f} cm".format(distance))
+        self.root.after(self.refresh_interval_ms, self.refresh_tick)
 
     def apply_thresholds(self):
         """Apply the min/max threshold values"""
         try:
             min_val = float(self.min_entry.get())
             max_val = float(self.max_entry.get())
-            
-            if min_val >= max_val:
-                messagebox.showerror("Error", "Minimum value must be less than maximum value")
-                return
-                
-            if min_val < 0 or max_val < 0:
-                messagebox.showerror("Error", "Values must be positive")
-                return
-                
-            self.min_threshold = min_val
-            self.max_threshold = max_val
-            
-            self.log_message("⚙️ Seuils appliqués: Min={:.1f}cm, Max={:.1f}cm".format(min_val, max_val))
-            
-            # Re-evaluate current distance if available
-            if self.current_distance > 0:
-                self.check_conformity(self.current_distance)
-                
         except ValueError:
             messagebox.showerror("Error", "Please enter valid numeric values")
+            return
+            
+        try:
+            self.engine.set_thresholds(min_val, max_val)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+            
+        self.log_message("⚙️ Seuils appliqués: Min={:.1f}cm, Max={:.1f}cm".format(min_val, max_val))
+        self.distance_plot.set_thresholds(min_val, max_val)
+        
+        # Re-evaluate current distance if available
+        if self.engine.current_distance > 0:
+            self.show_conformity(self.engine.check_conformity(self.engine.current_distance))
 
-    def check_conformity(self, distance):
-        """Check if distance is within thresholds and update conformity status"""
-        if hasattr(self, 'min_threshold') and hasattr(self, 'max_threshold'):
-            if self.min_threshold <= distance <= self.max_threshold:
-                self.conformity_label.configure(text="✅ PASS", text_color="#10b981")
-                # Automatically trigger pass result
-                self.root.after(100, lambda: self.process_result(True))
-            else:
-                self.conformity_label.configure(text="❌ FAIL", text_color="#ef4444")
-                # Automatically trigger fail result
-                self.root.after(100, lambda: self.process_result(False))
+    def show_conformity(self, conforme):
+        """Update the conformity label of the distance card"""
+        if conforme:
+            self.conformity_label.configure(text="✅ PASS", text_color="#10b981")
         else:
-            self.conformity_label.configure(text="")
+            self.conformity_label.configure(text="❌ FAIL", text_color="#ef4444")
             
     def update_distance_display(self):
+        current_distance = self.engine.current_distance
         try:
-            self.distance_label.configure(text="{:.1f} cm".format(self.current_distance))
+            self.distance_label.configure(text="{:.1f} cm".format(current_distance))
             
-            if self.current_distance < 10:
+            if current_distance < 10:
                 color = "#ef4444"
-            elif self.current_distance < 20:
+            elif current_distance < 20:
                 color = "#f59e0b"
-            elif self.current_distance < 100:
+            elif current_distance < 100:
                 color = "#10b981"
             else:
                 color = "#06b6d4"
                 
             self.distance_label.configure(text_color=color)
             
-            # Check conformity automatically
-            self.check_conformity(self.current_distance)
+            self.show_conformity(self.engine.check_conformity(current_distance))
             
-            if self.distance_history:
-                min_dist = min(self.distance_history)
-                max_dist = max(self.distance_history)
-                avg_dist = sum(self.distance_history) / len(self.distance_history)
-                
-                self.min_distance_label.configure(text="Min: {:.1f} cm".format(min_dist))
-                self.max_distance_label.configure(text="Max: {:.1f} cm".format(max_dist))
-                self.avg_distance_label.configure(text="Avg: {:.1f} cm".format(avg_dist))
+            stats = self.engine.distance_stats()
+            if stats:
+                self.min_distance_label.configure(text="Min: {:.1f} cm".format(stats['min']))
+                self.max_distance_label.configure(text="Max: {:.1f} cm".format(stats['max']))
+                self.avg_distance_label.configure(text="Avg: {:.1f} cm".format(stats['avg']))
+                self.std_distance_label.configure(text="Std: {:.2f} cm".format(stats['std']))
+                self.percentile_distance_label.configure(
+                    text="P50/P95: {:.1f}/{:.1f} cm".format(stats['p50'], stats['p95']))
                 
         except Exception as e:
             clean_msg = "Error updating distance display: {}".format(str(e))
@@ -1578,87 +2196,77 @@ class ModernArduinoInterface:
 
     def reset_distance_stats(self):
         if messagebox.askyesno("Confirmation", "Are you sure you want to reset the distance statistics?"):
-            self.distance_history.clear()
-            self.current_distance = 0.0
+            self.engine.reset_distance_stats()
+            self.distance_plot.clear()
             
             self.distance_label.configure(text="-- cm")
             self.min_distance_label.configure(text="Min: -- cm")
             self.max_distance_label.configure(text="Max: -- cm")
             self.avg_distance_label.configure(text="Avg: -- cm")
+            self.std_distance_label.configure(text="Std: -- cm")
+            self.percentile_distance_label.configure(text="P50/P95: -- cm")
             self.conformity_label.configure(text="")
             
             self.log_message("🔄 Distance statistics reset")
 
-    def attempt_reconnection(self):
-        max_attempts = 3
-        for attempt in range(max_attempts):
-            self.log_message("🔄 Reconnection attempt {}/{}".format(attempt + 1, max_attempts))
-            time.sleep(2)
-            try:
-                if self.port:
-                    self.arduino = serial.Serial(self.port, self.baudrate, timeout=1)
-                    time.sleep(2)
-                    self.is_running = True
-                    self.start_reading_thread()
-                    self.log_message("✅ Reconnection successful")
-                    return
-            except Exception as e:
-                clean_msg = "Reconnection attempt {} failed: {}".format(attempt + 1, str(e))
-                self.logger.error(clean_msg)
+    def process_results(self, records):
+        """Show the results recorded by the engine since the last refresh tick"""
+        for record in records:
+            conforme = record['conforme']
+            result_text = "✅ Result: PASS" if conforme else "❌ Result: FAIL"
+            if record['settle_time'] is None:
+                self.log_message(result_text)
+            else:
+                duration = "{:.0f}".format(record['settle_time'] * 1000)
+                self.log_message("{} ({:.1f} cm, {} ms, {} samples{})".format(
+                    result_text, record['distance'], duration, record['samples'],
+                    "" if record['settled'] else ", not settled"))
         
-        self.log_message("❌ Reconnection failed")
-        self.disconnect()
-
-    def process_result(self, conforme):
-        timestamp = datetime.now()
+        # The virtualized table only rewrites its visible rows
+        self.history_view.refresh()
         
+        # Status, counters and sound only reflect the latest result
+        conforme = records[-1]['conforme']
         if conforme:
-            self.conforme_count += 1
             self.update_status("✅ PASS", "#10b981")
-            self.log_message("✅ Result: PASS")
-            result_text = "PASS"
         else:
-            self.non_conforme_count += 1
             self.update_status("❌ FAIL", "#ef4444")
-            self.log_message("❌ Result: FAIL")
-            result_text = "FAIL"
-        
-        self.test_history.append({
-            'timestamp': timestamp,
-            'result': result_text,
-            'conforme': conforme,
-            'distance': self.current_distance
-        })
-        
-        # Add to history tree with colors
-        item_id = self.history_tree.insert('', 0, values=(
-            timestamp.strftime("%H:%M:%S"),
-            f"{'✅' if conforme else '❌'} {result_text}",
-            f"{self.current_distance:.1f}",
-            "< 100"
-        ))
-        
-        # Color coding for tree items
-        if conforme:
-            self.history_tree.set(item_id, '✅ Result', '✅ PASS')
-        else:
-            self.history_tree.set(item_id, '✅ Result', '❌ FAIL')
         
         self.update_stats()
         self.play_notification_sound(conforme)
 
+    def change_plot_window(self, value):
+        self.distance_plot.set_window(dict(WINDOWS)[value])
+
+    def change_history_filter(self, value):
+        self.history_view.set_filter({"PASS": True, "FAIL": False}.get(value))
+
+    def change_history_sort(self, value):
+        self.history_view.set_sort({
+            "Distance ↑": SORT_DISTANCE_ASC,
+            "Distance ↓": SORT_DISTANCE_DESC
+        }.get(value, SORT_NEWEST))
+
+    def jump_to_history_record(self, event=None):
+        try:
+            number = int(self.history_jump_entry.get())
+        except ValueError:
+            return
+        self.history_filter_var.set("All")
+        self.history_sort_var.set("Newest first")
+        self.history_view.jump_to_record(number)
+
     def manual_test(self, conforme):
-        if not self.session_start_time:
-            self.session_start_time = datetime.now()
+        if not self.engine.session_start_time:
+            self.engine.session_start_time = datetime.now()
             self.start_connection_timer()
         
-        if self.current_distance == 0.0:
+        if self.engine.current_distance == 0.0:
             import random
-            self.current_distance = round(random.uniform(10.0, 50.0), 1)
-            self.distance_history.append(self.current_distance)
+            self.engine.add_manual_distance(round(random.uniform(10.0, 50.0), 1))
             self.update_distance_display()
         
-        self.process_result(conforme)
+        self.engine.record_result(conforme)
 
     def update_status(self, text, color):
         def task():
@@ -1692,7 +2300,7 @@ class ModernArduinoInterface:
         self.root.after(0, task)
 
     def reset_status(self):
-        if self.is_running:
+        if self.engine.is_running:
             self.status_label.configure(text="⏳ Waiting...", text_color="#94a3b8")
         else:
             self.status_label.configure(text="⏳ Waiting for connection...", text_color="#94a3b8")
@@ -1709,23 +2317,19 @@ class ModernArduinoInterface:
         )
 
     def update_stats(self):
-        total = self.conforme_count + self.non_conforme_count
-        success_rate = (self.conforme_count / total * 100) if total > 0 else 0
+        summary = self.engine.summary()
         
-        self.stats_conforme_label.configure(text=str(self.conforme_count))
-        self.stats_non_conforme_label.configure(text=str(self.non_conforme_count))
-        self.stats_total_label.configure(text=str(total))
-        self.success_rate_label.configure(text="{:.1f}%".format(success_rate))
+        self.stats_conforme_label.configure(text=str(summary['conforme_count']))
+        self.stats_non_conforme_label.configure(text=str(summary['non_conforme_count']))
+        self.stats_total_label.configure(text=str(summary['total']))
+        self.success_rate_label.configure(text="{:.1f}%".format(summary['success_rate']))
 
     def reset_stats(self):
         if messagebox.askyesno("Confirmation", "Are you sure you want to reset all statistics?"):
-            self.conforme_count = 0
-            self.non_conforme_count = 0
-            self.test_history.clear()
+            self.engine.reset_stats()
             
-            # Clear tree
-            for item in self.history_tree.get_children():
-                self.history_tree.delete(item)
+            # Clear table
+            self.history_view.reset()
             
             self.update_stats()
             self.log_message("🔄 Statistics reset")
@@ -1734,13 +2338,138 @@ class ModernArduinoInterface:
         if messagebox.askyesno("New session", "Start a new test session?"):
             self.reset_stats()
             self.reset_distance_stats()
-            self.session_start_time = datetime.now() if self.is_running else None
+            self.engine.session_start_time = datetime.now() if self.engine.is_running else None
             self.log_message("🎉 New test session started")
 
     def toggle_auto_reconnect(self):
         self.auto_reconnect = self.auto_reconnect_var.get()
+        self.supervisor.reconnect = self.auto_reconnect
+        self.save_config()
+
+    def toggle_binary_protocol(self):
+        self.binary_protocol = self.binary_protocol_var.get()
+        self.engine.binary_protocol = self.binary_protocol
+        self.save_config()
+
+    def set_sample_rate(self, rate):
+        """Send the acquisition rate to the firmware (applied on connect when offline)"""
+        try:
+            self.engine.set_sample_rate(rate)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        except Exception as e:
+            messagebox.showerror("Error", "Unable to send the command:\n{}".format(str(e)))
+            return
+        
+        self.sample_rate = self.engine.sample_rate
+        self.log_message("📤 Command sent: RATE:{}".format(self.sample_rate))
+        self.save_config()
+
+    def set_signal_filter(self, name):
+        """Select the filter stage of the main engine and of every station"""
+        try:
+            self.engine.set_signal_filter(name)
+            for engine in self.station_manager.engines():
+                engine.set_signal_filter(name)
+        except ValueError as e:
+            messagebox.showerror("Error", str(e))
+            self.signal_filter_var.set(self.signal_filter)
+            return
+        
+        self.signal_filter = name
+        self.station_manager.engine_options['signal_filter'] = name
+        self.log_message("🎚️ Signal filter: {}".format(name))
         self.save_config()
 
+    def toggle_spans(self):
+        SPANS.enable(self.spans_var.get())
+
+    def reset_spans(self):
+        SPANS.reset()
+        self.loop_watchdog.reset()
+        self.refresh_performance(reschedule=False)
+
+    def refresh_performance(self, reschedule=True):
+        """Event-loop lag, slowest Tk callbacks and per-stage p50/p99; refreshed every second"""
+        if self.tabview.get() == "⚙️ Paramètres":
+            watchdog = self.loop_watchdog
+            lag = watchdog.lag.summary()
+            lines = []
+            if lag:
+                lines.append("Tk loop lag: p50 {:.1f} ms, p99 {:.1f} ms, max {:.1f} ms{}\n".format(
+                    lag['p50_ms'], lag['p99_ms'], watchdog.max_lag * 1000,
+                    " (degraded mode)" if watchdog.degraded else ""))
+            callbacks = watchdog.callback_summary(5)
+            if callbacks:
+                lines.append("\n{:<36} {:>7} {:>9} {:>9}\n".format("slowest callbacks", "runs", "mean ms", "max ms"))
+                for name, count, mean_ms, max_ms in callbacks:
+                    lines.append("{:<36} {:>7} {:>9.2f} {:>9.2f}\n".format(name[-36:], count, mean_ms, max_ms))
+            if SPANS.enabled:
+                lines.append("\n{:<16} {:>9} {:>9} {:>9} {:>9}\n".format("stage", "count", "p50 ms", "p99 ms", "max ms"))
+                for stage, summary in SPANS.summary().items():
+                    lines.append("{:<16} {:>9} {:>9.3f} {:>9.3f} {:>9.3f}\n".format(
+                        stage, summary['count'], summary['p50_ms'], summary['p99_ms'], summary['max_ms']))
+            else:
+                lines.append("\nEnable stage timing for per-stage p50/p99.\n")
+            self.performance_text.configure(state="normal")
+            self.performance_text.delete("1.0", "end")
+            self.performance_text.insert("end", "".join(lines))
+            self.performance_text.configure(state="disabled")
+        if reschedule:
+            self.root.after(1000, self.refresh_performance)
+
+    def capture_profile(self):
+        """Profile the next N seconds to a file (sampling: every thread; cProfile: the GUI thread)"""
+        try:
+            seconds = float(self.profile_seconds_var.get())
+            if seconds <= 0:
+                raise ValueError
+        except ValueError:
+            messagebox.showerror("Error", "Enter a positive duration in seconds")
+            return
+
+        sampling = self.profile_mode_var.get().startswith("Sampling")
+        extension = ".txt" if sampling else ".prof"
+        filename = filedialog.asksaveasfilename(
+            defaultextension=extension,
+            filetypes=[("Collapsed stacks", "*.txt")] if sampling else [("cProfile stats", "*.prof")],
+            initialfile="profile_{}{}".format(datetime.now().strftime('%Y%m%d_%H%M%S'), extension)
+        )
+        if not filename:
+            return
+
+        self.profile_btn.configure(state="disabled")
+        self.profile_status_label.configure(text="🔬 Profiling {:.0f} s...".format(seconds))
+        if sampling:
+            profiler = SamplingProfiler(filename, seconds).start()
+
+            def finish():
+                if not profiler.done:
+                    self.root.after(200, finish)
+                    return
+                self.profile_done(filename, profiler.error, "{} samples".format(profiler.samples))
+        else:
+            capture = ProfileCapture(filename).start()
+
+            def finish():
+                try:
+                    capture.stop()
+                    self.profile_done(filename, None, "GUI thread")
+                except OSError as e:
+                    self.profile_done(filename, e, "")
+
+        self.root.after(int(seconds * 1000), finish)
+
+    def profile_done(self, filename, error, details):
+        self.profile_btn.configure(state="normal")
+        if error:
+            self.profile_status_label.configure(text="❌ Profile failed")
+            messagebox.showerror("Error", "Unable to write the profile:\n{}".format(str(error)))
+            return
+        self.profile_status_label.configure(text="✅ {}".format(Path(filename).name))
+        self.log_message("🔬 Profile saved to {} ({})".format(filename, details))
+
     def toggle_sound(self):
         self.sound_enabled = self.sound_var.get()
         self.save_config()
@@ -1753,18 +2482,18 @@ class ModernArduinoInterface:
                 pass
 
     def test_connection(self):
-        if not self.is_running:
+        if not self.engine.is_running:
             messagebox.showwarning("Test unavailable", "Please connect to the Arduino first.")
             return
         
         try:
-            self.arduino.write(b"TEST\n")
+            self.engine.write(b"TEST\n")
             self.log_message("🧪 Test command sent")
         except Exception as e:
             messagebox.showerror("Test Error", "Unable to send the test command:\n{}".format(str(e)))
 
     def send_custom_command(self):
-        if not self.is_running:
+        if not self.engine.is_running:
             messagebox.showwarning("Connection required", "Please connect to the Arduino first.")
             return
         
@@ -1774,13 +2503,13 @@ class ModernArduinoInterface:
         
         if command:
             try:
-                self.arduino.write("{}\n".format(command).encode())
+                self.engine.send_command(command)
                 self.log_message("📤 Command sent: {}".format(command))
             except Exception as e:
                 messagebox.showerror("Error", "Unable to send the command:\n{}".format(str(e)))
 
     def export_to_csv(self):
-        if not self.test_history:
+        if not self.engine.test_history:
             messagebox.showwarning("No data", "No tests to export.")
             return
         
@@ -1791,75 +2520,141 @@ class ModernArduinoInterface:
         )
         
         if filename:
-            try:
-                with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                    fieldnames = ['Timestamp', 'Result', 'Conforme', 'Distance_cm']
-                    writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                    
-                    writer.writeheader()
-                    for test in self.test_history:
-                        writer.writerow({
-                            'Timestamp': test['timestamp'].strftime('%Y-%m-%d %H:%M:%S'),
-                            'Result': test['result'],
-                            'Conforme': test['conforme'],
-                            'Distance_cm': test.get('distance', 0.0)
-                        })
-                
-                self.log_message("📊 Data exported to: {}".format(filename))
-                messagebox.showinfo("Export successful", "Data exported to:\n{}".format(filename))
-            except Exception as e:
-                messagebox.showerror("Export Error", "Unable to export data:\n{}".format(str(e)))
+            total = len(self.engine.test_history)
+            self.start_export(filename, history_rows(self.engine.test_history, 0, total), total)
 
     def export_to_json(self):
-        if not self.test_history:
+        if not self.engine.test_history:
             messagebox.showwarning("No data", "No tests to export.")
             return
         
         filename = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("JSON Lines files", "*.jsonl"), ("All files", "*.*")],
             title="Export to JSON"
         )
         
         if filename:
-            try:
-                export_data = {
-                    'session_info': {
-                        'start_time': self.session_start_time.isoformat() if self.session_start_time else None,
-                        'export_time': datetime.now().isoformat(),
-                        'total_tests': len(self.test_history),
-                        'conforme_count': self.conforme_count,
-                        'non_conforme_count': self.non_conforme_count,
-                        'success_rate': (self.conforme_count / len(self.test_history) * 100) if self.test_history else 0
-                    },
-                    'distance_stats': {
-                        'current_distance': self.current_distance,
-                        'min_distance': min(self.distance_history) if self.distance_history else 0,
-                        'max_distance': max(self.distance_history) if self.distance_history else 0,
-                        'avg_distance': sum(self.distance_history) / len(self.distance_history) if self.distance_history else 0,
-                        'thresholds': {
-                            'min': getattr(self, 'min_threshold', 10.0),
-                            'max': getattr(self, 'max_threshold', 50.0)
-                        }
-                    },
-                    'tests': [
-                        {
-                            'timestamp': test['timestamp'].isoformat(),
-                            'result': test['result'],
-                            'conforme': test['conforme'],
-                            'distance_cm': test.get('distance', 0.0)
-                        }
-                        for test in self.test_history
-                    ]
+            engine = self.engine
+            total = len(engine.test_history)
+            summary = engine.summary()
+            distance_stats = engine.distance_stats() or {'min': 0, 'max': 0, 'avg': 0, 'std': 0}
+            # The tests list is streamed after this header by the export worker
+            header = {
+                'session_info': {
+                    'start_time': engine.session_start_time.isoformat() if engine.session_start_time else None,
+                    'export_time': datetime.now().isoformat(),
+                    'total_tests': total,
+                    'conforme_count': summary['conforme_count'],
+                    'non_conforme_count': summary['non_conforme_count'],
+                    'success_rate': summary['success_rate']
+                },
+                'distance_stats': {
+                    'current_distance': engine.current_distance,
+                    'min_distance': distance_stats['min'],
+                    'max_distance': distance_stats['max'],
+                    'avg_distance': distance_stats['avg'],
+                    'std_distance': distance_stats['std'],
+                    'thresholds': {
+                        'min': engine.min_threshold,
+                        'max': engine.max_threshold
+                    }
                 }
-                
-                with open(filename, 'w', encoding='utf-8') as jsonfile:
-                    json.dump(export_data, jsonfile, indent=2, ensure_ascii=False)
-                
-                self.log_message("📋 Data exported to: {}".format(filename))
-                messagebox.showinfo("Export successful", "Data exported to:\n{}".format(filename))
-            except Exception as e:
-                messagebox.showerror("Export Error", "Unable to export data:\n{}".format(str(e)))
+            }
+            self.start_export(filename, history_rows(engine.test_history, 0, total), total, header)
+
+    def export_columnar(self):
+        """Parquet, Arrow IPC, .npy or .npz, written straight from the history columns"""
+        if not self.engine.test_history:
+            messagebox.showwarning("No data", "No tests to export.")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".parquet",
+            filetypes=[("Parquet files", "*.parquet"), ("Arrow IPC files", "*.arrow"),
+                       ("NumPy arrays", "*.npz"), ("NumPy timestamp/distance", "*.npy")],
+            title="Export Columnar Data"
+        )
+        if not filename:
+            return
+        columns = history_columns(self.engine.test_history)
+        self.start_export(filename, columns, len(columns['timestamp']), columnar=True)
+
+    def export_from_store(self):
+        """Export the results of a time range straight from the persistent store"""
+        if not self.store:
+            messagebox.showwarning("No store", "The measurement store is disabled (store_file in config.json).")
+            return
+        
+        try:
+            start = self.ask_datetime("Start (YYYY-MM-DD HH:MM), empty for the beginning:")
+            end = self.ask_datetime("End (YYYY-MM-DD HH:MM), empty for now:")
+        except ValueError as e:
+            messagebox.showerror("Error", "Invalid date: {}".format(str(e)))
+            return
+        
+        total = self.store.count("results", start.timestamp() if start else None,
+                                 end.timestamp() if end else None)
+        if not total:
+            messagebox.showwarning("No data", "No results stored in this time range.")
+            return
+        
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".csv",
+            filetypes=[("CSV files", "*.csv"), ("JSON Lines files", "*.jsonl"), ("JSON files", "*.json")],
+            title="Export Time Range"
+        )
+        if filename:
+            self.start_export(filename, store_rows(self.store, start, end), total)
+
+    def ask_datetime(self, prompt):
+        dialog = ctk.CTkInputDialog(text=prompt, title="Export Time Range")
+        value = (dialog.get_input() or "").strip()
+        if not value:
+            return None
+        return datetime.strptime(value, "%Y-%m-%d %H:%M")
+
+    def start_export(self, filename, rows, total, header=None, columnar=False):
+        if self.export_job and not self.export_job.done:
+            messagebox.showwarning("Export running", "Please wait for the current export or cancel it.")
+            return
+        
+        # The dialogs accept any typed extension; rows only fit the row writers
+        try:
+            writer = writer_for(filename, header, columnar)
+        except ValueError as e:
+            messagebox.showwarning("Unsupported format", str(e))
+            return
+        
+        self.export_job = ExportJob(filename, rows, total, writer, text=not columnar).start()
+        self.export_progress.set(0)
+        self.export_status_label.configure(text="⏳ 0/{}".format(total))
+        self.export_cancel_btn.configure(state="normal")
+        self.root.after(100, self.poll_export)
+
+    def poll_export(self):
+        job = self.export_job
+        self.export_progress.set(job.progress)
+        self.export_status_label.configure(text="⏳ {}/{}".format(job.written, job.total))
+        if not job.done:
+            self.root.after(100, self.poll_export)
+            return
+        
+        self.export_cancel_btn.configure(state="disabled")
+        if job.error:
+            self.export_status_label.configure(text="❌ Failed")
+            messagebox.showerror("Export Error", "Unable to export data:\n{}".format(str(job.error)))
+        elif job.cancelled:
+            self.export_progress.set(0)
+            self.export_status_label.configure(text="🛑 Cancelled")
+            self.log_message("🛑 Export cancelled")
+        else:
+            self.export_status_label.configure(text="✅ {} results".format(job.written))
+            self.log_message("📊 Data exported to: {}".format(job.path))
+
+    def cancel_export(self):
+        if self.export_job:
+            self.export_job.cancel()
 
     def save_log(self):
         filename = filedialog.asksaveasfilename(
@@ -1885,7 +2680,13 @@ class ModernArduinoInterface:
                 
                 self.baudrate = 9600
                 self.auto_reconnect = False
+                self.supervisor.reconnect = False
                 self.sound_enabled = True
+                self.max_distance_history = 100
+                self.engine.set_history_size(self.max_distance_history)
+                self.binary_protocol = False
+                self.engine.binary_protocol = False
+                self.binary_protocol_var.set(False)
                 
                 self.baudrate_var.set("9600")
                 self.auto_reconnect_var.set(False)
@@ -1923,7 +2724,7 @@ class ModernArduinoInterface:
     - Configure Min/Max thresholds in centimeters
     - Click "Apply" to save thresholds
     - Distance displays in real-time with color coding
-    - Conformity tests run automatically based on thresholds
+    - One conformity test per part, once its reading has settled
 
     🧪 MANUAL TESTS:
     - Use "Pass Test" and "Fail Test" buttons
@@ -2063,36 +2864,44 @@ class ModernArduinoInterface:
         )
         close_btn.pack(pady=(0, 20))
 
-    def clean_message_for_logging(self, msg):
-        """Remove emoji characters from messages for logging compatibility"""
-        import re
-        # Remove all emoji characters that cause encoding issues
-        emoji_pattern = re.compile("["
-            "\U0001F600-\U0001F64F"  # emoticons
-            "\U0001F300-\U0001F5FF"  # symbols & pictographs
-            "\U0001F680-\U0001F6FF"  # transport & map symbols
-            "\U0001F1E0-\U0001F1FF"  # flags (iOS)
-            "\U00002702-\U000027B0"
-            "\U000024C2-\U0001F251"
-            "⚠️⚡🔧🎉📏🔄✅❌🧪📊🔌📡📤💾🗑️📋📁📚ℹ️📅⏱️🚀🎯🛠️🎨📱🔵🟣🟡🔵🟢🔴📜🔔🔊🌙🕐"
-            "]+", flags=re.UNICODE)
-        return emoji_pattern.sub('', msg).strip()
-
-    def log_message(self, msg):
-        def task():
-            timestamp = datetime.now().strftime("%H:%M:%S")
-            log_entry = f"[{timestamp}] {msg}\n"
-            self.log_text.insert("end", log_entry)
-            
-            if self.auto_scroll_var.get():
-                self.log_text.see("end")
+    def log_message(self, msg, category="event"):
+        """Queue a log line; it is written on the next refresh tick (thread-safe)"""
+        if not self.log_limiter.allow(category):
+            return
+        self.log_buffer.append((datetime.now(), msg, category))
+
+    def flush_log(self):
+        """Write all queued log lines to the console with a single insert"""
+        suppressed = self.log_limiter.take_suppressed()
+        if suppressed:
+            self.suppressed_log_lines += sum(suppressed.values())
+            self.suppressed_label.configure(text="🔇 Suppressed: {}".format(self.suppressed_log_lines))
+        
+        entries = self.log_buffer.drain()
+        if not entries:
+            return
+        
+        lines = []
+        for timestamp, msg, category in entries:
+            lines.append(f"[{timestamp.strftime('%H:%M:%S')}] {msg}\n")
             
             # Clean message for logging to avoid Unicode errors
-            clean_msg = self.clean_message_for_logging(msg)
+            clean_msg = strip_emoji(msg)
             if clean_msg:  # Only log if there's content after cleaning
-                self.logger.info(clean_msg)
+                self.logger.log(CATEGORY_LEVELS.get(category, logging.INFO), clean_msg)
         
-        self.root.after(0, task)
+        self.log_text.insert("end", "".join(lines))
+        
+        # Keep the console bounded: drop the oldest lines. Counted by the
+        # widget, so multi-line messages and clears cannot skew the count
+        # (the text ends with a newline, so end-1c sits on an empty line)
+        line_count = int(self.log_text.index("end-1c").split(".")[0]) - 1
+        excess = line_count - LOG_MAX_LINES
+        if excess > 0:
+            self.log_text.delete("1.0", "{}.0".format(excess + 1))
+        
+        if self.auto_scroll_var.get():
+            self.log_text.see("end")
 
     def clear_log(self):
         if messagebox.askyesno("Confirmation", "Are you sure you want to clear the log?"):
@@ -2100,14 +2909,25 @@ class ModernArduinoInterface:
             self.log_message("🗑️ Log cleared")
 
     def on_closing(self):
-        if self.is_running:
-            if messagebox.askyesno("Close", "A connection is active. Are you sure you want to exit?"):
-                self.disconnect()
-                self.save_config()
-                self.root.destroy()
-        else:
-            self.save_config()
-            self.root.destroy()
+        if self.engine.is_running:
+            if not messagebox.askyesno("Close", "A connection is active. Are you sure you want to exit?"):
+                return
+            self.disconnect()
+        
+        self.loop_watchdog.stop()
+        self.supervisor.disconnect()
+        self.station_manager.stop()
+        if self.store:
+            self.store.close()
+        if self.metrics_server:
+            self.metrics_server.close()
+        if self.metrics_writer:
+            self.metrics_writer.close()
+        self.save_config()
+        self.flush_log()
+        self.root.destroy()
+        # Write out whatever the background log writer still holds
+        self.log_listener.stop()
 
     def run(self):
         try: